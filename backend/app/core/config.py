@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class Settings(BaseSettings):
     # API Settings
@@ -27,6 +27,91 @@ class Settings(BaseSettings):
     # Your Google Cloud Project ID
     GOOGLE_CLOUD_PROJECT: str = "sustainability-index-463713"
     
+    # Earth Engine extraction
+    # Build all environmental indicators as one ee.Dictionary and fetch it with a single getInfo()
+    GEE_SINGLE_ROUND_TRIP: bool = True
+    # Seconds between background Earth Engine health checks (0 disables them)
+    GEE_HEALTH_CHECK_INTERVAL_SECONDS: int = 300
+    
+    # Polygon preprocessing before Earth Engine submission: vertices are dropped while the
+    # simplified outline stays within this many meters of the drawn one (0 disables it).
+    # Well below a 10 m Sentinel-2 pixel, so the reduced pixels do not change.
+    POLYGON_SIMPLIFY_TOLERANCE_METERS: float = 2.0
+    # The tolerance is halved while simplification changes the area by more than this fraction
+    POLYGON_MAX_AREA_ERROR: float = 0.001
+    
+    # reduceRegion resolution: datasets are reduced at their native scale up to this many
+    # pixels per polygon (100 km² of Sentinel-2) and coarsened beyond it
+    REDUCTION_PIXEL_BUDGET: int = 1_000_000
+    # Coarse datasets are sampled finer so small polygons still cover this many pixels
+    REDUCTION_MIN_PIXELS: int = 16
+    REDUCTION_MAX_PIXELS: int = 1_000_000_000
+    
+    # Large-area mode: above this area the Sentinel-2 statistics are reduced as a grid of
+    # clipped tiles in parallel, each tile at native resolution
+    TILED_REDUCTION_ENABLED: bool = True
+    TILED_REDUCTION_MIN_AREA_SQM: float = 250_000_000
+    TILED_REDUCTION_TILE_SIZE_METERS: float = 10_000
+    # Tiles are enlarged when the grid would have more than this many
+    TILED_REDUCTION_MAX_TILES: int = 64
+    TILED_REDUCTION_WORKERS: int = 8
+    # Retries of a failed tile, with exponential backoff starting at the given delay
+    TILED_REDUCTION_RETRIES: int = 2
+    TILED_REDUCTION_RETRY_BACKOFF_SECONDS: float = 1.0
+    
+    # Maximum number of features in one /environmental-indicators/batch request
+    GEO_BATCH_MAX_FEATURES: int = 500
+    # Batch features are reduced in area bands whose largest and smallest areas
+    # differ by at most this factor, each band at the scale chosen for its areas
+    GEO_BATCH_AREA_BAND_RATIO: float = 4.0
+    
+    # Bounded thread pool for blocking Earth Engine calls
+    EE_EXECUTOR_MAX_WORKERS: int = 32
+    EE_EXECUTOR_MAX_QUEUE: int = 256
+    
+    # Maximum number of years processed concurrently by one time series request
+    TIMESERIES_YEAR_PARALLELISM: int = 8
+    # Compute every year's indicators in one ee.List.map computation
+    TIMESERIES_SERVER_SIDE_INDICATORS: bool = True
+    
+    # In-process cache of environmental indicator results per polygon and analysis window.
+    # Sentinel-2/Landsat revisit every few days and CAMS/Sentinel-5P refresh daily, so a
+    # few hours of staleness is invisible in a 365-day composite.
+    INDICATOR_CACHE_ENABLED: bool = True
+    INDICATOR_CACHE_MAX_ENTRIES: int = 1024
+    INDICATOR_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    
+    # SQLite store for yearly indicators of past years, shared by all workers
+    HISTORICAL_STORE_ENABLED: bool = True
+    HISTORICAL_STORE_PATH: str = "data/historical_indicators.sqlite3"
+    # A year is stored only once this many days have passed since it ended,
+    # leaving time for late scenes and reprocessed products to arrive
+    HISTORICAL_STORE_SETTLE_DAYS: int = 90
+    
+    # Serve Earth Engine thumbnails through /api/geographic/thumbnails with an on-disk cache
+    THUMBNAIL_PROXY_ENABLED: bool = True
+    THUMBNAIL_CACHE_DIR: str = "data/thumbnails"
+    THUMBNAIL_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    THUMBNAIL_FETCH_TIMEOUT_SECONDS: int = 60
+    
+    # Maximum number of neighborhoods scored by one /calculate-batch request
+    BATCH_MAX_ITEMS: int = 200_000
+    # Records scored per chunk by the NDJSON streaming endpoint and CLI
+    STREAM_CHUNK_SIZE: int = 5000
+    # Longest NDJSON record accepted; longer lines are answered with an error record
+    STREAM_MAX_LINE_BYTES: int = 1_048_576
+    
+    # Named scoring profiles, selectable per request with ?profile=. Each one overrides
+    # thresholds and/or indicator weights (percent of the index, adding up to 100) of
+    # the built-in "default" profile, e.g. as JSON in the environment:
+    # {"urban": {"thresholds": {"gpa_max": 25}, "weights": {"environmental": {"water_percentage_area": 0, "green_percentage_area": 14}}}}
+    SCORING_PROFILES: Dict[str, Dict[str, Any]] = {}
+    # Profile used when a request does not name one
+    SCORING_DEFAULT_PROFILE: str = "default"
+    
+    # Maximum number of weight samples drawn by one /sensitivity request
+    SENSITIVITY_MAX_SAMPLES: int = 200_000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
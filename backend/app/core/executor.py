@@ -0,0 +1,101 @@
+# app/core/executor.py
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the Earth Engine work queue is full"""
+
+
+class EarthEngineExecutor:
+    """Bounded thread pool for blocking Earth Engine work.
+
+    Request handlers await run() so synchronous Earth Engine calls never block
+    the event loop. At most max_workers calls run at once and at most max_queue
+    calls wait for a worker; further submissions raise ExecutorSaturatedError.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="earth-engine")
+            return self._pool
+
+    def _invoke(self, state: Dict[str, bool], func: Callable, args, kwargs) -> Any:
+        with self._lock:
+            if not state['started']:
+                state['started'] = True
+                self._queued -= 1
+            self._active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) on the pool and await its result"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(
+                    f"Earth Engine work queue is full ({self.max_queue} pending requests)"
+                )
+            self._queued += 1
+
+        state = {'started': False}
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._get_pool(), functools.partial(self._invoke, state, func, args, kwargs)
+            )
+        finally:
+            # Work cancelled before a worker picked it up never left the queue
+            with self._lock:
+                if not state['started']:
+                    state['started'] = True
+                    self._queued -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Queue-depth and active-worker gauges"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active_workers": self._active,
+                "queue_depth": self._queued,
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected
+            }
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            logger.info("Earth Engine executor shut down")
+
+
+ee_executor = EarthEngineExecutor(
+    max_workers=settings.EE_EXECUTOR_MAX_WORKERS,
+    max_queue=settings.EE_EXECUTOR_MAX_QUEUE
+)
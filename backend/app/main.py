@@ -2,12 +2,52 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import sustainability, geographic, timeseries
 from app.core.config import settings
+from app.core.executor import ee_executor
+from app.services.earth_engine import EarthEngineService
+from app.services.cache import indicator_cache
+from app.services.thumbnails import thumbnail_cache
+from app.services.historical_store import historical_store
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import sys
 
+logger = logging.getLogger(__name__)
+
+async def earth_engine_health_loop(interval: int):
+    """Periodically re-check Earth Engine readiness"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await ee_executor.run(EarthEngineService.check_health)
+        except Exception as e:
+            logger.warning(f"Earth Engine health check could not run: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize Earth Engine once per process; requests retry lazily if this fails
+    try:
+        await ee_executor.run(EarthEngineService.initialize)
+    except Exception as e:
+        logger.error(f"Earth Engine not ready at startup: {e}")
+    
+    health_task = None
+    if settings.GEE_HEALTH_CHECK_INTERVAL_SECONDS > 0:
+        health_task = asyncio.create_task(
+            earth_engine_health_loop(settings.GEE_HEALTH_CHECK_INTERVAL_SECONDS)
+        )
+    
+    yield
+    
+    if health_task is not None:
+        health_task.cancel()
+    ee_executor.shutdown()
+
 app = FastAPI(
     title="Neighborhood Sustainability Index API",
     description="API for calculating neighborhood sustainability scores based on environmental, social, and economic indicators with geographic analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -43,5 +83,10 @@ async def health_check():
             "geographic_analysis": "available",
             "earth_engine": "check /api/geographic/gee-status"
         },
+        "earth_engine": EarthEngineService.readiness(),
+        "earth_engine_executor": ee_executor.stats(),
+        "indicator_cache": indicator_cache.stats(),
+        "thumbnail_cache": thumbnail_cache.stats(),
+        "historical_store": historical_store.stats() if settings.HISTORICAL_STORE_ENABLED else None,
         "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
     }
\ No newline at end of file
@@ -1,6 +1,6 @@
 # app/models/sustainability.py
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Literal
 
 
 class EnvironmentalIndicators(BaseModel):
@@ -49,6 +49,17 @@ class SustainabilityInput(BaseModel):
     social: SocialIndicators
     economic: EconomicIndicators
 
+class BatchSustainabilityInput(BaseModel):
+    items: Optional[List[Any]] = Field(default=None, description="Inputs shaped like SustainabilityInput, scored in order")
+    columns: Optional[Dict[str, Dict[str, List[Any]]]] = Field(default=None, description="Columnar inputs as {category: {field: [value per item]}}")
+    include_details: bool = Field(default=False, description="Include raw and normalized indicators in each result")
+
+class SensitivityInput(BaseModel):
+    neighborhood: SustainabilityInput
+    samples: int = Field(default=10_000, ge=100, description="Number of weight samples")
+    concentration: float = Field(default=50.0, gt=0, description="Dirichlet concentration; higher keeps sampled weights closer to the profile's weights")
+    seed: Optional[int] = Field(default=None, description="Random seed for reproducible samples")
+
 class IndicatorResults(BaseModel):
     # Environmental
     green_percentage_area: float
@@ -114,6 +125,10 @@ class SustainabilityResult(BaseModel):
     grade: str  # A, B, C, D, F based on score
     interpretation: str
 
+class GeographicSustainabilityResult(SustainabilityResult):
+    # reduceRegion scale, tileScale and bestEffort used per dataset
+    analysis_resolution: Optional[Dict[str, Any]] = None
+
 class IndicatorDefinition(BaseModel):
     name: str
     description: str
@@ -136,9 +151,24 @@ class GeographicSustainabilityInput(BaseModel):
 
 # Historical Time series Models
 
+# Image modes: one thumbnail URL per image, or one filmstrip per index with frame offsets
+ImageMode = Literal["individual", "filmstrip"]
+
 class TimeSeriesInput(BaseModel):
     polygon: PolygonInput
     years: List[int] = Field(..., description="List of years to analyze (2000-2024)")
+    image_mode: ImageMode = Field(default="individual", description="'filmstrip' returns one image strip per index instead of per-year image URLs")
+    
+class FilmstripFrame(BaseModel):
+    key: str = Field(..., description="Year or index name shown in the frame")
+    top: int = Field(..., description="Pixel offset of the frame's top edge in the filmstrip")
+    offset: float = Field(..., description="Frame's top edge as a fraction of the filmstrip height")
+
+class Filmstrip(BaseModel):
+    url: str
+    frame_width: int
+    frame_height: int
+    frames: List[FilmstripFrame]
     
 class YearlyEnvironmentalData(BaseModel):
     year: int
@@ -164,4 +194,5 @@ class TimeSeriesResult(BaseModel):
     total_area: float
     yearly_data: List[YearlyEnvironmentalData]
     animation_gif_url: str
-    trend_analysis: Dict[str, Any]    
\ No newline at end of file
+    trend_analysis: Dict[str, Any]
+    filmstrips: Optional[Dict[str, Filmstrip]] = None    
\ No newline at end of file
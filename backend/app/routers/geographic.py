@@ -1,14 +1,26 @@
 # app/routers/geographic.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal, Optional, Union
 from app.services.geographic import GeographicService
+from app.models.sustainability import ImageMode
+from app.services.thumbnails import THUMBNAIL_PROXY_PATH, ThumbnailNotFoundError, thumbnail_cache
+from app.core.config import settings
+from app.core.executor import ee_executor, ExecutorSaturatedError
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _absolute_thumbnail_urls(request: Request, value: Any) -> Any:
+    """Turn thumbnail proxy paths in a result into absolute URLs on this API"""
+    if isinstance(value, str) and value.startswith(THUMBNAIL_PROXY_PATH):
+        return str(request.base_url).rstrip("/") + value
+    if isinstance(value, dict):
+        return {k: _absolute_thumbnail_urls(request, v) for k, v in value.items()}
+    return value
+
 class PolygonCoordinates(BaseModel):
     coordinates: List[List[float]] = Field(..., description="Polygon coordinates as [[lon, lat], [lon, lat], ...]")
 
@@ -28,23 +40,36 @@ class EnvironmentalIndicatorsResponse(BaseModel):
     mean_lst_for_eqi: float
     ndbsi: float
     pm25: float
+    # reduceRegion scale, tileScale and bestEffort used per dataset
+    analysis_resolution: Optional[Dict[str, Any]] = None
+
+class GeoJSONFeature(BaseModel):
+    type: Literal["Feature"] = "Feature"
+    id: Optional[Union[str, int]] = None
+    geometry: Optional[Dict[str, Any]] = Field(default=None, description="GeoJSON Polygon geometry")
+    properties: Optional[Dict[str, Any]] = None
+
+class FeatureCollectionInput(BaseModel):
+    type: Literal["FeatureCollection"] = "FeatureCollection"
+    features: List[GeoJSONFeature] = Field(..., description="Neighborhood polygons")
 
 @router.post("/satellite-image")
-async def get_satellite_image(request: SatelliteImageRequest):
+async def get_satellite_image(request: SatelliteImageRequest, http_request: Request):
     """
     Get satellite image URL for a given polygon area.
     
     Returns a URL to a satellite image of the specified area.
     """
     try:
-        image_url = GeographicService.get_satellite_image_url(
+        image_url = await ee_executor.run(
+            GeographicService.get_satellite_image_url,
             coordinates=request.coordinates,
             width=request.width,
             height=request.height
         )
         
         return {
-            "image_url": image_url,
+            "image_url": _absolute_thumbnail_urls(http_request, image_url),
             "coordinates": request.coordinates,
             "dimensions": {
                 "width": request.width,
@@ -52,6 +77,8 @@ async def get_satellite_image(request: SatelliteImageRequest):
             }
         }
         
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting satellite image: {e}")
         raise HTTPException(status_code=400, detail=f"Error getting satellite image: {str(e)}")
@@ -64,6 +91,7 @@ async def calculate_area(polygon: PolygonCoordinates):
     Returns the area in square meters and square kilometers.
     """
     try:
+        # Computed locally on the WGS84 ellipsoid; no Earth Engine round trip
         area_sqm = GeographicService.calculate_area_sqm(polygon.coordinates)
         area_sqkm = area_sqm / 1_000_000
         
@@ -89,16 +117,53 @@ async def extract_environmental_indicators(polygon: PolygonCoordinates):
     - EQI components (NDVI, Tasseled Cap Wetness, LST, NDBSI, PM2.5)
     """
     try:
-        logger.info(f"Extracting environmental indicators for polygon: {polygon.coordinates}")
+        logger.info(f"Extracting environmental indicators for a polygon of {len(polygon.coordinates)} points")
         
-        indicators = GeographicService.extract_all_environmental_indicators(polygon.coordinates)
+        indicators = await ee_executor.run(
+            GeographicService.extract_all_environmental_indicators, polygon.coordinates
+        )
         
         return EnvironmentalIndicatorsResponse(**indicators)
         
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error extracting environmental indicators: {e}")
         raise HTTPException(status_code=400, detail=f"Error extracting environmental indicators: {str(e)}")
 
+@router.post("/environmental-indicators/batch")
+async def extract_environmental_indicators_batch(collection: FeatureCollectionInput):
+    """
+    Extract environmental indicators for every neighborhood of a GeoJSON FeatureCollection.
+    
+    All features are reduced with reduceRegions over shared composites and fetched
+    in a single Earth Engine computation; features are reduced in area bands, each
+    at its own scale, listed in `analysis_resolution`. Results are keyed by feature
+    id (the feature's `id`, else its `id` property, else its index); features with
+    invalid geometries, including rings crossing the antimeridian, are reported with
+    their errors and do not fail the batch.
+    """
+    count = len(collection.features)
+    if count > settings.GEO_BATCH_MAX_FEATURES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {count} features exceeds the limit of {settings.GEO_BATCH_MAX_FEATURES}"
+        )
+    
+    try:
+        logger.info(f"Extracting environmental indicators for {count} features")
+        
+        return await ee_executor.run(
+            GeographicService.extract_environmental_indicators_batch,
+            [feature.model_dump() for feature in collection.features]
+        )
+        
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error extracting environmental indicators for a batch: {e}")
+        raise HTTPException(status_code=400, detail=f"Error extracting environmental indicators: {str(e)}")
+
 @router.get("/test-connection")
 async def test_earth_engine_connection():
     """
@@ -106,12 +171,15 @@ async def test_earth_engine_connection():
     
     Returns connection status and basic information.
     """
-    try:
+    def run_connection_test():
         GeographicService.initialize_earth_engine()
         
         # Simple test to verify connection
         import ee
-        test_result = ee.Number(1).add(1).getInfo()
+        return ee.Number(1).add(1).getInfo()
+    
+    try:
+        test_result = await ee_executor.run(run_connection_test)
         
         return {
             "status": "connected",
@@ -128,20 +196,63 @@ async def test_earth_engine_connection():
         }
 
 @router.post("/multi-index-images")
-async def get_multi_index_images(polygon_data: SatelliteImageRequest):
-    """Get multi-index remote sensing analysis images"""
+async def get_multi_index_images(polygon_data: SatelliteImageRequest, http_request: Request,
+                                 image_mode: ImageMode = "individual"):
+    """Get multi-index remote sensing analysis images
+    
+    With image_mode=filmstrip a single sprite of all four indices is returned
+    together with per-frame offsets.
+    """
     try:
         coordinates = polygon_data.coordinates
         
         # Get multi-index images
-        images = GeographicService.get_multi_index_images(coordinates)
+        images = await ee_executor.run(
+            GeographicService.get_multi_index_images, coordinates,
+            polygon_data.width, polygon_data.height, image_mode
+        )
         
         return {
             "success": True,
-            "images": images,
+            "images": _absolute_thumbnail_urls(http_request, images),
             "message": "Multi-index images generated successfully"
         }
         
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating multi-index images: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/thumbnails/{key}")
+async def get_thumbnail(key: str, request: Request):
+    """
+    Serve a cached satellite or index thumbnail.
+    
+    The image is fetched from Earth Engine on first use and served from the
+    local disk cache afterwards.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    headers = {"Cache-Control": "public, max-age=604800, immutable"}
+    
+    # Revalidation of an image this worker has already served needs no I/O
+    digest = thumbnail_cache.cached_digest(key)
+    if if_none_match is not None and digest is not None and if_none_match == f'"{digest}"':
+        thumbnail_cache.count_not_modified()
+        return Response(status_code=304, headers={**headers, "ETag": if_none_match})
+    
+    try:
+        content, content_type, digest = await ee_executor.run(thumbnail_cache.get, key, if_none_match)
+    except ThumbnailNotFoundError:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching thumbnail {key}: {e}")
+        raise HTTPException(status_code=502, detail=f"Error fetching thumbnail: {str(e)}")
+    
+    headers["ETag"] = f'"{digest}"'
+    if content is None:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=content, media_type=content_type, headers=headers)
@@ -1,31 +1,150 @@
 # app/routers/sustainability.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.models.sustainability import (
     SustainabilityInput, 
     SustainabilityResult, 
+    GeographicSustainabilityResult,
     IndicatorDefinition, 
     GeographicSustainabilityInput, 
-    EnvironmentalIndicators  
+    EnvironmentalIndicators,
+    BatchSustainabilityInput,
+    SensitivityInput
 )
 from app.services.geographic import GeographicService
 from app.services.calculator import SustainabilityCalculator
-from typing import List
+from app.services.batch import BatchScorer
+from app.services.streaming import score_byte_stream
+from app.services.sensitivity import SensitivityAnalyzer
+from app.services.profiles import ScoringProfile, UnknownProfileError, profile_registry
+from app.core.config import settings
+from app.core.executor import ee_executor, ExecutorSaturatedError
+from typing import List, Optional
 
 router = APIRouter()
 
+class RequestBodyStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body is generated while the request body is still being read.
+
+    The stock response watches for client disconnects by calling receive(), which
+    would steal request body messages from the generator; a disconnect surfaces as
+    ClientDisconnect from request.stream() instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def _scoring_profile(name: Optional[str]) -> ScoringProfile:
+    """Compiled scoring profile for the `profile` query parameter"""
+    try:
+        return profile_registry.get(name)
+    except UnknownProfileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+PROFILE_QUERY = Query(default=None, description="Scoring profile name (default: the configured default profile)")
+
 @router.post("/calculate", response_model=SustainabilityResult)
-async def calculate_sustainability_index(data: SustainabilityInput):
+async def calculate_sustainability_index(data: SustainabilityInput, profile: Optional[str] = PROFILE_QUERY):
     """
     Calculate the neighborhood sustainability index based on environmental, social, and economic indicators.
     
     Returns a comprehensive sustainability score from 0-100 with detailed breakdowns.
     """
+    scoring_profile = _scoring_profile(profile)
     try:
-        result = SustainabilityCalculator.calculate_sustainability_index(data)
+        result = SustainabilityCalculator.calculate_sustainability_index(data, scoring_profile)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
 
+@router.post("/calculate-batch")
+async def calculate_sustainability_batch(data: BatchSustainabilityInput, profile: Optional[str] = PROFILE_QUERY):
+    """
+    Calculate the sustainability index for many neighborhoods in one request.
+    
+    Accepts either `items` (a list of SustainabilityInput objects), answered with
+    one result per item, or `columns` ({category: {field: [value per item]}}),
+    answered with result columns. Results keep the input order; items that fail
+    validation are reported with their errors and do not fail the batch.
+    """
+    if (data.items is None) == (data.columns is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'items' or 'columns'")
+    scoring_profile = _scoring_profile(profile)
+    
+    try:
+        count = len(data.items) if data.items is not None else BatchScorer.column_length(data.columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if count > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {count} items exceeds the limit of {settings.BATCH_MAX_ITEMS}"
+        )
+    
+    try:
+        # Scoring is CPU-bound; keep it off the event loop
+        if data.items is not None:
+            results = await run_in_threadpool(
+                BatchScorer.score_records, data.items, data.include_details, scoring_profile
+            )
+            content = BatchScorer.summarize(results)
+        else:
+            content = await run_in_threadpool(
+                BatchScorer.score_columns, data.columns, data.include_details, scoring_profile
+            )
+        
+        # Plain JSON: skip per-item response model validation
+        return JSONResponse(content=content)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+
+@router.post("/calculate-stream")
+async def calculate_sustainability_stream(request: Request,
+                                          chunk_size: int = Query(default=None, ge=1, le=100_000),
+                                          profile: Optional[str] = PROFILE_QUERY):
+    """
+    Score a newline-delimited JSON stream of SustainabilityInput records.
+    
+    Records are read incrementally and scored in chunks; each record produces one
+    SustainabilityResult line (with its input `line` number) as soon as its chunk
+    completes. Invalid lines, and lines longer than STREAM_MAX_LINE_BYTES, produce
+    an `errors` line instead. Memory use does not grow with the input size.
+    """
+    scoring_profile = _scoring_profile(profile)
+    return RequestBodyStreamingResponse(
+        score_byte_stream(request.stream(), chunk_size, scoring_profile),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/sensitivity")
+async def calculate_weight_sensitivity(data: SensitivityInput, profile: Optional[str] = PROFILE_QUERY):
+    """
+    Monte Carlo sensitivity of a neighborhood's score to the scoring weights.
+    
+    Draws `samples` sets of category and indicator weights from Dirichlet
+    distributions centered on the profile's weights and returns the resulting
+    score distribution, grade probabilities and each indicator's rank importance
+    (Spearman correlation between its sampled weight and the index).
+    """
+    if data.samples > settings.SENSITIVITY_MAX_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{data.samples} samples exceed the limit of {settings.SENSITIVITY_MAX_SAMPLES}"
+        )
+    scoring_profile = _scoring_profile(profile)
+    
+    try:
+        return await run_in_threadpool(
+            SensitivityAnalyzer.analyze, data.neighborhood, scoring_profile,
+            data.samples, data.concentration, data.seed
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Sensitivity analysis error: {str(e)}")
+
 @router.get("/indicators", response_model=List[IndicatorDefinition])
 async def get_indicator_definitions():
     """
@@ -94,50 +213,29 @@ async def get_example_input():
         raise HTTPException(status_code=500, detail=f"Error generating example: {str(e)}")
 
 @router.get("/weights")
-async def get_category_weights():
+async def get_category_weights(profile: Optional[str] = PROFILE_QUERY):
     """
     Get the weighting scheme used for calculating the final sustainability index.
     
-    Returns the weights assigned to each category and indicator.
+    Returns the weights (in percent of the index) assigned to each category and
+    indicator by the selected scoring profile.
     """
+    scoring_profile = _scoring_profile(profile)
     try:
-        weights = {
-            "category_weights": {
-                "environmental": 40,  # 40%
-                "social": 30,         # 30%
-                "economic": 30        # 30%
-            },
-            "indicator_weights": {
-                "environmental": {
-                    "green_percentage_area": 8,    # 8%
-                    "water_percentage_area": 6,    # 6%
-                    "air_quality": 8,              # 8%
-                    "land_surface_temperature": 6, # 6%
-                    "ecological_quality_index": 12 # 12%
-                },
-                "social": {
-                    "crime_rate": 3.75,
-                    "education_level": 3.75,
-                    "access_to_transit": 3.75,
-                    "access_to_schools": 3.75,
-                    "access_to_hospitals": 3.75,
-                    "access_to_fire_stations": 3.75,
-                    "access_to_police": 3.75,
-                    "walkability": 3.75
-                },
-                "economic": {
-                    "median_household_income": 10,
-                    "unemployment_rate": 10,
-                    "housing_affordability": 10
-                }
-            }
-        }
-        return weights
+        return scoring_profile.describe()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving weights: {str(e)}")
+
+@router.get("/profiles")
+async def get_scoring_profiles():
+    """
+    List the configured scoring profiles and the default one.
+    """
+    return {"default": profile_registry.default_name, "profiles": profile_registry.names()}
     
-@router.post("/calculate-geographic", response_model=SustainabilityResult)
-async def calculate_sustainability_from_polygon(data: GeographicSustainabilityInput):
+@router.post("/calculate-geographic", response_model=GeographicSustainabilityResult)
+async def calculate_sustainability_from_polygon(data: GeographicSustainabilityInput,
+                                               profile: Optional[str] = PROFILE_QUERY):
     """
     Calculate sustainability index using polygon coordinates for automatic environmental data extraction.
     
@@ -145,10 +243,14 @@ async def calculate_sustainability_from_polygon(data: GeographicSustainabilityIn
     1. Takes polygon coordinates and social/economic data
     2. Automatically extracts environmental indicators from satellite imagery
     3. Calculates the complete sustainability index
+    
+    The resolution each dataset was reduced at is returned as `analysis_resolution`.
     """
+    scoring_profile = _scoring_profile(profile)
     try:
         # Extract environmental indicators from satellite imagery
-        env_indicators = GeographicService.extract_all_environmental_indicators(
+        env_indicators = await ee_executor.run(
+            GeographicService.extract_all_environmental_indicators,
             data.polygon.coordinates
         )
         
@@ -163,8 +265,13 @@ async def calculate_sustainability_from_polygon(data: GeographicSustainabilityIn
         )
         
         # Calculate sustainability index
-        result = SustainabilityCalculator.calculate_sustainability_index(complete_input)
-        return result
+        result = SustainabilityCalculator.calculate_sustainability_index(complete_input, scoring_profile)
+        return GeographicSustainabilityResult(
+            **result.model_dump(),
+            analysis_resolution=env_indicators.get('analysis_resolution')
+        )
         
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
\ No newline at end of file
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.sustainability import TimeSeriesInput, TimeSeriesResult
 from app.services.timeseries import TimeSeriesService
+from app.core.executor import ExecutorSaturatedError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,6 +26,8 @@ async def analyze_time_series(data: TimeSeriesInput):
         result = await TimeSeriesService.analyze_time_series(data)
         return result
         
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Time series analysis error: {e}")
         raise HTTPException(status_code=400, detail=f"Time series analysis error: {str(e)}")
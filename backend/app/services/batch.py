@@ -0,0 +1,224 @@
+# app/services/batch.py
+import math
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from annotated_types import Ge, Gt, Le, Lt
+from app.models.sustainability import (
+    EnvironmentalIndicators, SocialIndicators, EconomicIndicators, IndicatorResults
+)
+from app.services.columnar import ColumnarCalculator
+from app.services.profiles import ScoringProfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Input categories and the models whose field constraints apply to them
+CATEGORY_MODELS = {
+    'environmental': EnvironmentalIndicators,
+    'social': SocialIndicators,
+    'economic': EconomicIndicators
+}
+
+
+def _compile_field_rules(model) -> List[Tuple[str, bool, Optional[float], Optional[float], Optional[float], Optional[float]]]:
+    """(name, is_int, ge, gt, le, lt) for every model field, from its type and Field bounds"""
+    rules = []
+    for name, field in model.model_fields.items():
+        bounds = {'ge': None, 'gt': None, 'le': None, 'lt': None}
+        for constraint in field.metadata:
+            for kind, constraint_type in (('ge', Ge), ('gt', Gt), ('le', Le), ('lt', Lt)):
+                if isinstance(constraint, constraint_type):
+                    bounds[kind] = getattr(constraint, kind)
+        rules.append((name, field.annotation is int, bounds['ge'], bounds['gt'], bounds['le'], bounds['lt']))
+    return rules
+
+
+# Compiled once from the input models so batch validation follows the same rules
+FIELD_RULES = {category: _compile_field_rules(model) for category, model in CATEGORY_MODELS.items()}
+
+# Result keys of every scored item; details add the raw and normalized indicators
+SUMMARY_KEYS = ['environmental_score', 'social_score', 'economic_score', 'sustainability_index', 'grade']
+INDICATOR_KEYS = set(IndicatorResults.model_fields)
+
+
+def _check_value(value: Any, is_int: bool, ge, gt, le, lt) -> Tuple[Any, Optional[str]]:
+    """Validated value, or None and an error message"""
+    if value is None:
+        return None, "Field required"
+    value_type = type(value)
+    if value_type is not int and value_type is not float:
+        return None, "Input should be a valid number"
+    if is_int and value_type is float:
+        if not value.is_integer():
+            return None, "Input should be a valid integer"
+        value = int(value)
+    elif value_type is float and not math.isfinite(value):
+        return None, "Input should be a finite number"
+    if ge is not None and not value >= ge:
+        return None, f"Input should be greater than or equal to {ge}"
+    if gt is not None and not value > gt:
+        return None, f"Input should be greater than {gt}"
+    if le is not None and not value <= le:
+        return None, f"Input should be less than or equal to {le}"
+    if lt is not None and not value < lt:
+        return None, f"Input should be less than {lt}"
+    return value, None
+
+
+def _to_array(raw: List[Any]) -> np.ndarray:
+    """Column values as a float array; entries that are not numbers become NaN"""
+    try:
+        values = np.asarray(raw, dtype=np.float64)
+        if values.ndim == 1:
+            return values
+    except (TypeError, ValueError):
+        pass
+    return np.array([v if type(v) in (int, float) else np.nan for v in raw], dtype=np.float64)
+
+
+class BatchScorer:
+    """Score many neighborhoods per call with the vectorized ColumnarCalculator.
+
+    Inputs are validated column by column against the constraints of the input
+    models and scored with NumPy. Invalid items are reported inline, with
+    pydantic-style error locations, and do not fail the batch.
+    """
+
+    @staticmethod
+    def validate_columns(columns: Dict[str, Dict[str, List[Any]]], count: int,
+                         errors: Dict[int, List[Dict[str, Any]]],
+                         missing_categories: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """Float arrays per category and field; per-row errors are added to `errors`
+        
+        missing_categories marks rows whose category object was absent, so their
+        fields are not reported one by one.
+        """
+        arrays: Dict[str, Dict[str, np.ndarray]] = {}
+        for category, rules in FIELD_RULES.items():
+            fields = columns.get(category) or {}
+            skip = missing_categories.get(category) if missing_categories else None
+            arrays[category] = {}
+            for name, is_int, ge, gt, le, lt in rules:
+                raw = fields.get(name)
+                if raw is None:
+                    raw = [None] * count
+                values = _to_array(raw)
+                
+                with np.errstate(invalid='ignore'):
+                    bad = ~np.isfinite(values)
+                    if is_int:
+                        bad |= values != np.floor(values)
+                    if ge is not None:
+                        bad |= ~(values >= ge)
+                    if gt is not None:
+                        bad |= ~(values > gt)
+                    if le is not None:
+                        bad |= ~(values <= le)
+                    if lt is not None:
+                        bad |= ~(values < lt)
+                if skip is not None:
+                    bad &= ~skip
+                
+                # Only failing rows get the exact scalar error message
+                for i in np.flatnonzero(bad).tolist():
+                    value = raw[i].item() if isinstance(raw[i], np.generic) else raw[i]
+                    error = _check_value(value, is_int, ge, gt, le, lt)[1] or "Input should be a valid number"
+                    errors.setdefault(i, []).append({"loc": [category, name], "msg": error})
+                
+                arrays[category][name] = values
+        return arrays
+
+    @staticmethod
+    def _score(arrays: Dict[str, Dict[str, np.ndarray]], include_details: bool,
+               profile: Optional[ScoringProfile] = None) -> Dict[str, list]:
+        """Score every row; rows with invalid values produce garbage that callers discard"""
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            scores = ColumnarCalculator.score_arrays(
+                arrays['environmental'], arrays['social'], arrays['economic'], include_details, profile
+            )
+        return {key: values.tolist() for key, values in scores.items()}
+
+    @staticmethod
+    def score_records(records: List[Any], include_details: bool = False,
+                      profile: Optional[ScoringProfile] = None) -> List[Dict[str, Any]]:
+        """Score items shaped like SustainabilityInput, returning one result per item in order"""
+        count = len(records)
+        errors: Dict[int, List[Dict[str, Any]]] = {}
+        columns: Dict[str, Dict[str, List[Any]]] = {}
+        missing_categories: Dict[str, np.ndarray] = {}
+        
+        not_objects = {i for i, record in enumerate(records) if not isinstance(record, dict)}
+        for i in not_objects:
+            errors[i] = [{"loc": [], "msg": "Input should be a valid dictionary"}]
+        
+        # Transpose the records into columns
+        for category, rules in FIELD_RULES.items():
+            objects = [record.get(category) if isinstance(record, dict) else None for record in records]
+            missing = np.array([not isinstance(obj, dict) for obj in objects], dtype=bool)
+            for i in np.flatnonzero(missing).tolist():
+                if i not in not_objects:
+                    errors.setdefault(i, []).append({"loc": [category], "msg": "Field required"})
+            missing_categories[category] = missing
+            
+            objects = [obj if isinstance(obj, dict) else {} for obj in objects]
+            columns[category] = {name: [obj.get(name) for obj in objects] for name, *_ in rules}
+        
+        arrays = BatchScorer.validate_columns(columns, count, errors, missing_categories)
+        scores = BatchScorer._score(arrays, include_details, profile)
+        
+        results = []
+        detail_keys = [key for key in scores if key not in SUMMARY_KEYS]
+        for i in range(count):
+            if i in errors:
+                results.append({"index": i, "errors": errors[i]})
+                continue
+            result = {key: scores[key][i] for key in SUMMARY_KEYS}
+            if include_details:
+                result["indicators"] = {key: scores[key][i] for key in detail_keys if key in INDICATOR_KEYS}
+                result["normalized"] = {key: scores[key][i] for key in detail_keys if key not in INDICATOR_KEYS}
+            result["index"] = i
+            results.append(result)
+        return results
+
+    @staticmethod
+    def column_length(columns: Dict[str, Dict[str, List[Any]]]) -> int:
+        """Common length of all columns; raises ValueError when they differ"""
+        lengths = {len(values) for fields in columns.values() for values in fields.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"All columns must have the same length, got lengths {sorted(lengths)}")
+        return lengths.pop() if lengths else 0
+
+    @staticmethod
+    def score_columns(columns: Dict[str, Dict[str, List[Any]]], include_details: bool = False,
+                      profile: Optional[ScoringProfile] = None) -> Dict[str, Any]:
+        """Score a columnar payload ({category: {field: [value per item]}}), returning columns
+        
+        Result columns hold None for rows that failed validation; those rows are
+        listed with their errors under "errors".
+        """
+        count = BatchScorer.column_length(columns)
+        errors: Dict[int, List[Dict[str, Any]]] = {}
+        arrays = BatchScorer.validate_columns(columns, count, errors)
+        scores = BatchScorer._score(arrays, include_details, profile)
+        
+        for values in scores.values():
+            for i in errors:
+                values[i] = None
+        
+        return {
+            "count": count,
+            "succeeded": count - len(errors),
+            "failed": len(errors),
+            "columns": scores,
+            "errors": [{"index": i, "errors": errors[i]} for i in sorted(errors)]
+        }
+
+    @staticmethod
+    def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        failed = sum(1 for result in results if "errors" in result)
+        return {
+            "count": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results
+        }
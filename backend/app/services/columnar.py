@@ -0,0 +1,154 @@
+# app/services/columnar.py
+import numpy as np
+from typing import Dict, Optional, Tuple
+from app.services.calculator import SustainabilityCalculator
+from app.services.profiles import ScoringProfile, profile_registry
+
+# Grade boundaries, highest first (see SustainabilityCalculator.get_grade)
+GRADE_BOUNDARIES = [(80, "A"), (70, "B"), (60, "C"), (50, "D")]
+
+
+def round_like_python(values: np.ndarray, digits: int) -> np.ndarray:
+    """np.round that agrees with Python's round() on every value
+
+    np.round scales by 10**digits before rounding, so values like 10.345 (stored
+    as 10.3449999...) land exactly on .5 and round the other way. Those
+    near-ties are re-rounded with round(), which uses the exact decimal value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    flat = values.reshape(-1)
+    rounded = np.round(flat, digits)
+    scaled = flat * 10.0 ** digits
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if ties.size:
+        rounded[ties] = [round(value, digits) for value in flat[ties].tolist()]
+    return rounded.reshape(values.shape)
+
+
+class ColumnarCalculator:
+    """Vectorized NumPy version of SustainabilityCalculator.
+
+    Every input is a dict of equally long float arrays, one per input field,
+    and every step mirrors the scalar formulas operation for operation, so
+    results match the scalar path to float rounding.
+    """
+
+    @staticmethod
+    def indicator_arrays(env: Dict[str, np.ndarray], soc: Dict[str, np.ndarray], eco: Dict[str, np.ndarray],
+                         profile: Optional[ScoringProfile] = None) -> Dict[str, np.ndarray]:
+        """Raw indicators for every row (see SustainabilityCalculator.indicator_values)"""
+        thresholds = (profile or profile_registry.get()).thresholds
+
+        # Environmental indicators
+        gpa = (env['green_area'] / env['total_area']) * 100
+        wpa = (env['water_area'] / env['total_area']) * 100
+        aq = env['air_quality_aod']
+        lst = env['land_surface_temperature']
+
+        # Ecological Quality Index from the normalized components
+        ndvi_norm = (env['mean_ndvi'] - thresholds['ndvi_min']) / \
+                    (thresholds['ndvi_max'] - thresholds['ndvi_min'])
+        wet_norm = (env['tasseled_cap_wetness'] - thresholds['wet_min']) / \
+                   (thresholds['wet_max'] - thresholds['wet_min'])
+        heat_norm = 1 - (env['mean_lst_for_eqi'] - thresholds['lst_min']) / \
+                    (thresholds['lst_max'] - thresholds['lst_min'])
+        ndbsi_norm = 1 - (env['ndbsi'] - thresholds['ndbsi_min']) / \
+                     (thresholds['ndbsi_max'] - thresholds['ndbsi_min'])
+        pm25_norm = 1 - (env['pm25'] / thresholds['pm25_max'])
+
+        pca_loadings = SustainabilityCalculator.PCA_LOADINGS
+        pc1 = (pca_loadings[0] * ndvi_norm +
+               pca_loadings[1] * wet_norm +
+               pca_loadings[2] * heat_norm +
+               pca_loadings[3] * ndbsi_norm +
+               pca_loadings[4] * pm25_norm)
+
+        eqi = (pc1 - thresholds['pc1_min']) / \
+              (thresholds['pc1_max'] - thresholds['pc1_min'])
+        eqi = np.maximum(0, np.minimum(1, eqi))
+
+        # Social indicators
+        cr = (soc['total_crimes'] / soc['total_population']) * 1000
+        el = (soc['adults_with_degree'] / soc['total_adult_population']) * 100
+
+        total_sq_miles = env['total_area'] * 3.861e-7
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.where(total_sq_miles > 0, soc['street_intersections'] / total_sq_miles, 0.0)
+
+        # Economic indicators
+        ur = (eco['unemployed_count'] / eco['labor_force']) * 100
+        ha = (eco['affordable_housing_units'] / eco['total_housing_units']) * 100
+
+        return {
+            'green_percentage_area': gpa,
+            'water_percentage_area': wpa,
+            'air_quality': aq,
+            'land_surface_temperature': lst,
+            'ecological_quality_index': eqi,
+            'crime_rate': cr,
+            'education_level': el,
+            'access_to_transit': soc['avg_time_to_transit'],
+            'access_to_schools': soc['avg_time_to_schools'],
+            'access_to_hospitals': soc['avg_time_to_hospitals'],
+            'access_to_fire_stations': soc['avg_time_to_fire_stations'],
+            'access_to_police': soc['avg_time_to_police'],
+            'walkability': w,
+            'median_household_income': eco['median_household_income'],
+            'unemployment_rate': ur,
+            'housing_affordability': ha
+        }
+
+    @staticmethod
+    def normalized_arrays(indicators: Dict[str, np.ndarray],
+                          profile: Optional[ScoringProfile] = None) -> Dict[str, np.ndarray]:
+        """Indicators normalized to 0-1 (see SustainabilityCalculator.normalized_values)
+
+        All indicators are normalized at once as one (rows x indicators) matrix
+        against the profile's compiled bound vectors.
+        """
+        profile = profile or profile_registry.get()
+        values = np.column_stack([indicators[indicator] for indicator, *_ in profile.normalization])
+        normalized = np.minimum(profile.uppers, np.maximum(
+            profile.lowers, profile.bases + profile.signs * ((values - profile.offsets) / profile.scales)
+        ))
+        return {key: normalized[:, column] for column, (_, key, *_) in enumerate(profile.normalization)}
+
+    @staticmethod
+    def category_score_arrays(normalized: Dict[str, np.ndarray],
+                              profile: Optional[ScoringProfile] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Category scores (0-100); the scalar weighted sums work on arrays unchanged"""
+        return SustainabilityCalculator.category_score_values(normalized, profile)
+
+    @staticmethod
+    def grades(index: np.ndarray) -> np.ndarray:
+        """Letter grade for every index score"""
+        return np.select(
+            [index >= boundary for boundary, _ in GRADE_BOUNDARIES],
+            [grade for _, grade in GRADE_BOUNDARIES],
+            default="F"
+        )
+
+    @staticmethod
+    def score_arrays(env: Dict[str, np.ndarray], soc: Dict[str, np.ndarray], eco: Dict[str, np.ndarray],
+                     include_details: bool = False, profile: Optional[ScoringProfile] = None) -> Dict[str, np.ndarray]:
+        """Category scores, index and grade for every row, rounded like the scalar path
+
+        include_details adds every raw and normalized indicator as its own column.
+        """
+        profile = profile or profile_registry.get()
+        indicators = ColumnarCalculator.indicator_arrays(env, soc, eco, profile)
+        normalized = ColumnarCalculator.normalized_arrays(indicators, profile)
+        env_score, soc_score, eco_score = ColumnarCalculator.category_score_arrays(normalized, profile)
+        final_index = SustainabilityCalculator.calculate_final_index(env_score, soc_score, eco_score, profile)
+
+        result = {
+            'environmental_score': round_like_python(env_score, 2),
+            'social_score': round_like_python(soc_score, 2),
+            'economic_score': round_like_python(eco_score, 2),
+            'sustainability_index': round_like_python(final_index, 2),
+            'grade': ColumnarCalculator.grades(final_index)
+        }
+        if include_details:
+            result.update(indicators)
+            result.update(normalized)
+        return result
@@ -0,0 +1,207 @@
+# app/services/composites.py
+import ee
+import threading
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from app.services.sensors import LANDSAT_SENSORS, SENTINEL2, SensorSpec, landsat_sensor_for_year
+from app.services.geometry import geodesic_area
+from app.services.resolution import ReductionPlan
+from app.services.tiling import TiledReduction
+from app.core.config import settings
+
+
+class CompositeContext:
+    """Satellite collections and composites for one polygon and time window.
+
+    Built once per request and passed to every indicator extractor so the
+    filtered collections and median composites are only constructed once.
+    Properties are computed lazily and memoized.
+    """
+
+    # Recent windows are covered by Landsat 8
+    landsat_sensor = LANDSAT_SENSORS['LC08']
+
+    def __init__(self, coordinates: Optional[List[List[float]]], start_date: datetime, end_date: datetime,
+                 region: Optional[ee.FeatureCollection] = None):
+        self.coordinates = coordinates
+        # Collections are filtered to the polygon, or to the features of a batch
+        self.polygon = region if region is not None else ee.Geometry.Polygon(coordinates)
+        self.start = start_date.strftime('%Y-%m-%d')
+        self.end = end_date.strftime('%Y-%m-%d')
+
+    @classmethod
+    def for_recent_period(cls, coordinates: List[List[float]], days: int = 365) -> "CompositeContext":
+        """Context covering the last `days` days"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        return cls(coordinates, start_date, end_date)
+
+    @classmethod
+    def for_features(cls, collection: ee.FeatureCollection, days: int = 365) -> "CompositeContext":
+        """Context covering the last `days` days over the features of a collection
+
+        Collections keep only scenes that intersect one of the features, not
+        everything in their combined bounds. There is no single polygon, so
+        `reduction` and `tiling` are not available.
+        """
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        return cls(None, start_date, end_date, region=collection)
+
+    @cached_property
+    def reduction(self) -> ReductionPlan:
+        """reduceRegion parameters for the polygon's size"""
+        return ReductionPlan(geodesic_area(self.coordinates))
+
+    @cached_property
+    def tiling(self) -> Optional[TiledReduction]:
+        """Tile grid for large-area reductions, None for polygons below the large-area threshold"""
+        if not settings.TILED_REDUCTION_ENABLED or self.reduction.area_sqm < settings.TILED_REDUCTION_MIN_AREA_SQM:
+            return None
+        try:
+            return TiledReduction(self.coordinates)
+        except ValueError:
+            return None
+
+    @cached_property
+    def s2_collection(self) -> ee.ImageCollection:
+        """Sentinel-2 surface reflectance with < 20% cloudy pixels"""
+        return (SENTINEL2.collection()
+                .filterBounds(self.polygon)
+                .filterDate(self.start, self.end)
+                .filter(ee.Filter.lt(SENTINEL2.cloud_property, 20)))
+
+    @cached_property
+    def s2_median(self) -> ee.Image:
+        """Sentinel-2 median composite"""
+        return self.s2_collection.median()
+
+    @cached_property
+    def landsat_collection(self) -> ee.ImageCollection:
+        """Landsat Collection 2 surface reflectance with < 20% cloud cover"""
+        return (self.landsat_sensor.collection()
+                .filterBounds(self.polygon)
+                .filterDate(self.start, self.end)
+                .filter(ee.Filter.lt(self.landsat_sensor.cloud_property, 20)))
+
+    @cached_property
+    def landsat_median(self) -> ee.Image:
+        """Landsat median composite"""
+        return self.landsat_collection.median()
+
+    @cached_property
+    def lst_collection(self) -> ee.ImageCollection:
+        """MODIS daily daytime land surface temperature"""
+        return (ee.ImageCollection('MODIS/061/MOD11A1')
+                .filterBounds(self.polygon)
+                .filterDate(self.start, self.end)
+                .select('LST_Day_1km'))
+
+    @cached_property
+    def lst_celsius(self) -> ee.Image:
+        """Mean MODIS LST converted from scaled Kelvin to Celsius"""
+        return self.lst_collection.mean().multiply(0.02).subtract(273.15)
+
+    @cached_property
+    def aod_collection(self) -> ee.ImageCollection:
+        """Sentinel-5P TROPOMI absorbing aerosol index"""
+        return (ee.ImageCollection('COPERNICUS/S5P/NRTI/L3_AER_AI')
+                .filterBounds(self.polygon)
+                .filterDate(self.start, self.end)
+                .select('absorbing_aerosol_index'))
+
+    @cached_property
+    def pm25_collection(self) -> ee.ImageCollection:
+        """CAMS near-real-time surface PM2.5 (kg/m³)"""
+        return (ee.ImageCollection('ECMWF/CAMS/NRT')
+                .filterBounds(self.polygon)
+                .filterDate(self.start, self.end)
+                .select('particulate_matter_d_less_than_25_um_surface'))
+
+
+class AnnualCompositeBuilder:
+    """Annual Landsat collections and composites for one polygon, memoized per (year, sensor).
+
+    Built once per time series request and shared by the yearly indicators,
+    satellite images, multi-index images and the animation, so each year's
+    collection filtering, cloud-cover fallback and median composite is
+    constructed once. Safe to use from the executor threads of one request.
+    """
+
+    # Cloud cover limit for indicator composites
+    INDICATOR_CLOUD_COVER = 20
+    # Cloud cover limits for imagery, the second used when the first leaves no scenes
+    IMAGERY_CLOUD_COVER = 50
+    IMAGERY_FALLBACK_CLOUD_COVER = 80
+
+    def __init__(self, coordinates: List[List[float]]):
+        self.coordinates = coordinates
+        self.polygon = ee.Geometry.Polygon(coordinates)
+        self._memo: Dict[Tuple, Any] = {}
+        # Re-entrant: builders call other memoized builders
+        self._lock = threading.RLock()
+
+    def _memoized(self, key: Tuple, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = build()
+            return self._memo[key]
+
+    @staticmethod
+    def sensor_for_year(year: int) -> SensorSpec:
+        return landsat_sensor_for_year(year)
+
+    def _sensor(self, year: int, sensor: Optional[SensorSpec]) -> SensorSpec:
+        return sensor if sensor is not None else landsat_sensor_for_year(year)
+
+    def collection(self, year: int, sensor: Optional[SensorSpec] = None) -> ee.ImageCollection:
+        """All scenes of the sensor over the polygon during the year"""
+        sensor = self._sensor(year, sensor)
+        return self._memoized(('collection', year, sensor.name), lambda: (
+            sensor.collection()
+            .filterBounds(self.polygon)
+            .filterDate(f'{year}-01-01', f'{year}-12-31')
+        ))
+
+    def indicator_collection(self, year: int, sensor: Optional[SensorSpec] = None) -> ee.ImageCollection:
+        """Scenes with < INDICATOR_CLOUD_COVER % cloud cover"""
+        sensor = self._sensor(year, sensor)
+        return self._memoized(('indicator_collection', year, sensor.name), lambda: (
+            self.collection(year, sensor)
+            .filter(ee.Filter.lt(sensor.cloud_property, self.INDICATOR_CLOUD_COVER))
+        ))
+
+    def indicator_composite(self, year: int, sensor: Optional[SensorSpec] = None) -> ee.Image:
+        """Median of the indicator collection"""
+        sensor = self._sensor(year, sensor)
+        return self._memoized(('indicator_composite', year, sensor.name),
+                              lambda: self.indicator_collection(year, sensor).median())
+
+    def imagery_collection(self, year: int, sensor: Optional[SensorSpec] = None) -> ee.ImageCollection:
+        """Scenes with < IMAGERY_CLOUD_COVER % cloud cover, or < IMAGERY_FALLBACK_CLOUD_COVER %
+        when that leaves no scenes. The fallback is decided server-side."""
+        sensor = self._sensor(year, sensor)
+
+        def build():
+            collection = self.collection(year, sensor)
+            clearer = collection.filter(ee.Filter.lt(sensor.cloud_property, self.IMAGERY_CLOUD_COVER))
+            cloudier = collection.filter(ee.Filter.lt(sensor.cloud_property, self.IMAGERY_FALLBACK_CLOUD_COVER))
+            return ee.ImageCollection(ee.Algorithms.If(clearer.size().gt(0), clearer, cloudier))
+
+        return self._memoized(('imagery_collection', year, sensor.name), build)
+
+    def imagery_composite(self, year: int, sensor: Optional[SensorSpec] = None) -> ee.Image:
+        """Median of the imagery collection"""
+        sensor = self._sensor(year, sensor)
+        return self._memoized(('imagery_composite', year, sensor.name),
+                              lambda: self.imagery_collection(year, sensor).median())
+
+    def lst_collection(self, year: int) -> ee.ImageCollection:
+        """MODIS daily daytime land surface temperature for the year"""
+        return self._memoized(('lst_collection', year), lambda: (
+            ee.ImageCollection('MODIS/061/MOD11A1')
+            .filterBounds(self.polygon)
+            .filterDate(f'{year}-01-01', f'{year}-12-31')
+            .select('LST_Day_1km')
+        ))
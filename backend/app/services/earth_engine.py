@@ -4,6 +4,8 @@ import json
 from typing import Dict, Any, Optional
 from app.core.config import settings
 import logging
+import threading
+import time
 from math import cos, radians
 
 logger = logging.getLogger(__name__)
@@ -11,18 +13,154 @@ logger = logging.getLogger(__name__)
 class EarthEngineService:
     """Service for Google Earth Engine operations"""
     
+    # Number of getInfo() round trips issued through get_info()
+    _round_trips = 0
+    _round_trip_lock = threading.Lock()
+    
+    # Readiness state, set once at startup and refreshed by check_health()
+    _ready = False
+    _init_lock = threading.Lock()
+    _last_check: Optional[float] = None
+    _last_error: Optional[str] = None
+    
+    @staticmethod
+    def get_info(computed_object) -> Any:
+        """Fetch a computed object from Earth Engine, counting the round trip"""
+        with EarthEngineService._round_trip_lock:
+            EarthEngineService._round_trips += 1
+        return computed_object.getInfo()
+    
+    @staticmethod
+    def get_round_trip_count() -> int:
+        """Number of getInfo() round trips issued since the last reset"""
+        return EarthEngineService._round_trips
+    
+    @staticmethod
+    def reset_round_trip_count():
+        """Reset the round trip counter"""
+        with EarthEngineService._round_trip_lock:
+            EarthEngineService._round_trips = 0
+    
+    @staticmethod
+    def regional_mean_or_default(collection, image, geometry, band: str, scale: float, default,
+                                 reduce_params: Optional[Dict[str, Any]] = None) -> ee.ComputedObject:
+        """Regional mean of `band` in `image`, or `default` when `collection` is empty.
+        
+        The emptiness check runs server-side, so the value costs a single round trip.
+        reduce_params (scale, maxPixels, tileScale, bestEffort) replace the fixed scale.
+        """
+        return ee.Algorithms.If(
+            collection.size().gt(0),
+            image.reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=geometry,
+                **(reduce_params or {'scale': scale, 'maxPixels': 1e9})
+            ).get(band),
+            default
+        )
+    
+    @staticmethod
+    def filmstrip(images, keys, region, width: int, height: int,
+                  vis_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """One filmstrip thumbnail for a list of images, with the layout of its frames.
+        
+        Frames are stacked top to bottom in the order of `images`; each frame is
+        width x height pixels, so frame i starts at i * height (offset i / n).
+        """
+        params = dict(vis_params or {})
+        params.update({
+            'region': region,
+            'dimensions': f'{width}x{height}',
+            'format': 'png'
+        })
+        url = ee.ImageCollection.fromImages(list(images)).getFilmstripThumbURL(params)
+        
+        return {'url': url, **EarthEngineService.filmstrip_layout(keys, width, height)}
+    
+    @staticmethod
+    def filmstrip_layout(keys, width: int, height: int) -> Dict[str, Any]:
+        """Frame size and per-frame offsets of a vertical filmstrip"""
+        keys = [str(key) for key in keys]
+        return {
+            'frame_width': width,
+            'frame_height': height,
+            'frames': [
+                {'key': key, 'top': i * height, 'offset': i / len(keys)}
+                for i, key in enumerate(keys)
+            ]
+        }
+    
+    @staticmethod
+    def is_ready() -> bool:
+        """Whether Earth Engine has been initialized and last passed its health check"""
+        return EarthEngineService._ready
+    
+    @staticmethod
+    def readiness() -> Dict[str, Any]:
+        """Readiness flag, time of the last health check and the last error"""
+        return {
+            "ready": EarthEngineService._ready,
+            "last_check": EarthEngineService._last_check,
+            "last_error": EarthEngineService._last_error
+        }
+    
     @staticmethod
     def initialize():
-        """Initialize Google Earth Engine"""
-        try:
-            # Check if already initialized
-            try:
-                ee.data.getInfo(ee.Number(1))
-                logger.info("Google Earth Engine already initialized")
+        """Initialize Google Earth Engine once per process.
+        
+        Returns immediately once initialized; readiness is re-checked in the
+        background by check_health() instead of on every call.
+        """
+        if EarthEngineService._ready:
+            return
+        
+        with EarthEngineService._init_lock:
+            if EarthEngineService._ready:
                 return
-            except:
-                pass
             
+            try:
+                EarthEngineService._connect()
+                EarthEngineService._ready = True
+                EarthEngineService._last_error = None
+            except Exception as e:
+                EarthEngineService._last_error = str(e)
+                raise
+    
+    @staticmethod
+    def _probe():
+        """Trivial request that fails unless Earth Engine is reachable and authorized"""
+        ee.data.getInfo(ee.Number(1))
+    
+    @staticmethod
+    def check_health() -> bool:
+        """Probe Earth Engine with a trivial request, reconnecting and probing again if it fails
+        
+        Only a successful probe marks the service ready; reconnecting alone does not.
+        """
+        try:
+            try:
+                EarthEngineService._probe()
+            except Exception as e:
+                logger.warning(f"Earth Engine health check failed, reconnecting: {e}")
+                EarthEngineService._ready = False
+                with EarthEngineService._init_lock:
+                    EarthEngineService._connect()
+                EarthEngineService._probe()
+            EarthEngineService._ready = True
+            EarthEngineService._last_error = None
+        except Exception as e:
+            logger.warning(f"Earth Engine is not ready: {e}")
+            EarthEngineService._ready = False
+            EarthEngineService._last_error = str(e)
+        finally:
+            EarthEngineService._last_check = time.time()
+        
+        return EarthEngineService._ready
+    
+    @staticmethod
+    def _connect():
+        """Authenticate and initialize the Earth Engine client"""
+        try:
             # For production, use service account authentication
             if (settings.GEE_SERVICE_ACCOUNT_EMAIL and 
                 settings.GEE_SERVICE_ACCOUNT_KEY and 
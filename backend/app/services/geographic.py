@@ -2,14 +2,30 @@
 import ee
 import json
 import base64
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Callable, Dict, Any, List, Tuple, Optional
 from app.core.config import settings
 from app.services.earth_engine import EarthEngineService
+from app.services.composites import CompositeContext
+from app.services.sensors import LANDSAT_SENSORS, SENTINEL2
+from app.services.geometry import (
+    canonical_polygon_key, crosses_antimeridian, geodesic_area, prepare_polygon, validate_polygon
+)
+from app.services.resolution import ReductionPlan
+from app.services.cache import indicator_cache
+from app.services.thumbnails import thumbnail_cache
 import logging
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Visualization of the multi-index images, in display order
+MULTI_INDEX_VISUALIZATION = {
+    'ndvi': {'palette': ['red', 'yellow', 'green'], 'min': -1, 'max': 1},
+    'wetness': {'palette': ['brown', 'yellow', 'blue'], 'min': -2000, 'max': 2000},
+    'dryness': {'palette': ['blue', 'yellow', 'red'], 'min': -2000, 'max': 4000},
+    'heat': {'palette': ['blue', 'cyan', 'yellow', 'red'], 'min': 250, 'max': 350}
+}
+
 class GeographicService:
     """Service for processing geographic data and extracting environmental indicators"""
     
@@ -19,24 +35,46 @@ class GeographicService:
         EarthEngineService.initialize()
     
     @staticmethod
-    def validate_polygon(coordinates: List[List[float]]) -> bool:
-        """Validate polygon coordinates"""
-        if not coordinates or len(coordinates) < 3:
-            return False
+    def _thumbnail_url(build_url: Callable[[], str], coordinates: List[List[float]], *qualifiers) -> str:
+        """Thumbnail URL for an image, served through the local thumbnail proxy when enabled
         
-        # Check if first and last points are the same (closed polygon)
-        if coordinates[0] != coordinates[-1]:
-            coordinates.append(coordinates[0])
+        The proxy key identifies the polygon and what was rendered (qualifiers); the
+        Earth Engine URL is only built when that image is not cached yet.
+        """
+        if not settings.THUMBNAIL_PROXY_ENABLED:
+            return build_url()
         
-        # Basic validation for coordinate ranges
-        for coord in coordinates:
-            if len(coord) != 2:
-                return False
-            lon, lat = coord
-            if not (-180 <= lon <= 180) or not (-90 <= lat <= 90):
-                return False
+        key = canonical_polygon_key(coordinates, *qualifiers)
+        return thumbnail_cache.url_for(key, build_url)
+    
+    @staticmethod
+    def validate_polygon(coordinates: List[List[float]]) -> bool:
+        """Validate polygon coordinates without modifying them"""
+        try:
+            prepare_polygon(coordinates)
+            return True
+        except (ValueError, TypeError):
+            return False
+    
+    @staticmethod
+    def prepare_polygon(coordinates: List[List[float]]) -> List[List[float]]:
+        """Closed, counter-clockwise and simplified copy of a polygon ring for Earth Engine
         
-        return True
+        Raises ValueError for rings that are out of range, degenerate or self-intersecting.
+        """
+        try:
+            prepared = prepare_polygon(
+                coordinates,
+                settings.POLYGON_SIMPLIFY_TOLERANCE_METERS,
+                settings.POLYGON_MAX_AREA_ERROR
+            )
+        except TypeError:
+            raise ValueError("Invalid polygon coordinates")
+        logger.info(
+            f"Prepared polygon: {prepared.original_vertices} -> {prepared.vertices} vertices, "
+            f"area {prepared.area_sqm:.0f} m² (simplification error {prepared.area_error:.4%})"
+        )
+        return prepared.coordinates
     
     @staticmethod
     def get_satellite_image_url(coordinates: List[List[float]], width: int = 800, height: int = 600) -> str:
@@ -44,8 +82,7 @@ class GeographicService:
         try:
             GeographicService.initialize_earth_engine()
             
-            if not GeographicService.validate_polygon(coordinates):
-                raise ValueError("Invalid polygon coordinates")
+            coordinates = GeographicService.prepare_polygon(coordinates)
             
             # Create Earth Engine geometry
             polygon = ee.Geometry.Polygon(coordinates)
@@ -55,41 +92,47 @@ class GeographicService:
             start_date = end_date - timedelta(days=180)
             
             # Sentinel-2 collection
-            s2_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
+            s2_collection = (SENTINEL2.collection()
                            .filterBounds(polygon)
                            .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                           .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
-                           .sort('CLOUDY_PIXEL_PERCENTAGE'))
+                           .filter(ee.Filter.lt(SENTINEL2.cloud_property, 20))
+                           .sort(SENTINEL2.cloud_property))
             
             # Get the least cloudy image
             image = s2_collection.first()
             
             # Create RGB visualization
-            rgb_image = image.select(['B4', 'B3', 'B2']).multiply(0.0001)
+            rgb_image = SENTINEL2.rgb(image)
             
             # Get image URL
-            url = rgb_image.getThumbURL({
-                'region': polygon,
-                'dimensions': f'{width}x{height}',
-                'format': 'png',
-                'min': 0,
-                'max': 0.3
-            })
-            
-            return url
+            return GeographicService._thumbnail_url(
+                lambda: rgb_image.getThumbURL({
+                    'region': polygon,
+                    'dimensions': f'{width}x{height}',
+                    'format': 'png',
+                    'min': 0,
+                    'max': 0.3
+                }),
+                coordinates, 'satellite', width, height,
+                start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+            )
             
         except Exception as e:
             logger.error(f"Error generating satellite image URL: {e}")
             raise
     
     @staticmethod
-    def get_multi_index_images(coordinates: List[List[float]], width: int = 800, height: int = 600) -> Dict[str, str]:
-        """Generate multi-index remote sensing analysis image URLs"""
+    def get_multi_index_images(coordinates: List[List[float]], width: int = 800, height: int = 600,
+                               image_mode: str = "individual") -> Dict[str, Any]:
+        """Generate multi-index remote sensing analysis image URLs
+        
+        With image_mode "filmstrip" a single sprite of all four indices is returned
+        together with the offsets of its frames.
+        """
         try:
             GeographicService.initialize_earth_engine()
             
-            if not GeographicService.validate_polygon(coordinates):
-                raise ValueError("Invalid polygon coordinates")
+            coordinates = GeographicService.prepare_polygon(coordinates)
             
             polygon = ee.Geometry.Polygon(coordinates)
             
@@ -98,18 +141,19 @@ class GeographicService:
             start_date = end_date - timedelta(days=180)
             
             # Sentinel-2 for high resolution indices
-            s2_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
+            s2_collection = (SENTINEL2.collection()
                         .filterBounds(polygon)
                         .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                        .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
-                        .sort('CLOUDY_PIXEL_PERCENTAGE'))
+                        .filter(ee.Filter.lt(SENTINEL2.cloud_property, 20))
+                        .sort(SENTINEL2.cloud_property))
             
             # Landsat for Tasseled Cap components
-            landsat_collection = (ee.ImageCollection('LANDSAT/LC08/C02/T1_L2')
+            landsat = LANDSAT_SENSORS['LC08']
+            landsat_collection = (landsat.collection()
                                 .filterBounds(polygon)
                                 .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                                .filter(ee.Filter.lt('CLOUD_COVER', 20))
-                                .sort('CLOUD_COVER'))
+                                .filter(ee.Filter.lt(landsat.cloud_property, 20))
+                                .sort(landsat.cloud_property))
             
             # Get best images
             s2_image = s2_collection.first()
@@ -118,40 +162,39 @@ class GeographicService:
             # Calculate indices
             indices = GeographicService._calculate_spectral_indices(s2_image, landsat_image, polygon)
             
+            # Thumbnail cache keys include the analysis window
+            window = (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+            
+            if image_mode == "filmstrip":
+                # One sprite with all four indices, frames in MULTI_INDEX_VISUALIZATION order
+                sprite_url = GeographicService._thumbnail_url(
+                    lambda: EarthEngineService.filmstrip(
+                        [indices[name].visualize(**vis) for name, vis in MULTI_INDEX_VISUALIZATION.items()],
+                        list(MULTI_INDEX_VISUALIZATION),
+                        polygon, width, height
+                    )['url'],
+                    coordinates, 'multi-index-sprite', width, height, *window
+                )
+                return {
+                    'url': sprite_url,
+                    **EarthEngineService.filmstrip_layout(list(MULTI_INDEX_VISUALIZATION), width, height)
+                }
+            
+            def thumb_url(name: str, vis: Dict[str, Any]) -> str:
+                return GeographicService._thumbnail_url(
+                    lambda: indices[name].getThumbURL({
+                        'region': polygon,
+                        'dimensions': f'{width}x{height}',
+                        'format': 'png',
+                        **vis
+                    }),
+                    coordinates, name, width, height, *window
+                )
+            
             # Generate image URLs
             return {
-                'ndvi_url': indices['ndvi'].getThumbURL({
-                    'region': polygon,
-                    'dimensions': f'{width}x{height}',
-                    'format': 'png',
-                    'palette': ['red', 'yellow', 'green'],
-                    'min': -1,
-                    'max': 1
-                }),
-                'wetness_url': indices['wetness'].getThumbURL({
-                    'region': polygon,
-                    'dimensions': f'{width}x{height}',
-                    'format': 'png',
-                    'palette': ['brown', 'yellow', 'blue'],
-                    'min': -2000,
-                    'max': 2000
-                }),
-                'dryness_url': indices['dryness'].getThumbURL({
-                    'region': polygon,
-                    'dimensions': f'{width}x{height}',
-                    'format': 'png',
-                    'palette': ['blue', 'yellow', 'red'],
-                    'min': -2000,
-                    'max': 4000
-                }),
-                'heat_url': indices['heat'].getThumbURL({
-                    'region': polygon,
-                    'dimensions': f'{width}x{height}',
-                    'format': 'png',
-                    'palette': ['blue', 'cyan', 'yellow', 'red'],
-                    'min': 250,
-                    'max': 350
-                })
+                f'{name}_url': thumb_url(name, vis)
+                for name, vis in MULTI_INDEX_VISUALIZATION.items()
             }
             
         except Exception as e:
@@ -163,23 +206,14 @@ class GeographicService:
         """Calculate spectral indices from satellite imagery"""
         try:
             # NDVI from Sentinel-2
-            ndvi = s2_image.normalizedDifference(['B8', 'B4']).rename('NDVI')
+            ndvi = SENTINEL2.ndvi(s2_image)
             
             # Tasseled Cap components from Landsat 8
-            wetness = (landsat_image.select('SR_B2').multiply(0.1511)
-                    .add(landsat_image.select('SR_B3').multiply(0.1973))
-                    .add(landsat_image.select('SR_B4').multiply(0.3283))
-                    .add(landsat_image.select('SR_B5').multiply(0.3407))
-                    .add(landsat_image.select('SR_B6').multiply(-0.7117))
-                    .add(landsat_image.select('SR_B7').multiply(-0.4559))).rename('Wetness')
+            landsat = LANDSAT_SENSORS['LC08']
+            wetness = landsat.wetness(landsat_image)
             
             # Brightness (for dryness calculation)
-            brightness = (landsat_image.select('SR_B2').multiply(0.3029)
-                        .add(landsat_image.select('SR_B3').multiply(0.2786))
-                        .add(landsat_image.select('SR_B4').multiply(0.4733))
-                        .add(landsat_image.select('SR_B5').multiply(0.5599))
-                        .add(landsat_image.select('SR_B6').multiply(0.5080))
-                        .add(landsat_image.select('SR_B7').multiply(0.1872))).rename('Brightness')
+            brightness = landsat.brightness(landsat_image)
             
             # Dryness (inverse of wetness)
             dryness = brightness.subtract(wetness).rename('Dryness')
@@ -193,11 +227,12 @@ class GeographicService:
                             .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
                             .select('LST_Day_1km'))
             
-            if lst_collection.size().getInfo() > 0:
-                heat = lst_collection.mean().multiply(0.02).rename('Heat')
-            else:
-                # Fallback to constant temperature
-                heat = ee.Image.constant(298).rename('Heat')  # ~25°C in Kelvin
+            # Fallback to constant temperature (~25°C in Kelvin) when there is no MODIS data
+            heat = ee.Image(ee.Algorithms.If(
+                lst_collection.size().gt(0),
+                lst_collection.mean().multiply(0.02),
+                ee.Image.constant(298)
+            )).rename('Heat')
             
             return {
                 'ndvi': ndvi,
@@ -219,51 +254,42 @@ class GeographicService:
     
     @staticmethod
     def calculate_area_sqm(coordinates: List[List[float]]) -> float:
-        """Calculate polygon area in square meters using Earth Engine"""
+        """Calculate polygon area in square meters on the WGS84 ellipsoid (computed locally, no Earth Engine call)
+        
+        Raises ValueError for rings that are out of range, degenerate or self-intersecting.
+        """
         try:
-            GeographicService.initialize_earth_engine()
-            
-            polygon = ee.Geometry.Polygon(coordinates)
-            area = polygon.area().getInfo()
-            return area
+            try:
+                validate_polygon(coordinates)
+            except TypeError:
+                raise ValueError("Invalid polygon coordinates")
+            return geodesic_area(coordinates)
             
         except Exception as e:
             logger.error(f"Error calculating area: {e}")
             raise
     
     @staticmethod
-    def extract_green_percentage_area(coordinates: List[List[float]], total_area: float) -> float:
+    def extract_green_percentage_area(context: CompositeContext, total_area: float) -> float:
         """Extract green area percentage using NDVI > 0.2"""
         try:
             GeographicService.initialize_earth_engine()
             
-            polygon = ee.Geometry.Polygon(coordinates)
-            
-            # Get recent Sentinel-2 image
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365)  # Last year
-            
-            s2_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
-                           .filterBounds(polygon)
-                           .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                           .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20)))
-            
-            # Calculate median composite
-            image = s2_collection.median()
+            if context.tiling is not None:
+                return GeographicService._sentinel2_tile_statistics(context)['green_area']
             
-            # Calculate NDVI
-            ndvi = image.normalizedDifference(['B8', 'B4']).rename('NDVI')
+            # Calculate NDVI from the shared Sentinel-2 median composite
+            ndvi = SENTINEL2.ndvi(context.s2_median)
             
             # Mask for green areas (NDVI > 0.2)
             green_mask = ndvi.gt(0.2)
             
             # Calculate green area
-            green_area = green_mask.multiply(ee.Image.pixelArea()).reduceRegion(
+            green_area = EarthEngineService.get_info(green_mask.multiply(ee.Image.pixelArea()).reduceRegion(
                 reducer=ee.Reducer.sum(),
-                geometry=polygon,
-                scale=10,
-                maxPixels=1e9
-            ).getInfo()
+                geometry=context.polygon,
+                **context.reduction.params('sentinel2')
+            ))
             
             return green_area.get('NDVI', 0)
             
@@ -272,38 +298,26 @@ class GeographicService:
             return 0
     
     @staticmethod
-    def extract_water_percentage_area(coordinates: List[List[float]], total_area: float) -> float:
+    def extract_water_percentage_area(context: CompositeContext, total_area: float) -> float:
         """Extract water area percentage using MNDWI > 0"""
         try:
             GeographicService.initialize_earth_engine()
             
-            polygon = ee.Geometry.Polygon(coordinates)
-            
-            # Get recent Sentinel-2 image
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365)  # Last year
-            
-            s2_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
-                           .filterBounds(polygon)
-                           .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                           .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20)))
-            
-            # Calculate median composite
-            image = s2_collection.median()
+            if context.tiling is not None:
+                return GeographicService._sentinel2_tile_statistics(context)['water_area']
             
             # Calculate MNDWI (Modified Normalized Difference Water Index)
-            mndwi = image.normalizedDifference(['B3', 'B11']).rename('MNDWI')
+            mndwi = SENTINEL2.mndwi(context.s2_median)
             
             # Mask for water areas (MNDWI > 0)
             water_mask = mndwi.gt(0)
             
             # Calculate water area
-            water_area = water_mask.multiply(ee.Image.pixelArea()).reduceRegion(
+            water_area = EarthEngineService.get_info(water_mask.multiply(ee.Image.pixelArea()).reduceRegion(
                 reducer=ee.Reducer.sum(),
-                geometry=polygon,
-                scale=10,
-                maxPixels=1e9
-            ).getInfo()
+                geometry=context.polygon,
+                **context.reduction.params('sentinel2')
+            ))
             
             return water_area.get('MNDWI', 0)
             
@@ -312,33 +326,20 @@ class GeographicService:
             return 0
     
     @staticmethod
-    def extract_air_quality_aod(coordinates: List[List[float]]) -> float:
+    def extract_air_quality_aod(context: CompositeContext) -> float:
         """Extract air quality using AOD from Sentinel-5P TROPOMI"""
         try:
             GeographicService.initialize_earth_engine()
             
-            polygon = ee.Geometry.Polygon(coordinates)
-            
-            # Get last 12 months of data
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365)
-            
-            # Sentinel-5P TROPOMI AOD data
-            aod_collection = (ee.ImageCollection('COPERNICUS/S5P/NRTI/L3_AER_AI')
-                            .filterBounds(polygon)
-                            .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                            .select('absorbing_aerosol_index'))
-            
             # Calculate annual average
-            aod_mean = aod_collection.mean()
+            aod_mean = context.aod_collection.mean()
             
             # Get average AOD for the region
-            aod_value = aod_mean.reduceRegion(
+            aod_value = EarthEngineService.get_info(aod_mean.reduceRegion(
                 reducer=ee.Reducer.mean(),
-                geometry=polygon,
-                scale=1000,
-                maxPixels=1e9
-            ).getInfo()
+                geometry=context.polygon,
+                **context.reduction.params('sentinel5p_aod')
+            ))
             
             # Convert to AOD scale (0-1)
             aod = aod_value.get('absorbing_aerosol_index', 0.3)
@@ -349,142 +350,94 @@ class GeographicService:
             return 0.3  # Default moderate value
     
     @staticmethod
-    def extract_land_surface_temperature(coordinates: List[List[float]]) -> float:
+    def extract_land_surface_temperature(context: CompositeContext) -> float:
         """Extract land surface temperature from MODIS"""
         try:
             GeographicService.initialize_earth_engine()
             
-            polygon = ee.Geometry.Polygon(coordinates)
-            
-            # Get last 12 months of MODIS LST data
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365)
+            # Get average LST (Celsius) for the region, 25°C when there is no MODIS data
+            lst_value = EarthEngineService.get_info(EarthEngineService.regional_mean_or_default(
+                context.lst_collection, context.lst_celsius, context.polygon, 'LST_Day_1km', 1000, 25.0,
+                context.reduction.params('modis_lst')
+            ))
             
-            # MODIS Land Surface Temperature
-            lst_collection = (ee.ImageCollection('MODIS/061/MOD11A1')
-                            .filterBounds(polygon)
-                            .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                            .select('LST_Day_1km'))
-            
-            # Check if collection has images
-            if lst_collection.size().getInfo() == 0:
+            if lst_value is None:
                 logger.warning("No MODIS LST data available for the specified region and time period")
                 return 25.0
-            
-            # Calculate annual average
-            lst_mean = lst_collection.mean()
-            
-            # Convert from Kelvin to Celsius and scale
-            lst_celsius = lst_mean.multiply(0.02).subtract(273.15)
-            
-            # Get average LST for the region
-            lst_result = lst_celsius.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=polygon,
-                scale=1000,
-                maxPixels=1e9
-            ).getInfo()
-            
-            lst_value = lst_result.get('LST_Day_1km')
-            return lst_value if lst_value is not None else 25.0
+            return lst_value
             
         except Exception as e:
             logger.error(f"Error extracting land surface temperature: {e}")
             return 25.0  # Default temperature
     
     @staticmethod
-    def extract_eqi_components(coordinates: List[List[float]]) -> Dict[str, float]:
-        """Extract all components needed for EQI calculation"""
+    def extract_eqi_components(context: CompositeContext, 
+                               land_surface_temperature: Optional[float] = None) -> Dict[str, float]:
+        """Extract all components needed for EQI calculation
+        
+        Pass an already extracted land_surface_temperature to avoid computing it twice.
+        """
         try:
             GeographicService.initialize_earth_engine()
             
-            polygon = ee.Geometry.Polygon(coordinates)
-            
-            # Get recent Sentinel-2 and Landsat data
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365)
-            
-            # Sentinel-2 for NDVI and NDBSI
-            s2_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
-                           .filterBounds(polygon)
-                           .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                           .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20)))
-            
-            s2_image = s2_collection.median()
-            
-            # Calculate NDVI
-            ndvi = s2_image.normalizedDifference(['B8', 'B4'])
-            mean_ndvi = ndvi.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=polygon,
-                scale=10,
-                maxPixels=1e9
-            ).getInfo().get('nd', 0.3)
-            
-            # Calculate NDBSI (Normalized Difference Bareness and Soil Index)
-            # NDBSI = (SWIR - TIR) / (SWIR + TIR) - using B11 and B12
-            swir1 = s2_image.select('B11')
-            swir2 = s2_image.select('B12')
-            ndbsi = swir1.subtract(swir2).divide(swir1.add(swir2))
-            
-            mean_ndbsi = ndbsi.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=polygon,
-                scale=10,
-                maxPixels=1e9
-            ).getInfo().get('B11', 0.3)
-            
-            # Landsat for Tasseled Cap Wetness
-            landsat_collection = (ee.ImageCollection('LANDSAT/LC08/C02/T1_L2')
-                                .filterBounds(polygon)
-                                .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                                .filter(ee.Filter.lt('CLOUD_COVER', 20)))
+            polygon = context.polygon
+            s2_image = context.s2_median
             
-            if landsat_collection.size().getInfo() > 0:
-                landsat_image = landsat_collection.median()
+            if context.tiling is not None:
+                # Large polygons: means merged from the tiled Sentinel-2 reduction
+                statistics = GeographicService._sentinel2_tile_statistics(context)
+                mean_ndvi = statistics['NDVI'] if statistics['NDVI'] is not None else 0.3
+                mean_ndbsi = statistics['NDBSI'] if statistics['NDBSI'] is not None else 0.3
+            else:
+                # Calculate NDVI
+                ndvi = SENTINEL2.ndvi(s2_image)
+                mean_ndvi = EarthEngineService.get_info(ndvi.reduceRegion(
+                    reducer=ee.Reducer.mean(),
+                    geometry=polygon,
+                    **context.reduction.params('sentinel2')
+                )).get('NDVI', 0.3)
                 
-                # Tasseled Cap Wetness coefficients for Landsat 8
-                wetness = (landsat_image.select('SR_B2').multiply(0.1511)
-                          .add(landsat_image.select('SR_B3').multiply(0.1973))
-                          .add(landsat_image.select('SR_B4').multiply(0.3283))
-                          .add(landsat_image.select('SR_B5').multiply(0.3407))
-                          .add(landsat_image.select('SR_B6').multiply(-0.7117))
-                          .add(landsat_image.select('SR_B7').multiply(-0.4559)))
+                # Calculate NDBSI (Normalized Difference Bareness and Soil Index)
+                # NDBSI = (SWIR1 - SWIR2) / (SWIR1 + SWIR2) - using B11 and B12
+                ndbsi = SENTINEL2.ndbsi(s2_image)
                 
-                tasseled_cap_wetness = wetness.reduceRegion(
+                mean_ndbsi = EarthEngineService.get_info(ndbsi.reduceRegion(
                     reducer=ee.Reducer.mean(),
                     geometry=polygon,
-                    scale=30,
-                    maxPixels=1e9
-                ).getInfo().get('SR_B2', 0.0)
-                
-                # Normalize to -1 to 1 range
-                tasseled_cap_wetness = max(-1, min(1, tasseled_cap_wetness / 10000))
-            else:
-                tasseled_cap_wetness = 0.0
+                    **context.reduction.params('sentinel2')
+                )).get('NDBSI', 0.3)
+            
+            # Tasseled Cap Wetness for the context's Landsat sensor, 0 when there is no Landsat data
+            wetness = context.landsat_sensor.wetness(context.landsat_median)
+            tasseled_cap_wetness = EarthEngineService.get_info(EarthEngineService.regional_mean_or_default(
+                context.landsat_collection, wetness, polygon, 'Wetness', 30, 0.0,
+                context.reduction.params('landsat')
+            )) or 0.0
             
-            # Reuse existing LST method
-            mean_lst_for_eqi = GeographicService.extract_land_surface_temperature(coordinates)
+            # Normalize to -1 to 1 range
+            tasseled_cap_wetness = max(-1, min(1, tasseled_cap_wetness / 10000))
+            
+            # Reuse the LST already extracted by the caller when available
+            if land_surface_temperature is None:
+                land_surface_temperature = GeographicService.extract_land_surface_temperature(context)
+            mean_lst_for_eqi = land_surface_temperature
             
             # Get real PM2.5 from CAMS (Copernicus Atmosphere Monitoring Service)
             try:
-                pm25_collection = (ee.ImageCollection('ECMWF/CAMS/NRT')
-                                 .filterBounds(polygon)
-                                 .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                                 .select('particulate_matter_d_less_than_25_um_surface'))
+                pm25_collection = context.pm25_collection
                 
-                if pm25_collection.size().getInfo() > 0:
-                    pm25_mean = pm25_collection.mean()
-                    pm25_result = pm25_mean.reduceRegion(
-                        reducer=ee.Reducer.mean(),
-                        geometry=polygon,
-                        scale=40000,  # CAMS data resolution is ~40km
-                        maxPixels=1e9
-                    ).getInfo()
-                    
-                    pm25_value = pm25_result.get('particulate_matter_d_less_than_25_um_surface')
-                    # Convert from kg/m³ to µg/m³ (multiply by 1e9)
-                    pm25 = pm25_value * 1e9 if pm25_value is not None else 20.0
+                # Empty collections fall back to 20 µg/m³ (2e-8 kg/m³) server-side
+                pm25_value = EarthEngineService.get_info(EarthEngineService.regional_mean_or_default(
+                    pm25_collection, pm25_collection.mean(), polygon,
+                    'particulate_matter_d_less_than_25_um_surface',
+                    40000,  # CAMS data resolution is ~40km
+                    20.0e-9,
+                    context.reduction.params('cams_pm25')
+                ))
+                
+                # Convert from kg/m³ to µg/m³ (multiply by 1e9)
+                if pm25_value is not None:
+                    pm25 = pm25_value * 1e9
                 else:
                     logger.warning("No PM2.5 data available, using default value")
                     pm25 = 20.0
@@ -513,42 +466,397 @@ class GeographicService:
 
 
     @staticmethod
-    def extract_all_environmental_indicators(coordinates: List[List[float]]) -> Dict[str, float]:
-        """Extract all environmental indicators from satellite imagery"""
-        try:
-            logger.info(f"Starting environmental indicator extraction for coordinates: {coordinates}")
-            
-            # Validate coordinates
-            if not GeographicService.validate_polygon(coordinates):
-                raise ValueError("Invalid polygon coordinates")
-            
-            # Calculate total area
-            total_area = GeographicService.calculate_area_sqm(coordinates)
-            logger.info(f"Total area calculated: {total_area} sqm")
-            
-            # Extract individual indicators
-            green_area = GeographicService.extract_green_percentage_area(coordinates, total_area)
-            water_area = GeographicService.extract_water_percentage_area(coordinates, total_area)
-            air_quality_aod = GeographicService.extract_air_quality_aod(coordinates)
-            land_surface_temperature = GeographicService.extract_land_surface_temperature(coordinates)
-            eqi_components = GeographicService.extract_eqi_components(coordinates)
-            
-            result = {
-                'green_area': green_area,
-                'total_area': total_area,
-                'water_area': water_area,
-                'air_quality_aod': air_quality_aod,
-                'land_surface_temperature': land_surface_temperature,
-                'mean_ndvi': eqi_components['mean_ndvi'],
-                'tasseled_cap_wetness': eqi_components['tasseled_cap_wetness'],
-                'mean_lst_for_eqi': eqi_components['mean_lst_for_eqi'],
-                'ndbsi': eqi_components['ndbsi'],
-                'pm25': eqi_components['pm25']
+    def _sentinel2_tile_statistics(context: CompositeContext) -> Dict[str, Optional[float]]:
+        """Green/water pixel area sums and NDVI/NDBSI means of a large polygon, reduced tile by tile"""
+        s2_image = context.s2_median
+        ndvi = SENTINEL2.ndvi(s2_image)
+        mndwi = SENTINEL2.mndwi(s2_image)
+        ndbsi = SENTINEL2.ndbsi(s2_image)
+        
+        image = (ndvi.gt(0.2).multiply(ee.Image.pixelArea()).rename('green_area')
+                 .addBands(mndwi.gt(0).multiply(ee.Image.pixelArea()).rename('water_area'))
+                 .addBands(ndvi)
+                 .addBands(ndbsi))
+        return context.tiling.reduce('sentinel2', image, ['green_area', 'water_area'], ['NDVI', 'NDBSI'], 'sentinel2')
+    
+    @staticmethod
+    def _build_indicator_dictionary(context: CompositeContext) -> ee.Dictionary:
+        """Build every environmental indicator as one server-side dictionary.
+        
+        Empty collections map to null values instead of failing the whole
+        computation; defaults are applied client-side by _finalize_indicators.
+        Large polygons leave out the Sentinel-2 statistics, which are reduced
+        tile by tile instead (see _sentinel2_tile_statistics).
+        """
+        polygon = context.polygon
+        s2_image = context.s2_median
+        
+        ndvi = SENTINEL2.ndvi(s2_image)
+        mndwi = SENTINEL2.mndwi(s2_image)
+        ndbsi = SENTINEL2.ndbsi(s2_image)
+        
+        if context.tiling is None:
+            # Pixel area sums and means at the Sentinel-2 scale share one reduceRegion
+            s2_stats = (ndvi.gt(0.2).multiply(ee.Image.pixelArea()).rename('green_area')
+                        .addBands(mndwi.gt(0).multiply(ee.Image.pixelArea()).rename('water_area'))
+                        .reduceRegion(
+                            reducer=ee.Reducer.sum(),
+                            geometry=polygon,
+                            **context.reduction.params('sentinel2')
+                        ))
+            s2_means = ndvi.addBands(ndbsi).reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=polygon,
+                **context.reduction.params('sentinel2')
+            )
+            sentinel2 = {
+                'green_area': s2_stats.get('green_area'),
+                'water_area': s2_stats.get('water_area'),
+                'mean_ndvi': s2_means.get('NDVI'),
+                'ndbsi': s2_means.get('NDBSI')
             }
-            
-            logger.info("Environmental indicators extracted successfully")
+        else:
+            # Large polygons: the Sentinel-2 statistics come from the tiled reduction
+            sentinel2 = {}
+        
+        # Sentinel-5P aerosol index
+        aod = ee.Algorithms.If(
+            context.aod_collection.size().gt(0),
+            context.aod_collection.mean().reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=polygon,
+                **context.reduction.params('sentinel5p_aod')
+            ).get('absorbing_aerosol_index'),
+            None
+        )
+        
+        # MODIS land surface temperature in Celsius
+        lst = ee.Algorithms.If(
+            context.lst_collection.size().gt(0),
+            context.lst_celsius.reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=polygon,
+                **context.reduction.params('modis_lst')
+            ).get('LST_Day_1km'),
+            None
+        )
+        
+        # Landsat Tasseled Cap Wetness
+        wetness_image = context.landsat_sensor.wetness(context.landsat_median)
+        wetness = ee.Algorithms.If(
+            context.landsat_collection.size().gt(0),
+            wetness_image.reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=polygon,
+                **context.reduction.params('landsat')
+            ).get('Wetness'),
+            None
+        )
+        
+        # CAMS PM2.5 (kg/m³)
+        pm25 = ee.Algorithms.If(
+            context.pm25_collection.size().gt(0),
+            context.pm25_collection.mean().reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=polygon,
+                **context.reduction.params('cams_pm25')
+            ).get('particulate_matter_d_less_than_25_um_surface'),
+            None
+        )
+        
+        return ee.Dictionary({
+            **sentinel2,
+            'aod': aod,
+            'lst': lst,
+            'wetness': wetness,
+            'pm25': pm25
+        })
+    
+    @staticmethod
+    def _finalize_indicators(raw: Dict[str, Any], total_area: float) -> Dict[str, float]:
+        """Apply client-side defaults, unit conversions and clamping to raw indicator values"""
+        aod = raw.get('aod')
+        lst = raw.get('lst')
+        lst = lst if lst is not None else 25.0
+        mean_ndvi = raw.get('mean_ndvi')
+        mean_ndvi = mean_ndvi if mean_ndvi is not None else 0.3
+        ndbsi = raw.get('ndbsi')
+        ndbsi = ndbsi if ndbsi is not None else 0.3
+        wetness = raw.get('wetness')
+        pm25 = raw.get('pm25')
+        
+        return {
+            'green_area': raw.get('green_area') or 0,
+            'total_area': total_area,
+            'water_area': raw.get('water_area') or 0,
+            'air_quality_aod': max(0, min(1, abs(aod) / 10)) if aod is not None else 0.3,
+            'land_surface_temperature': lst,
+            'mean_ndvi': max(0, min(1, mean_ndvi)),
+            'tasseled_cap_wetness': max(-1, min(1, wetness / 10000)) if wetness is not None else 0.0,
+            'mean_lst_for_eqi': lst,
+            'ndbsi': max(0, min(1, abs(ndbsi))),
+            # Convert from kg/m³ to µg/m³ (multiply by 1e9)
+            'pm25': max(0, pm25 * 1e9) if pm25 is not None else 20.0
+        }
+    
+    @staticmethod
+    def extract_all_environmental_indicators_single_request(coordinates: List[List[float]],
+                                                            context: Optional[CompositeContext] = None) -> Dict[str, float]:
+        """Extract all environmental indicators with a single Earth Engine round trip"""
+        GeographicService.initialize_earth_engine()
+        
+        if context is None:
+            context = CompositeContext.for_recent_period(coordinates)
+        raw = EarthEngineService.get_info(GeographicService._build_indicator_dictionary(context))
+        if context.tiling is not None:
+            statistics = GeographicService._sentinel2_tile_statistics(context)
+            raw.update({
+                'green_area': statistics['green_area'],
+                'water_area': statistics['water_area'],
+                'mean_ndvi': statistics['NDVI'],
+                'ndbsi': statistics['NDBSI']
+            })
+        
+        return GeographicService._finalize_indicators(raw, GeographicService.calculate_area_sqm(coordinates))
+    
+    @staticmethod
+    def extract_all_environmental_indicators(coordinates: List[List[float]], 
+                                             single_request: Optional[bool] = None,
+                                             use_cache: Optional[bool] = None) -> Dict[str, float]:
+        """Extract all environmental indicators from satellite imagery
+        
+        Results are cached per canonical polygon and analysis window (default:
+        settings.INDICATOR_CACHE_ENABLED). Reduction scales follow the polygon's
+        area (see ReductionPlan) and are reported under 'analysis_resolution'. With single_request (default:
+        settings.GEE_SINGLE_ROUND_TRIP) every indicator is computed server-side and
+        fetched in one getInfo(); if that computation fails the per-indicator
+        extractors are used instead.
+        """
+        try:
+            logger.info(f"Starting environmental indicator extraction for a polygon of {len(coordinates)} points")
+            
+            # Validate, normalize and simplify the polygon
+            coordinates = GeographicService.prepare_polygon(coordinates)
+            
+            if use_cache is None:
+                use_cache = settings.INDICATOR_CACHE_ENABLED
+            
+            # Build the shared composites once for all extractors
+            context = CompositeContext.for_recent_period(coordinates)
+            cache_key = canonical_polygon_key(coordinates, context.start, context.end)
+            
+            if use_cache:
+                cached = indicator_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Environmental indicators served from cache")
+                    return cached
+            
+            result = GeographicService._compute_environmental_indicators(context, single_request)
+            # Report the resolution every dataset was reduced at
+            result['analysis_resolution'] = context.reduction.describe()
+            if context.tiling is not None:
+                tiling = context.tiling.describe()
+                result['analysis_resolution']['datasets'].update(tiling.pop('datasets'))
+                result['analysis_resolution']['tiling'] = tiling
+            
+            if use_cache:
+                indicator_cache.put(cache_key, result)
             return result
             
         except Exception as e:
             logger.error(f"Error extracting environmental indicators: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    @staticmethod
+    def _feature_id(feature: Dict[str, Any], index: int) -> str:
+        """Feature `id`, else its `id` property, else its index in the collection"""
+        feature_id = feature.get('id')
+        if feature_id is None:
+            feature_id = (feature.get('properties') or {}).get('id')
+        return str(feature_id if feature_id is not None else index)
+    
+    @staticmethod
+    def _area_bands(areas: Dict[str, float], ratio: float) -> List[List[str]]:
+        """Feature ids grouped by area, smallest first, so that no group's largest area exceeds ratio times its smallest"""
+        bands: List[List[str]] = []
+        band_floor = None
+        for feature_id in sorted(areas, key=areas.get):
+            if band_floor is None or areas[feature_id] > band_floor * ratio:
+                bands.append([])
+                band_floor = areas[feature_id]
+            bands[-1].append(feature_id)
+        return bands
+    
+    @staticmethod
+    def _reduce_features(context: CompositeContext, collection: ee.FeatureCollection,
+                         plan: ReductionPlan) -> ee.FeatureCollection:
+        """Every raw indicator of _build_indicator_dictionary as properties of each feature
+        
+        reduceRegions calls are chained through the collection, so all indicators
+        of all features are one computation. Empty collections leave their
+        property unset, which _finalize_indicators turns into its default.
+        """
+        def region_params(dataset: str) -> Dict[str, Any]:
+            # reduceRegions takes no maxPixels or bestEffort
+            params = plan.params(dataset)
+            return {'scale': params['scale'], 'tileScale': params['tileScale']}
+        
+        def mean_if_available(features, source, image, name: str, dataset: str):
+            return ee.FeatureCollection(ee.Algorithms.If(
+                source.size().gt(0),
+                image.reduceRegions(
+                    collection=features,
+                    reducer=ee.Reducer.mean().setOutputs([name]),
+                    **region_params(dataset)
+                ),
+                features
+            ))
+        
+        s2_image = context.s2_median
+        ndvi = SENTINEL2.ndvi(s2_image)
+        mndwi = SENTINEL2.mndwi(s2_image)
+        ndbsi = SENTINEL2.ndbsi(s2_image)
+        
+        collection = (ndvi.gt(0.2).multiply(ee.Image.pixelArea()).rename('green_area')
+                      .addBands(mndwi.gt(0).multiply(ee.Image.pixelArea()).rename('water_area'))
+                      .reduceRegions(collection=collection, reducer=ee.Reducer.sum(), **region_params('sentinel2')))
+        collection = (ndvi.addBands(ndbsi).rename(['mean_ndvi', 'ndbsi'])
+                      .reduceRegions(collection=collection, reducer=ee.Reducer.mean(), **region_params('sentinel2')))
+        
+        collection = mean_if_available(collection, context.aod_collection, context.aod_collection.mean(),
+                                       'aod', 'sentinel5p_aod')
+        collection = mean_if_available(collection, context.lst_collection, context.lst_celsius,
+                                       'lst', 'modis_lst')
+        collection = mean_if_available(collection, context.landsat_collection,
+                                       context.landsat_sensor.wetness(context.landsat_median), 'wetness', 'landsat')
+        collection = mean_if_available(collection, context.pm25_collection, context.pm25_collection.mean(),
+                                       'pm25', 'cams_pm25')
+        
+        # Properties only: the geometries are not sent back
+        return collection.select(
+            ['feature_id', 'green_area', 'water_area', 'mean_ndvi', 'ndbsi', 'aod', 'lst', 'wetness', 'pm25'],
+            None, False
+        )
+    
+    @staticmethod
+    def extract_environmental_indicators_batch(features: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Environmental indicators for every Polygon feature of a GeoJSON FeatureCollection
+        
+        The features share one set of composites, filtered to scenes that
+        intersect them, and every indicator is computed with reduceRegions over
+        the features, fetched with a single getInfo(). reduceRegions uses one
+        scale per call, so features are grouped into area bands
+        (settings.GEO_BATCH_AREA_BAND_RATIO) and each band is reduced at the
+        scale ReductionPlan picks for it; analysis_resolution lists the bands.
+        Results are keyed by feature id; features with invalid geometries,
+        including rings crossing the antimeridian, are reported with their
+        errors and do not fail the batch.
+        """
+        GeographicService.initialize_earth_engine()
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        polygons: Dict[str, List[List[float]]] = {}
+        for index, feature in enumerate(features):
+            feature_id = GeographicService._feature_id(feature, index)
+            if feature_id in results:
+                raise ValueError(f"Duplicate feature id '{feature_id}'")
+            
+            geometry = feature.get('geometry') or {}
+            try:
+                if geometry.get('type') != 'Polygon':
+                    raise ValueError(f"Unsupported geometry type {geometry.get('type')!r}, expected 'Polygon'")
+                rings = geometry.get('coordinates') or []
+                if len(rings) != 1:
+                    raise ValueError("Polygon must have exactly one ring (holes are not supported)")
+                ring = GeographicService.prepare_polygon(rings[0])
+                if crosses_antimeridian(ring):
+                    raise ValueError("Polygon crosses the antimeridian; split it at ±180° into separate features")
+                polygons[feature_id] = ring
+                results[feature_id] = {}
+            except ValueError as e:
+                results[feature_id] = {"errors": [{"loc": ["features", index, "geometry"], "msg": str(e)}]}
+        
+        analysis_resolution = None
+        if polygons:
+            areas = {feature_id: geodesic_area(ring) for feature_id, ring in polygons.items()}
+            features_by_id = {
+                feature_id: ee.Feature(ee.Geometry.Polygon(ring), {'feature_id': feature_id})
+                for feature_id, ring in polygons.items()
+            }
+            context = CompositeContext.for_features(ee.FeatureCollection(list(features_by_id.values())))
+            
+            analysis_resolution = []
+            reduced_bands = []
+            for band in GeographicService._area_bands(areas, settings.GEO_BATCH_AREA_BAND_RATIO):
+                plan = ReductionPlan(areas[band[-1]], smallest_area_sqm=areas[band[0]])
+                analysis_resolution.append({
+                    **plan.describe(),
+                    'smallest_area_sqm': round(plan.smallest_area_sqm, 1),
+                    'feature_ids': band
+                })
+                collection = ee.FeatureCollection([features_by_id[feature_id] for feature_id in band])
+                reduced_bands.append(GeographicService._reduce_features(context, collection, plan))
+            reduced = EarthEngineService.get_info(ee.FeatureCollection(reduced_bands).flatten())
+            
+            for reduced_feature in reduced.get('features', []):
+                raw = reduced_feature.get('properties') or {}
+                feature_id = raw.get('feature_id')
+                results[feature_id] = GeographicService._finalize_indicators(raw, areas[feature_id])
+            for index, feature_id in enumerate(results):
+                if not results[feature_id]:
+                    results[feature_id] = {"errors": [{"loc": ["features", index], "msg": "No result returned"}]}
+            logger.info(f"Environmental indicators extracted for {len(polygons)} features "
+                        f"in {len(reduced_bands)} area bands in a single request")
+        
+        failed = sum(1 for result in results.values() if "errors" in result)
+        return {
+            "count": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "analysis_resolution": analysis_resolution,
+            "results": results
+        }
+    
+    @staticmethod
+    def _compute_environmental_indicators(context: CompositeContext,
+                                          single_request: Optional[bool] = None) -> Dict[str, float]:
+        """Compute all environmental indicators for a context in Earth Engine"""
+        coordinates = context.coordinates
+        
+        if single_request is None:
+            single_request = settings.GEE_SINGLE_ROUND_TRIP
+        
+        if single_request:
+            try:
+                result = GeographicService.extract_all_environmental_indicators_single_request(coordinates, context)
+                logger.info("Environmental indicators extracted successfully in a single request")
+                return result
+            except Exception as e:
+                logger.warning(f"Single-request extraction failed, falling back to per-indicator extraction: {e}")
+        
+        # Calculate total area
+        total_area = GeographicService.calculate_area_sqm(coordinates)
+        logger.info(f"Total area calculated: {total_area} sqm")
+        
+        # Extract individual indicators
+        green_area = GeographicService.extract_green_percentage_area(context, total_area)
+        water_area = GeographicService.extract_water_percentage_area(context, total_area)
+        air_quality_aod = GeographicService.extract_air_quality_aod(context)
+        land_surface_temperature = GeographicService.extract_land_surface_temperature(context)
+        eqi_components = GeographicService.extract_eqi_components(context, land_surface_temperature)
+        
+        result = {
+            'green_area': green_area,
+            'total_area': total_area,
+            'water_area': water_area,
+            'air_quality_aod': air_quality_aod,
+            'land_surface_temperature': land_surface_temperature,
+            'mean_ndvi': eqi_components['mean_ndvi'],
+            'tasseled_cap_wetness': eqi_components['tasseled_cap_wetness'],
+            'mean_lst_for_eqi': eqi_components['mean_lst_for_eqi'],
+            'ndbsi': eqi_components['ndbsi'],
+            'pm25': eqi_components['pm25']
+        }
+        
+        logger.info("Environmental indicators extracted successfully")
+        return result
@@ -0,0 +1,122 @@
+# app/services/historical_store.py
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the yearly indicator computation changes so stale rows are ignored
+INDICATOR_ALGORITHM_VERSION = "1"
+
+
+class HistoricalIndicatorStore:
+    """SQLite store for yearly indicators of years whose source data no longer changes.
+
+    Rows are keyed by (polygon hash, year, sensor, algorithm version). The
+    database runs in WAL mode so every uvicorn worker can read and write the
+    same file, and it survives restarts. Store errors are logged and treated
+    as misses so they never fail a request.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    connection.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS yearly_indicators (
+                            polygon_hash TEXT NOT NULL,
+                            year INTEGER NOT NULL,
+                            sensor TEXT NOT NULL,
+                            algorithm_version TEXT NOT NULL,
+                            indicators TEXT NOT NULL,
+                            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                            PRIMARY KEY (polygon_hash, year, sensor, algorithm_version)
+                        )
+                        """
+                    )
+                    connection.commit()
+                    self._schema_ready = True
+
+        return connection
+
+    def get_many(self, polygon_hash: str, sensors_by_year: Dict[int, str],
+                 algorithm_version: str = INDICATOR_ALGORITHM_VERSION) -> Dict[int, Dict[str, float]]:
+        """Stored indicators for the given years, keyed by year (missing years are omitted)"""
+        if not sensors_by_year:
+            return {}
+
+        try:
+            connection = self._connection()
+            placeholders = ",".join("?" for _ in sensors_by_year)
+            rows = connection.execute(
+                f"""
+                SELECT year, sensor, indicators FROM yearly_indicators
+                WHERE polygon_hash = ? AND algorithm_version = ? AND year IN ({placeholders})
+                """,
+                [polygon_hash, algorithm_version, *sensors_by_year]
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Historical indicator store read failed: {e}")
+            return {}
+
+        return {
+            year: json.loads(indicators)
+            for year, sensor, indicators in rows
+            if sensors_by_year.get(year) == sensor
+        }
+
+    def put_many(self, polygon_hash: str, indicators_by_year: Dict[int, Dict[str, float]],
+                 sensors_by_year: Dict[int, str], algorithm_version: str = INDICATOR_ALGORITHM_VERSION):
+        """Store indicators for the given years"""
+        if not indicators_by_year:
+            return
+
+        try:
+            connection = self._connection()
+            with connection:
+                connection.executemany(
+                    """
+                    INSERT OR REPLACE INTO yearly_indicators
+                        (polygon_hash, year, sensor, algorithm_version, indicators)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (polygon_hash, year, sensors_by_year[year], algorithm_version, json.dumps(indicators))
+                        for year, indicators in indicators_by_year.items()
+                    ]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Historical indicator store write failed: {e}")
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        """Number of stored rows"""
+        try:
+            count = self._connection().execute("SELECT COUNT(*) FROM yearly_indicators").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Historical indicator store stats failed: {e}")
+            count = None
+        return {"rows": count, "algorithm_version": INDICATOR_ALGORITHM_VERSION}
+
+
+historical_store = HistoricalIndicatorStore(settings.HISTORICAL_STORE_PATH)
@@ -0,0 +1,255 @@
+# app/services/profiles.py
+import math
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Normalization thresholds of the default profile
+DEFAULT_THRESHOLDS = {
+    # Environmental thresholds
+    'gpa_max': 40,  # 40% green area as benchmark
+    'wpa_max': 10,  # 10% water area as benchmark
+    'aq_max': 1.0,   # AOD of 1.0 as high pollution threshold
+    'lst_min': 15,   # 15°C as minimum LST
+    'lst_max': 35,   # 35°C as maximum LST
+    'ndvi_min': 0,   # NDVI minimum
+    'ndvi_max': 1,   # NDVI maximum
+    'wet_min': -0.5, # Wetness minimum
+    'wet_max': 0.5,  # Wetness maximum
+    'ndbsi_min': 0,  # NDBSI minimum
+    'ndbsi_max': 1,  # NDBSI maximum
+    'pm25_max': 100, # PM2.5 maximum (µg/m³)
+    'pc1_min': -1,   # PC1 minimum (assumed)
+    'pc1_max': 1,    # PC1 maximum (assumed)
+
+    # Social thresholds
+    'cr_max': 100,   # 100 crimes per 1000 as high threshold
+    'travel_time_max': 30,  # 30 minutes as maximum acceptable travel time
+    'w_max': 140,    # 140 intersections per sq mile
+
+    # Economic thresholds
+    'mhi_max': 100000,  # $100,000 as high income benchmark
+    'ur_max': 30,      # 30% unemployment as maximum
+}
+
+# Indicator weights of the default profile, in percent of the final index.
+# A category's weight is the sum of its indicator weights.
+DEFAULT_WEIGHTS = {
+    'environmental': {
+        'green_percentage_area': 8,
+        'water_percentage_area': 6,
+        'air_quality': 8,
+        'land_surface_temperature': 6,
+        'ecological_quality_index': 12
+    },
+    # 30% divided equally among 8 indicators
+    'social': {
+        'crime_rate': 3.75,
+        'education_level': 3.75,
+        'access_to_transit': 3.75,
+        'access_to_schools': 3.75,
+        'access_to_hospitals': 3.75,
+        'access_to_fire_stations': 3.75,
+        'access_to_police': 3.75,
+        'walkability': 3.75
+    },
+    # 30% divided equally among 3 indicators
+    'economic': {
+        'median_household_income': 10,
+        'unemployment_rate': 10,
+        'housing_affordability': 10
+    }
+}
+
+CATEGORIES = ['environmental', 'social', 'economic']
+
+# How each indicator is normalized to 0-1:
+#   higher  - min(1, value / max)           (higher is better)
+#   lower   - max(0, 1 - value / max)       (lower is better)
+#   range   - max(0, 1 - (value - min) / (max - min))
+#   percent - value / 100
+#   unit    - already 0-1
+# (indicator, normalized key, category, kind, threshold keys)
+NORMALIZATION = [
+    ('green_percentage_area', 'gpa_normalized', 'environmental', 'higher', ('gpa_max',)),
+    ('water_percentage_area', 'wpa_normalized', 'environmental', 'higher', ('wpa_max',)),
+    ('air_quality', 'aq_normalized', 'environmental', 'lower', ('aq_max',)),
+    ('land_surface_temperature', 'lst_normalized', 'environmental', 'range', ('lst_min', 'lst_max')),
+    ('ecological_quality_index', 'eqi_normalized', 'environmental', 'unit', ()),
+    ('crime_rate', 'cr_normalized', 'social', 'lower', ('cr_max',)),
+    ('education_level', 'el_normalized', 'social', 'percent', ()),
+    ('access_to_transit', 'apt_normalized', 'social', 'lower', ('travel_time_max',)),
+    ('access_to_schools', 'as_normalized', 'social', 'lower', ('travel_time_max',)),
+    ('access_to_hospitals', 'ah_normalized', 'social', 'lower', ('travel_time_max',)),
+    ('access_to_fire_stations', 'af_normalized', 'social', 'lower', ('travel_time_max',)),
+    ('access_to_police', 'ap_normalized', 'social', 'lower', ('travel_time_max',)),
+    ('walkability', 'w_normalized', 'social', 'higher', ('w_max',)),
+    ('median_household_income', 'mhi_normalized', 'economic', 'higher', ('mhi_max',)),
+    ('unemployment_rate', 'ur_normalized', 'economic', 'lower', ('ur_max',)),
+    ('housing_affordability', 'ha_normalized', 'economic', 'percent', ()),
+]
+
+# Threshold pairs that are used as (max - min) divisors
+THRESHOLD_RANGES = [('lst_min', 'lst_max'), ('ndvi_min', 'ndvi_max'), ('wet_min', 'wet_max'),
+                    ('ndbsi_min', 'ndbsi_max'), ('pc1_min', 'pc1_max')]
+
+
+def _whole(value: float) -> float:
+    """int for whole numbers, the value itself otherwise"""
+    return int(value) if float(value).is_integer() else value
+
+
+class UnknownProfileError(LookupError):
+    """Raised when a scoring profile name is not configured"""
+
+
+def _bounds(kind: str, thresholds: Dict[str, float], keys: Tuple[str, ...]) -> Tuple[float, float, float, float, float, float]:
+    """(offset, scale, base, sign, lower, upper) so that
+    normalized = min(upper, max(lower, base + sign * ((value - offset) / scale)))
+
+    reproduces the normalization formula of `kind` operation for operation.
+    """
+    if kind == 'higher':
+        return 0.0, thresholds[keys[0]], 0.0, 1.0, -math.inf, 1.0
+    if kind == 'lower':
+        return 0.0, thresholds[keys[0]], 1.0, -1.0, 0.0, math.inf
+    if kind == 'range':
+        low, high = thresholds[keys[0]], thresholds[keys[1]]
+        return low, high - low, 1.0, -1.0, 0.0, math.inf
+    if kind == 'percent':
+        return 0.0, 100.0, 0.0, 1.0, -math.inf, math.inf
+    return 0.0, 1.0, 0.0, 1.0, -math.inf, math.inf
+
+
+class ScoringProfile:
+    """Thresholds and weights of one scoring profile, compiled for both calculators.
+
+    Compiled once when the profile is registered: the normalization of every
+    indicator becomes an (offset, scale, base, sign, lower, upper) row and the
+    weights become per-category coefficient vectors, so the scalar and the
+    columnar calculators run the same arithmetic for every profile.
+    """
+
+    def __init__(self, name: str, thresholds: Dict[str, float], weights: Dict[str, Dict[str, float]]):
+        self.name = name
+        self.thresholds = thresholds
+        self.weights = weights
+
+        # Category weights in percent of the index; whole numbers stay ints (30, not 30.0)
+        self.category_weights = {category: _whole(sum(weights[category].values())) for category in CATEGORIES}
+
+        # Normalization rows, in NORMALIZATION order
+        self.normalization: List[Tuple[str, str, float, float, float, float, float, float]] = [
+            (indicator, key, *_bounds(kind, thresholds, threshold_keys))
+            for indicator, key, _, kind, threshold_keys in NORMALIZATION
+        ]
+        offsets, scales, bases, signs, lowers, uppers = zip(*(row[2:] for row in self.normalization))
+        self.offsets = np.array(offsets)
+        self.scales = np.array(scales)
+        self.bases = np.array(bases)
+        self.signs = np.array(signs)
+        self.lowers = np.array(lowers)
+        self.uppers = np.array(uppers)
+
+        # Relative weight of every indicator within its category: (normalized key, column, coefficient).
+        # Coefficients are fractions of the index divided by the category's fraction, e.g. 0.08 / 0.40,
+        # exactly as the original calculator wrote them, so the default profile scores bit for bit alike
+        self.category_terms: Dict[str, List[Tuple[str, int, float]]] = {category: [] for category in CATEGORIES}
+        for column, (indicator, key, category, _, _) in enumerate(NORMALIZATION):
+            total = self.category_weights[category]
+            coefficient = (weights[category][indicator] / 100) / (total / 100) if total > 0 else 0.0
+            self.category_terms[category].append((key, column, coefficient))
+
+        # Categories whose indicators weigh the same are scored as the mean of their
+        # normalized values (sum / n), as the original calculator scored social and economic
+        self.category_means = {
+            category: self.category_weights[category] > 0 and len(set(weights[category].values())) == 1
+            for category in CATEGORIES
+        }
+
+        # Weight of every category score in the final index
+        self.index_coefficients = tuple(self.category_weights[category] / 100 for category in CATEGORIES)
+
+    def describe(self) -> Dict[str, Any]:
+        """Category and indicator weights in percent, as served by /weights"""
+        return {
+            "profile": self.name,
+            "category_weights": dict(self.category_weights),
+            "indicator_weights": {category: dict(self.weights[category]) for category in CATEGORIES}
+        }
+
+
+def compile_profile(name: str, overrides: Optional[Dict[str, Any]] = None) -> ScoringProfile:
+    """Profile built from the defaults plus `overrides` ({"thresholds": {...}, "weights": {...}})
+
+    Raises ValueError for unknown keys, non-numeric or negative weights, weights
+    that do not add up to 100, and thresholds that would divide by zero.
+    """
+    overrides = overrides or {}
+    unknown = set(overrides) - {'thresholds', 'weights'}
+    if unknown:
+        raise ValueError(f"Profile '{name}': unknown sections {sorted(unknown)}")
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for key, value in (overrides.get('thresholds') or {}).items():
+        if key not in thresholds:
+            raise ValueError(f"Profile '{name}': unknown threshold '{key}'")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"Profile '{name}': threshold '{key}' must be a finite number")
+        thresholds[key] = value
+
+    weights = {category: dict(indicators) for category, indicators in DEFAULT_WEIGHTS.items()}
+    for category, indicators in (overrides.get('weights') or {}).items():
+        if category not in weights:
+            raise ValueError(f"Profile '{name}': unknown weight category '{category}'")
+        for indicator, value in indicators.items():
+            if indicator not in weights[category]:
+                raise ValueError(f"Profile '{name}': unknown {category} indicator '{indicator}'")
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+                raise ValueError(f"Profile '{name}': weight of '{indicator}' must be a non-negative number")
+            weights[category][indicator] = value
+
+    total = sum(value for indicators in weights.values() for value in indicators.values())
+    if not math.isclose(total, 100, abs_tol=1e-6):
+        raise ValueError(f"Profile '{name}': weights add up to {total}, expected 100")
+
+    divisors = [key for _, _, _, kind, keys in NORMALIZATION if kind in ('higher', 'lower') for key in keys]
+    for key in divisors + ['pm25_max']:
+        if thresholds[key] == 0:
+            raise ValueError(f"Profile '{name}': threshold '{key}' must not be 0")
+    for low, high in THRESHOLD_RANGES:
+        if thresholds[high] == thresholds[low]:
+            raise ValueError(f"Profile '{name}': thresholds '{low}' and '{high}' must differ")
+
+    return ScoringProfile(name, thresholds, weights)
+
+
+class ProfileRegistry:
+    """Compiled scoring profiles by name: 'default' plus settings.SCORING_PROFILES"""
+
+    def __init__(self, definitions: Dict[str, Dict[str, Any]], default_name: str):
+        self._profiles = {'default': compile_profile('default')}
+        for name, overrides in definitions.items():
+            self._profiles[name] = compile_profile(name, overrides)
+        if default_name not in self._profiles:
+            raise ValueError(f"Default scoring profile '{default_name}' is not configured")
+        self.default_name = default_name
+        logger.info(f"Loaded scoring profiles: {', '.join(self._profiles)} (default: {default_name})")
+
+    def get(self, name: Optional[str] = None) -> ScoringProfile:
+        """Profile by name; None selects the default profile"""
+        profile = self._profiles.get(name or self.default_name)
+        if profile is None:
+            raise UnknownProfileError(
+                f"Unknown scoring profile '{name}'. Available profiles: {', '.join(self._profiles)}"
+            )
+        return profile
+
+    def names(self) -> List[str]:
+        return list(self._profiles)
+
+
+profile_registry = ProfileRegistry(settings.SCORING_PROFILES, settings.SCORING_DEFAULT_PROFILE)
@@ -0,0 +1,85 @@
+# app/services/resolution.py
+import math
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.services.sensors import SENTINEL2, LANDSAT_SENSORS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Native resolution in meters of every dataset reduced over a polygon
+NATIVE_SCALES: Dict[str, float] = {
+    'sentinel2': SENTINEL2.native_scale,
+    'landsat': LANDSAT_SENSORS['LC08'].native_scale,
+    'modis_lst': 1000,
+    'sentinel5p_aod': 1000,
+    'cams_pm25': 40000,  # CAMS data resolution is ~40km
+}
+
+# Largest tileScale Earth Engine accepts
+MAX_TILE_SCALE = 16
+
+
+class ReductionPlan:
+    """reduceRegion scale, tileScale and bestEffort for one polygon, chosen from its area.
+
+    A dataset is reduced at its native scale while the polygon covers at most
+    pixel_budget of its pixels. Larger polygons are reduced at the smallest
+    multiple of the native scale that fits the budget, with a tileScale that
+    grows with the coarsening and bestEffort enabled, so latency and memory stay
+    bounded as the area grows. Coarse datasets are sampled finer over small
+    polygons so that at least min_pixels pixel centers fall inside them;
+    otherwise the reduction would come back empty.
+
+    For several polygons reduced at one scale (reduceRegions), area_sqm is the
+    largest area and smallest_area_sqm the smallest.
+    """
+
+    def __init__(self, area_sqm: float, pixel_budget: Optional[float] = None, min_pixels: Optional[float] = None,
+                 smallest_area_sqm: Optional[float] = None):
+        self.area_sqm = area_sqm
+        self.smallest_area_sqm = smallest_area_sqm if smallest_area_sqm is not None else area_sqm
+        self.pixel_budget = pixel_budget or settings.REDUCTION_PIXEL_BUDGET
+        self.min_pixels = min_pixels or settings.REDUCTION_MIN_PIXELS
+        self._finest_scale = min(NATIVE_SCALES.values())
+
+    def params(self, dataset: str) -> Dict[str, Any]:
+        """Keyword arguments for reduceRegion over `dataset`"""
+        native_scale = NATIVE_SCALES[dataset]
+        native_pixels = self.area_sqm / native_scale ** 2
+
+        if native_pixels > self.pixel_budget:
+            factor = math.ceil(math.sqrt(native_pixels / self.pixel_budget))
+            scale = native_scale * factor
+            tile_scale = min(MAX_TILE_SCALE, 2 * factor)
+            best_effort = True
+        else:
+            scale = native_scale
+            if self.smallest_area_sqm / native_scale ** 2 < self.min_pixels:
+                scale = max(self._finest_scale, math.sqrt(self.smallest_area_sqm / self.min_pixels))
+            tile_scale = 1
+            best_effort = False
+
+        return {
+            'scale': scale,
+            'maxPixels': settings.REDUCTION_MAX_PIXELS,
+            'tileScale': tile_scale,
+            'bestEffort': best_effort
+        }
+
+    def describe_dataset(self, dataset: str) -> Dict[str, Any]:
+        params = self.params(dataset)
+        return {
+            'scale_m': round(params['scale'], 1),
+            'native_scale_m': NATIVE_SCALES[dataset],
+            'tile_scale': params['tileScale'],
+            'best_effort': params['bestEffort']
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        """Resolution used for every dataset, as reported in responses"""
+        return {
+            'area_sqm': round(self.area_sqm, 1),
+            'pixel_budget': self.pixel_budget,
+            'datasets': {dataset: self.describe_dataset(dataset) for dataset in NATIVE_SCALES}
+        }
@@ -0,0 +1,357 @@
+# app/services/score_file.py
+#
+# Bulk scoring of CSV or Parquet files whose columns are the flattened
+# environmental, social and economic input fields (green_area, total_area, ...,
+# total_housing_units). The file is split into row groups that are read and
+# scored in a process pool; results are written in input order as a columnar
+# file of the same format with raw indicators, normalized indicators, category
+# scores, index, grade and a per-row `errors` column:
+#
+#     python -m app.services.score_file neighborhoods.parquet -o scores.parquet -w 8
+#     python -m app.services.score_file neighborhoods.csv -o scores.csv --benchmark
+#
+# Parquet support needs the optional pyarrow package (requirements-parquet.txt).
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from app.services.batch import BatchScorer, FIELD_RULES
+from app.services.columnar import ColumnarCalculator
+from app.services.profiles import profile_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Flattened input column -> input category; field names are unique across categories
+INPUT_COLUMNS = {name: category for category, rules in FIELD_RULES.items() for name, *_ in rules}
+
+# Target size of one CSV row group; Parquet files use their own row groups
+CSV_ROW_GROUP_BYTES = 8 * 1024 * 1024
+
+# (path, byte range) for CSV or (path, row group index) for Parquet
+RowGroup = Tuple[str, int, int]
+
+# (input format, output format or None, scoring profile name or None, row group)
+GroupTask = Tuple[str, Optional[str], Optional[str], RowGroup]
+
+
+def file_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension == ".csv":
+        return "csv"
+    raise ValueError(f"Unsupported file type '{extension}', expected .csv or .parquet")
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise RuntimeError("Parquet files need the pyarrow package (pip install -r requirements-parquet.txt)")
+
+
+def _check_header(header: List[str]):
+    missing = [name for name in INPUT_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"Input file is missing columns: {', '.join(missing)}")
+
+
+def csv_row_groups(path: str, target_bytes: int = CSV_ROW_GROUP_BYTES) -> Tuple[List[str], List[RowGroup]]:
+    """Header and newline-aligned byte ranges of roughly target_bytes each
+
+    Ranges are split on raw newlines, so quoted fields must not contain line
+    breaks (numeric input never does).
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8-sig")]), [])
+        _check_header(header)
+        groups = []
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + target_bytes, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            groups.append((path, start, end))
+            start = end
+    return header, groups
+
+
+def parquet_row_groups(path: str) -> Tuple[List[str], List[RowGroup]]:
+    _require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    header = parquet_file.schema_arrow.names
+    _check_header(header)
+    return header, [(path, i, parquet_file.metadata.row_group(i).num_rows)
+                    for i in range(parquet_file.num_row_groups)]
+
+
+def read_csv_group(path: str, start: int, end: int) -> Dict[str, Any]:
+    """Input columns of one CSV byte range as float arrays (or parsed lists when a cell is not a number)"""
+    with open(path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8-sig")]))
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    rows = [row for row in csv.reader(text.splitlines()) if row]
+    width = len(header)
+    rows = [row if len(row) >= width else row + [""] * (width - len(row)) for row in rows]
+
+    columns: Dict[str, Any] = {}
+    for name in INPUT_COLUMNS:
+        position = header.index(name)
+        cells = [row[position] for row in rows]
+        try:
+            columns[name] = np.array(cells, dtype=np.float64)
+        except ValueError:
+            # Only columns with empty or non-numeric cells are parsed cell by cell
+            columns[name] = [_parse_number(cell.strip()) for cell in cells]
+    return columns
+
+
+def _parse_number(value: str) -> Any:
+    """int or float for numeric CSV cells, None for empty ones, the text otherwise"""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def read_parquet_group(path: str, index: int, num_rows: int) -> Dict[str, Any]:
+    _require_pyarrow()
+    table = pq.ParquetFile(path).read_row_group(index, columns=list(INPUT_COLUMNS))
+    return {name: table.column(name).to_pylist() for name in INPUT_COLUMNS}
+
+
+def score_group(columns: Dict[str, Any], profile_name: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Output columns for one row group; failed rows hold NaN scores and their errors"""
+    count = BatchScorer.column_length({"input": columns})
+    nested: Dict[str, Dict[str, List[Any]]] = {category: {} for category in FIELD_RULES}
+    for name, values in columns.items():
+        nested[INPUT_COLUMNS[name]][name] = values
+
+    errors: Dict[int, List[Dict[str, Any]]] = {}
+    arrays = BatchScorer.validate_columns(nested, count, errors)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        scores = ColumnarCalculator.score_arrays(
+            arrays['environmental'], arrays['social'], arrays['economic'], include_details=True,
+            profile=profile_registry.get(profile_name)
+        )
+
+    failed = np.zeros(count, dtype=bool)
+    failed[list(errors)] = True
+    output = {}
+    for key, values in scores.items():
+        if key == 'grade':
+            output[key] = np.where(failed, "", values)
+        else:
+            output[key] = np.where(failed, np.nan, values)
+
+    error_column = np.full(count, "", dtype=object)
+    for i, row_errors in errors.items():
+        error_column[i] = json.dumps(row_errors)
+    output['errors'] = error_column
+    return output
+
+
+def encode_csv(columns: Dict[str, np.ndarray]) -> str:
+    """CSV lines for scored columns, in column order and without the row number"""
+    cells = []
+    for key, column in columns.items():
+        if column.dtype.kind == "f":
+            # Shortest round-trip text; NaN (failed rows) is left empty
+            cells.append(["" if value != value else repr(value) for value in column.tolist()])
+        elif key == 'errors':
+            cells.append(['"' + value.replace('"', '""') + '"' if value else "" for value in column.tolist()])
+        else:
+            cells.append(column.tolist())
+    return "".join(",".join(row) + "\n" for row in zip(*cells))
+
+
+def process_group(task: GroupTask) -> Tuple[int, int, Any]:
+    """Read, score and encode one row group in a worker process
+
+    Returns the row count, the failed row count and the output payload: CSV text,
+    the scored columns for Parquet, or None when there is no output.
+    """
+    input_format, output_format, profile_name, group = task
+    columns = read_csv_group(*group) if input_format == "csv" else read_parquet_group(*group)
+    scored = score_group(columns, profile_name)
+    rows = len(scored['errors'])
+    failed = int(np.count_nonzero(scored['errors'] != ""))
+    if output_format == "csv":
+        return rows, failed, encode_csv(scored)
+    if output_format == "parquet":
+        return rows, failed, scored
+    return rows, failed, None
+
+
+def iter_processed_groups(tasks: List[GroupTask],
+                          workers: int) -> Iterator[Tuple[int, int, Any]]:
+    """Processed row groups in input order, with at most two groups per worker in flight"""
+    if workers <= 1:
+        for task in tasks:
+            yield process_group(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        remaining = iter(tasks)
+        pending = [executor.submit(process_group, task) for task in islice(remaining, 2 * workers)]
+        while pending:
+            result = pending.pop(0).result()
+            next_task = next(remaining, None)
+            if next_task is not None:
+                pending.append(executor.submit(process_group, next_task))
+            yield result
+
+
+def output_columns() -> List[str]:
+    """Output column names, in the order score_group produces them"""
+    empty = {name: np.empty(0) for name in INPUT_COLUMNS}
+    return ["row"] + list(score_group(empty))
+
+
+class CsvResultWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._file.write(",".join(output_columns()) + "\n")
+        self._row = 0
+
+    def write(self, rows: int, text: str):
+        lines = text.splitlines(keepends=True)
+        self._file.write("".join(f"{row},{line}" for row, line in enumerate(lines, start=self._row)))
+        self._row += rows
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter:
+    def __init__(self, path: str):
+        _require_pyarrow()
+        self._path = path
+        self._writer = None
+        self._row = 0
+
+    def write(self, rows: int, columns: Dict[str, np.ndarray]):
+        table = pa.table({
+            "row": pa.array(np.arange(self._row, self._row + rows, dtype=np.int64)),
+            **{key: pa.array(values, type=pa.string() if values.dtype.kind in "OU" else pa.float64(),
+                              from_pandas=True)
+               for key, values in columns.items()}
+        })
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+        self._row += rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_file(input_path: str, output_path: Optional[str] = None, workers: int = 1,
+               row_group_bytes: int = CSV_ROW_GROUP_BYTES, profile_name: Optional[str] = None) -> Dict[str, Any]:
+    """Score every row of input_path with `workers` processes, writing results to output_path
+
+    Reading, scoring and output encoding all happen in the workers; the main
+    process only writes the encoded groups in order. Without an output path the
+    results are discarded, which is what the benchmark measures. Returns row
+    counts and timing.
+    """
+    input_format = file_format(input_path)
+    output_format = file_format(output_path) if output_path else None
+    profile_registry.get(profile_name)
+
+    started = time.perf_counter()
+    if input_format == "csv":
+        _, groups = csv_row_groups(input_path, row_group_bytes)
+    else:
+        _, groups = parquet_row_groups(input_path)
+
+    writer = None
+    if output_format == "csv":
+        writer = CsvResultWriter(output_path)
+    elif output_format == "parquet":
+        writer = ParquetResultWriter(output_path)
+
+    rows = failed = 0
+    try:
+        tasks = [(input_format, output_format, profile_name, group) for group in groups]
+        for group_rows, group_failed, payload in iter_processed_groups(tasks, workers):
+            rows += group_rows
+            failed += group_failed
+            if writer is not None:
+                writer.write(group_rows, payload)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - started
+
+    logger.info(f"Scored {rows} rows from {input_path} in {elapsed:.2f} s with {workers} workers")
+    return {
+        "rows": rows,
+        "failed": failed,
+        "row_groups": len(groups),
+        "workers": workers,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else float("inf")
+    }
+
+
+def benchmark(input_path: str, worker_counts: List[int], row_group_bytes: int = CSV_ROW_GROUP_BYTES,
+              profile_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Throughput of reading and scoring input_path (no output) for each worker count"""
+    return [score_file(input_path, None, workers, row_group_bytes, profile_name) for workers in worker_counts]
+
+
+def main(argv: Optional[List[str]] = None):
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of flattened indicator columns")
+    parser.add_argument("input", help="Input .csv or .parquet file")
+    parser.add_argument("-o", "--output", help="Output .csv or .parquet file")
+    parser.add_argument("-w", "--workers", type=int, default=cpu_count, help="Worker processes")
+    parser.add_argument("--row-group-mb", type=float, default=CSV_ROW_GROUP_BYTES / (1024 * 1024),
+                        help="Target CSV row group size in MB")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Also report scoring throughput at 1, 4 and all cores")
+    parser.add_argument("--profile", help="Scoring profile (default: the configured default profile)")
+    args = parser.parse_args(argv)
+    row_group_bytes = max(1, int(args.row_group_mb * 1024 * 1024))
+
+    try:
+        if args.output:
+            run = score_file(args.input, args.output, args.workers, row_group_bytes, args.profile)
+            print(f"Scored {run['rows']} rows ({run['failed']} failed) in {run['row_groups']} row groups "
+                  f"with {run['workers']} workers: {run['seconds']:.2f} s, {run['rows_per_second']:,.0f} rows/s",
+                  file=sys.stderr)
+
+        if args.benchmark or not args.output:
+            print(f"Throughput without output ({cpu_count} cores available):", file=sys.stderr)
+            for run in benchmark(args.input, sorted({1, 4, cpu_count}), row_group_bytes, args.profile):
+                print(f"  {run['workers']:>3} workers: {run['rows_per_second']:>12,.0f} rows/s "
+                      f"({run['seconds']:.2f} s)", file=sys.stderr)
+    except (OSError, LookupError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# app/services/sensitivity.py
+import numpy as np
+from typing import Any, Dict, Optional
+from app.models.sustainability import SustainabilityInput
+from app.services.calculator import SustainabilityCalculator
+from app.services.columnar import ColumnarCalculator, GRADE_BOUNDARIES
+from app.services.profiles import CATEGORIES, NORMALIZATION, ScoringProfile, profile_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Percentiles reported for every sampled score
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def _dirichlet(rng: np.random.Generator, base: np.ndarray, concentration: float, samples: int) -> np.ndarray:
+    """(samples x len(base)) weight draws centered on `base`; zero weights stay zero"""
+    draws = np.zeros((samples, len(base)))
+    active = base > 0
+    if active.sum() == 1:
+        draws[:, active] = 1.0
+    elif active.any():
+        draws[:, active] = rng.dirichlet(concentration * base[active] / base[active].sum(), samples)
+    return draws
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Rank of every row, per column (one sort; positions are scattered back instead of sorted again)"""
+    order = np.argsort(values, axis=0)
+    ranks = np.empty(values.shape)
+    positions = np.broadcast_to(np.arange(values.shape[0], dtype=np.float64)[:, None], values.shape)
+    np.put_along_axis(ranks, order, positions, axis=0)
+    return ranks
+
+
+def _rank_correlations(weights: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Spearman correlation of every weight column with the index; 0 for constant columns"""
+    weight_ranks = _ranks(weights)
+    # argsort gives tied values distinct ranks; a constant column has no ranking at all
+    weight_ranks[:, np.ptp(weights, axis=0) == 0] = 0.0
+    index_ranks = _ranks(index[:, None])[:, 0]
+    weight_ranks -= weight_ranks.mean(axis=0)
+    index_ranks -= index_ranks.mean()
+    spread = np.sqrt((weight_ranks ** 2).sum(axis=0) * (index_ranks ** 2).sum())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlations = (weight_ranks.T @ index_ranks) / spread
+    return np.where(spread > 0, correlations, 0.0)
+
+
+def _distribution(values: np.ndarray) -> Dict[str, float]:
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        "mean": round(float(values.mean()), 2),
+        "std": round(float(values.std()), 2),
+        "min": round(float(values.min()), 2),
+        "max": round(float(values.max()), 2),
+        **{f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)}
+    }
+
+
+class SensitivityAnalyzer:
+    """Monte Carlo sensitivity of a neighborhood's score to the scoring weights.
+
+    Category weights and the indicator weights within every category are drawn
+    from Dirichlet distributions centered on the profile's weights. The
+    normalized indicators do not depend on the weights, so they are computed
+    once and every sample is scored by one matrix product.
+    """
+
+    @staticmethod
+    def analyze(data: SustainabilityInput, profile: Optional[ScoringProfile] = None, samples: int = 10_000,
+                concentration: float = 50.0, seed: Optional[int] = None) -> Dict[str, Any]:
+        """Score distribution, grade probabilities and indicator importance over `samples` weight draws
+
+        concentration controls the spread of the draws: the standard deviation of
+        a weight w is about sqrt(w * (1 - w) / (concentration + 1)).
+        """
+        profile = profile or profile_registry.get()
+        baseline = SustainabilityCalculator.score_values(
+            data.environmental.model_dump(), data.social.model_dump(), data.economic.model_dump(),
+            include_details=True, profile=profile
+        )
+        normalized = np.array([baseline['normalized'][key] for _, key, *_ in NORMALIZATION])
+        membership = np.array([CATEGORIES.index(category) for _, _, category, *_ in NORMALIZATION])
+
+        rng = np.random.default_rng(seed)
+
+        # Category weights (samples x 3) and indicator shares within each category (samples x indicators)
+        category_weights = _dirichlet(
+            rng, np.array([profile.category_weights[category] for category in CATEGORIES]), concentration, samples
+        )
+        shares = np.zeros((samples, len(NORMALIZATION)))
+        for position, category in enumerate(CATEGORIES):
+            columns = np.flatnonzero(membership == position)
+            base = np.array([coefficient for _, _, coefficient in profile.category_terms[category]])
+            shares[:, columns] = _dirichlet(rng, base, concentration, samples)
+
+        # Normalized values laid out per category, so one product gives every category score
+        by_category = np.zeros((len(NORMALIZATION), len(CATEGORIES)))
+        by_category[np.arange(len(NORMALIZATION)), membership] = normalized
+        category_scores = (shares @ by_category) * 100
+        index = np.einsum('ij,ij->i', category_scores, category_weights)
+
+        grades = ColumnarCalculator.grades(index)
+        grade_names = [grade for _, grade in GRADE_BOUNDARIES] + ["F"]
+        grade_probabilities = {grade: round(float(np.count_nonzero(grades == grade)) / samples, 4)
+                               for grade in grade_names}
+
+        # Effective weight of every indicator in the final index, in percent
+        indicator_weights = shares * category_weights[:, membership] * 100
+        correlations = _rank_correlations(indicator_weights, index)
+        low, high = np.percentile(indicator_weights, [5, 95], axis=0)
+        importance = []
+        for column, (indicator, key, category, *_) in enumerate(NORMALIZATION):
+            importance.append({
+                "indicator": indicator,
+                "category": category,
+                "normalized_value": round(float(normalized[column]), 4),
+                "base_weight": profile.weights[category][indicator],
+                "weight_p5": round(float(low[column]), 2),
+                "weight_p95": round(float(high[column]), 2),
+                "rank_correlation": round(float(correlations[column]), 4)
+            })
+        importance.sort(key=lambda item: abs(item["rank_correlation"]), reverse=True)
+        for rank, item in enumerate(importance, start=1):
+            item["rank"] = rank
+
+        logger.info(f"Sensitivity analysis: {samples} samples, index {index.mean():.2f} ± {index.std():.2f}")
+        return {
+            "profile": profile.name,
+            "samples": samples,
+            "concentration": concentration,
+            "seed": seed,
+            "baseline": {key: baseline[key] for key in
+                         ('environmental_score', 'social_score', 'economic_score', 'sustainability_index', 'grade')},
+            "distribution": {
+                "sustainability_index": _distribution(index),
+                **{f"{category}_score": _distribution(category_scores[:, position])
+                   for position, category in enumerate(CATEGORIES)}
+            },
+            "grade_probabilities": grade_probabilities,
+            "indicator_importance": importance
+        }
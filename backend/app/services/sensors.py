@@ -0,0 +1,153 @@
+# app/services/sensors.py
+import ee
+from typing import Dict, List, Optional
+
+# Spectral band roles shared by every optical sensor, in Tasseled Cap coefficient order
+BAND_ROLES = ['blue', 'green', 'red', 'nir', 'swir1', 'swir2']
+
+
+class SensorSpec:
+    """Static description of an optical sensor: band roles, scaling and Tasseled Cap coefficients.
+
+    All spectral index math is driven by these specs, so the sensor is known
+    from the year (or dataset) alone and no band metadata has to be probed.
+    """
+
+    def __init__(self, name: str, collection_id: str, bands: Dict[str, str],
+                 cloud_property: str, scale: float, offset: float, native_scale: int,
+                 start_year: Optional[int] = None,
+                 wetness_coefficients: Optional[List[float]] = None,
+                 brightness_coefficients: Optional[List[float]] = None):
+        self.name = name
+        self.collection_id = collection_id
+        self.bands = bands
+        self.cloud_property = cloud_property
+        self.scale = scale
+        self.offset = offset
+        self.native_scale = native_scale
+        self.start_year = start_year
+        self.wetness_coefficients = wetness_coefficients
+        self.brightness_coefficients = brightness_coefficients
+
+    def band_names(self, roles: List[str] = BAND_ROLES) -> List[str]:
+        """Sensor band names for the given roles"""
+        return [self.bands[role] for role in roles]
+
+    def collection(self) -> ee.ImageCollection:
+        return ee.ImageCollection(self.collection_id)
+
+    def ndvi(self, image: ee.Image) -> ee.Image:
+        """Normalized Difference Vegetation Index (NIR, red)"""
+        return image.normalizedDifference([self.bands['nir'], self.bands['red']]).rename('NDVI')
+
+    def mndwi(self, image: ee.Image) -> ee.Image:
+        """Modified Normalized Difference Water Index (green, SWIR1)"""
+        return image.normalizedDifference([self.bands['green'], self.bands['swir1']]).rename('MNDWI')
+
+    def ndbsi(self, image: ee.Image) -> ee.Image:
+        """Normalized Difference Bareness and Soil Index (SWIR1, SWIR2)"""
+        return image.normalizedDifference([self.bands['swir1'], self.bands['swir2']]).rename('NDBSI')
+
+    def wetness(self, image: ee.Image) -> ee.Image:
+        """Tasseled Cap Wetness on unscaled surface reflectance"""
+        return self.tasseled_cap(image, self.wetness_coefficients).rename('Wetness')
+
+    def brightness(self, image: ee.Image) -> ee.Image:
+        """Tasseled Cap Brightness on unscaled surface reflectance"""
+        return self.tasseled_cap(image, self.brightness_coefficients).rename('Brightness')
+
+    def tasseled_cap(self, image: ee.Image, coefficients) -> ee.Image:
+        """Weighted sum of the six reflective bands (coefficients in BAND_ROLES order)"""
+        if coefficients is None:
+            raise ValueError(f"No Tasseled Cap coefficients defined for {self.name}")
+        return (image.select(self.band_names())
+                .multiply(ee.Image.constant(coefficients))
+                .reduce(ee.Reducer.sum()))
+
+    def rgb(self, image: ee.Image) -> ee.Image:
+        """True-colour bands converted to reflectance"""
+        return image.select(self.band_names(['red', 'green', 'blue'])).multiply(self.scale).add(self.offset)
+
+
+# Landsat Collection 2 Level-2 surface reflectance (scale 0.0000275, offset -0.2)
+LANDSAT_SENSORS: Dict[str, SensorSpec] = {
+    'LC08': SensorSpec(
+        name='LC08',
+        collection_id='LANDSAT/LC08/C02/T1_L2',
+        bands={'blue': 'SR_B2', 'green': 'SR_B3', 'red': 'SR_B4',
+               'nir': 'SR_B5', 'swir1': 'SR_B6', 'swir2': 'SR_B7'},
+        cloud_property='CLOUD_COVER',
+        scale=0.0000275,
+        offset=-0.2,
+        native_scale=30,
+        start_year=2013,
+        wetness_coefficients=[0.1511, 0.1973, 0.3283, 0.3407, -0.7117, -0.4559],
+        brightness_coefficients=[0.3029, 0.2786, 0.4733, 0.5599, 0.5080, 0.1872]
+    ),
+    'LE07': SensorSpec(
+        name='LE07',
+        collection_id='LANDSAT/LE07/C02/T1_L2',
+        bands={'blue': 'SR_B1', 'green': 'SR_B2', 'red': 'SR_B3',
+               'nir': 'SR_B4', 'swir1': 'SR_B5', 'swir2': 'SR_B7'},
+        cloud_property='CLOUD_COVER',
+        scale=0.0000275,
+        offset=-0.2,
+        native_scale=30,
+        start_year=1999,
+        wetness_coefficients=[0.0315, 0.2021, 0.3102, 0.1594, -0.6806, -0.6109],
+        brightness_coefficients=[0.2043, 0.4158, 0.5524, 0.5741, 0.3124, 0.2303]
+    ),
+    'LT05': SensorSpec(
+        name='LT05',
+        collection_id='LANDSAT/LT05/C02/T1_L2',
+        bands={'blue': 'SR_B1', 'green': 'SR_B2', 'red': 'SR_B3',
+               'nir': 'SR_B4', 'swir1': 'SR_B5', 'swir2': 'SR_B7'},
+        cloud_property='CLOUD_COVER',
+        scale=0.0000275,
+        offset=-0.2,
+        native_scale=30,
+        start_year=1984,
+        wetness_coefficients=[0.0315, 0.2021, 0.3102, 0.1594, -0.6806, -0.6109],
+        brightness_coefficients=[0.2043, 0.4158, 0.5524, 0.5741, 0.3124, 0.2303]
+    )
+}
+
+# Sentinel-2 harmonized surface reflectance (scale 0.0001)
+SENTINEL2 = SensorSpec(
+    name='S2',
+    collection_id='COPERNICUS/S2_SR_HARMONIZED',
+    bands={'blue': 'B2', 'green': 'B3', 'red': 'B4',
+           'nir': 'B8', 'swir1': 'B11', 'swir2': 'B12'},
+    cloud_property='CLOUDY_PIXEL_PERCENTAGE',
+    scale=0.0001,
+    offset=0.0,
+    native_scale=10
+)
+
+# Landsat imagery whose bands were renamed to BAND_ROLES (any generation)
+HARMONIZED_LANDSAT = SensorSpec(
+    name='LANDSAT',
+    collection_id='',
+    bands={role: role for role in BAND_ROLES},
+    cloud_property='CLOUD_COVER',
+    scale=0.0000275,
+    offset=-0.2,
+    native_scale=30
+)
+
+
+def landsat_sensor_for_year(year: int) -> SensorSpec:
+    """Landsat sensor used for a given year (LC08 from 2013, LE07 from 1999, LT05 before)"""
+    for sensor in sorted(LANDSAT_SENSORS.values(), key=lambda s: s.start_year, reverse=True):
+        if year >= sensor.start_year:
+            return sensor
+    return LANDSAT_SENSORS['LT05']
+
+
+def landsat_sensor_choice(year: ee.Number, values: Dict[str, object]) -> ee.ComputedObject:
+    """Server-side equivalent of landsat_sensor_for_year: pick values[sensor name] for an ee.Number year"""
+    ordered = sorted(LANDSAT_SENSORS.values(), key=lambda s: s.start_year)
+    choice = values[ordered[0].name]
+    for sensor in ordered[1:]:
+        choice = ee.Algorithms.If(year.gte(sensor.start_year), values[sensor.name], choice)
+    return choice
@@ -0,0 +1,184 @@
+# app/services/streaming.py
+#
+# Streaming NDJSON scoring: newline-delimited SustainabilityInput records are
+# scored in fixed-size chunks and one SustainabilityResult line per record is
+# written as each chunk completes, so memory stays constant regardless of input
+# size. Backs POST /api/sustainability/calculate-stream and the CLI:
+#
+#     python -m app.services.streaming input.ndjson -o results.ndjson
+import argparse
+import json
+import sys
+import time
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.services.batch import BatchScorer
+from app.services.calculator import SustainabilityCalculator
+from app.services.profiles import ScoringProfile, profile_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (line number, parsed record or None, JSON error message or None)
+ParsedLine = Tuple[int, Any, Optional[str]]
+
+
+def parse_line(line_number: int, line) -> ParsedLine:
+    try:
+        return line_number, json.loads(line), None
+    except ValueError as e:
+        return line_number, None, f"Invalid JSON: {e}"
+
+
+def score_chunk(chunk: List[ParsedLine], profile: Optional[ScoringProfile] = None) -> str:
+    """Score one chunk of parsed lines and return the NDJSON output for it"""
+    records = [record for _, record, error in chunk if error is None]
+    results = iter(BatchScorer.score_records(records, include_details=True, profile=profile))
+
+    lines = []
+    for line_number, _, parse_error in chunk:
+        if parse_error is not None:
+            output = {"line": line_number, "errors": [{"loc": [], "msg": parse_error}]}
+        else:
+            result = next(results)
+            if "errors" in result:
+                output = {"line": line_number, "errors": result["errors"]}
+            else:
+                output = {
+                    "line": line_number,
+                    "indicators": result["indicators"],
+                    "normalized": result["normalized"],
+                    "environmental_score": result["environmental_score"],
+                    "social_score": result["social_score"],
+                    "economic_score": result["economic_score"],
+                    "sustainability_index": result["sustainability_index"],
+                    "grade": result["grade"],
+                    "interpretation": SustainabilityCalculator.INTERPRETATIONS[result["grade"]]
+                }
+        lines.append(json.dumps(output))
+    return "\n".join(lines) + "\n"
+
+
+def _oversized_line(line_number: int, max_line_bytes: int) -> ParsedLine:
+    return line_number, None, f"Line exceeds the limit of {max_line_bytes} bytes"
+
+
+def iter_chunks(lines: Iterable, chunk_size: int, max_line_bytes: Optional[int] = None) -> Iterator[List[ParsedLine]]:
+    """Group non-blank input lines into parsed chunks of at most chunk_size"""
+    max_line_bytes = max_line_bytes or settings.STREAM_MAX_LINE_BYTES
+    chunk: List[ParsedLine] = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        if len(line) > max_line_bytes:
+            chunk.append(_oversized_line(line_number, max_line_bytes))
+        else:
+            chunk.append(parse_line(line_number, line))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def iter_lines(byte_chunks: AsyncIterator[bytes],
+                     max_line_bytes: Optional[int] = None) -> AsyncIterator[Optional[bytes]]:
+    """Split an async byte stream into lines, holding at most one partial line
+
+    Only the newly received bytes are searched for newlines, so a long line
+    arriving in many small chunks is scanned once, not once per chunk. A line
+    longer than max_line_bytes (default: settings.STREAM_MAX_LINE_BYTES) is
+    discarded as it arrives and yielded as None, so memory stays bounded.
+    """
+    max_line_bytes = max_line_bytes or settings.STREAM_MAX_LINE_BYTES
+    buffer = bytearray()
+    # Set while skipping the rest of an oversized line
+    oversized = False
+    async for data in byte_chunks:
+        scan_from = len(buffer)
+        buffer += data
+        start = 0
+        newline = buffer.find(b"\n", scan_from)
+        while newline != -1:
+            if oversized or newline - start > max_line_bytes:
+                oversized = False
+                yield None
+            else:
+                yield bytes(buffer[start:newline])
+            start = newline + 1
+            newline = buffer.find(b"\n", start)
+        if start:
+            del buffer[:start]
+        if len(buffer) > max_line_bytes:
+            oversized = True
+            buffer.clear()
+    if oversized:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
+
+
+def score_stream(lines: Iterable, chunk_size: Optional[int] = None,
+                 profile: Optional[ScoringProfile] = None) -> Iterator[str]:
+    """NDJSON output for NDJSON input lines, one chunk at a time"""
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    for chunk in iter_chunks(lines, chunk_size):
+        yield score_chunk(chunk, profile)
+
+
+async def score_byte_stream(byte_chunks: AsyncIterator[bytes], chunk_size: Optional[int] = None,
+                            profile: Optional[ScoringProfile] = None) -> AsyncIterator[str]:
+    """NDJSON output for an async NDJSON byte stream, scoring each chunk off the event loop"""
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    chunk: List[ParsedLine] = []
+    line_number = 0
+    async for line in iter_lines(byte_chunks):
+        line_number += 1
+        if line is None:
+            chunk.append(_oversized_line(line_number, settings.STREAM_MAX_LINE_BYTES))
+        elif not line.strip():
+            continue
+        else:
+            chunk.append(parse_line(line_number, line))
+        if len(chunk) >= chunk_size:
+            yield await run_in_threadpool(score_chunk, chunk, profile)
+            chunk = []
+    if chunk:
+        yield await run_in_threadpool(score_chunk, chunk, profile)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Score newline-delimited SustainabilityInput records")
+    parser.add_argument("input", nargs="?", default="-", help="NDJSON input file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file ('-' for stdout)")
+    parser.add_argument("--chunk-size", type=int, default=settings.STREAM_CHUNK_SIZE,
+                        help="Records scored per chunk")
+    parser.add_argument("--profile", help="Scoring profile (default: the configured default profile)")
+    args = parser.parse_args(argv)
+    try:
+        profile = profile_registry.get(args.profile)
+    except LookupError as e:
+        parser.error(str(e))
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    started = time.perf_counter()
+    rows = 0
+    try:
+        for output in score_stream(source, args.chunk_size, profile):
+            target.write(output)
+            rows += output.count("\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Scored {rows} records in {elapsed:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
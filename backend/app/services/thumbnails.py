@@ -0,0 +1,287 @@
+# app/services/thumbnails.py
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import requests
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Path under which thumbnails are served by the geographic router
+THUMBNAIL_PROXY_PATH = "/api/geographic/thumbnails"
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Key digests remembered in memory to answer If-None-Match without touching disk
+_DIGEST_MEMO_SIZE = 10_000
+
+
+class ThumbnailNotFoundError(LookupError):
+    """Raised for thumbnail keys that were never registered"""
+
+
+class ThumbnailCache:
+    """Content-addressed on-disk cache for rendered Earth Engine thumbnails.
+
+    A thumbnail key (a hash of what was rendered) is registered together with
+    the Earth Engine URL that renders it. The first fetch downloads the image,
+    stores it under the SHA-256 of its bytes and records that digest for the
+    key, so later fetches never reach Earth Engine and expired source URLs do
+    not matter. Once the total size of images and key records exceeds
+    max_bytes, images are evicted least recently used first together with the
+    keys that point at them, and keys that were never fetched age out in the
+    same order. A key whose image is gone is dropped rather than fetched again,
+    since its source URL has usually expired by then. Everything lives on disk,
+    so all workers share it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, fetch_timeout: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fetch_timeout = fetch_timeout
+        self._keys_dir = os.path.join(directory, "keys")
+        self._blobs_dir = os.path.join(directory, "blobs")
+        self._lock = threading.Lock()
+        self._digests: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes: Optional[int] = None
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._evictions = 0
+
+    @staticmethod
+    def is_valid_key(key: str) -> bool:
+        return bool(_KEY_PATTERN.match(key))
+
+    @staticmethod
+    def proxy_path(key: str) -> str:
+        return f"{THUMBNAIL_PROXY_PATH}/{key}"
+
+    def _key_path(self, key: str) -> str:
+        return os.path.join(self._keys_dir, f"{key}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blobs_dir, digest)
+
+    def _read_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._key_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_atomic(self, path: str, data: bytes):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_entry(self, key: str, entry: Dict[str, Any]) -> int:
+        data = json.dumps(entry).encode("utf-8")
+        self._write_atomic(self._key_path(key), data)
+        return len(data)
+
+    def _remember_digest(self, key: str, digest: str):
+        with self._lock:
+            self._digests[key] = digest
+            self._digests.move_to_end(key)
+            while len(self._digests) > _DIGEST_MEMO_SIZE:
+                self._digests.popitem(last=False)
+
+    def _drop_key(self, key: str):
+        with self._lock:
+            self._digests.pop(key, None)
+        try:
+            os.remove(self._key_path(key))
+        except OSError:
+            pass
+
+    def cached_digest(self, key: str) -> Optional[str]:
+        """Digest of a key's image if this process has seen it; no disk access"""
+        with self._lock:
+            return self._digests.get(key)
+
+    def count_not_modified(self):
+        with self._lock:
+            self._not_modified += 1
+
+    def url_for(self, key: str, build_url: Callable[[], str]) -> str:
+        """Proxy path for a thumbnail, calling build_url only if the image is not stored yet"""
+        entry = self._read_entry(key)
+        if entry and entry.get("digest") and os.path.exists(self._blob_path(entry["digest"])):
+            try:
+                os.utime(self._key_path(key))
+            except OSError:
+                pass
+            self._remember_digest(key, entry["digest"])
+            return self.proxy_path(key)
+
+        source_url = build_url()
+        size = self._write_entry(key, {"source_url": source_url})
+        # Keys are counted toward max_bytes too; rescan only when the running total says it may be exceeded
+        with self._lock:
+            needs_scan = self._bytes is None or self._bytes + size > self.max_bytes
+            if not needs_scan:
+                self._bytes += size
+        if needs_scan:
+            self._evict()
+        return self.proxy_path(key)
+
+    def get(self, key: str, if_none_match: Optional[str] = None) -> Tuple[Optional[bytes], str, str]:
+        """Image bytes, content type and digest for a key, fetching it on first use
+
+        The bytes are None when if_none_match is the key's ETag; the image is
+        then neither read nor fetched. Raises ThumbnailNotFoundError for unknown
+        keys and for keys whose image has been evicted.
+        """
+        if not self.is_valid_key(key):
+            raise ThumbnailNotFoundError(key)
+
+        entry = self._read_entry(key)
+        if entry is None:
+            raise ThumbnailNotFoundError(key)
+
+        digest = entry.get("digest")
+        if digest:
+            content_type = entry.get("content_type", "image/png")
+            self._remember_digest(key, digest)
+            if if_none_match == f'"{digest}"':
+                self.count_not_modified()
+                return None, content_type, digest
+
+            blob_path = self._blob_path(digest)
+            try:
+                with open(blob_path, "rb") as f:
+                    content = f.read()
+                os.utime(blob_path)
+            except OSError:
+                # Evicted by another worker: the source URL has likely expired too
+                self._drop_key(key)
+                raise ThumbnailNotFoundError(key)
+            with self._lock:
+                self._hits += 1
+            return content, content_type, digest
+
+        response = requests.get(entry["source_url"], timeout=self.fetch_timeout)
+        response.raise_for_status()
+        content = response.content
+        content_type = response.headers.get("Content-Type", "image/png").split(";")[0]
+        digest = hashlib.sha256(content).hexdigest()
+
+        self._write_atomic(self._blob_path(digest), content)
+        self._write_entry(key, {
+            "source_url": entry["source_url"],
+            "digest": digest,
+            "content_type": content_type
+        })
+        self._remember_digest(key, digest)
+        with self._lock:
+            self._misses += 1
+        logger.info(f"Cached thumbnail {key} ({len(content)} bytes)")
+
+        self._evict()
+        return content, content_type, digest
+
+    def _scan(self, directory: str) -> List[Tuple[float, int, str]]:
+        files = []
+        if not os.path.isdir(directory):
+            return files
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.startswith(".tmp-"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _evict(self):
+        """Delete least recently used images and their keys until the cache fits in max_bytes"""
+        try:
+            blobs = self._scan(self._blobs_dir)
+            keys = self._scan(self._keys_dir)
+        except OSError as e:
+            logger.warning(f"Could not scan thumbnail cache: {e}")
+            return
+
+        total = sum(size for _, size, _ in blobs) + sum(size for _, size, _ in keys)
+        if total <= self.max_bytes:
+            with self._lock:
+                self._bytes = total
+            return
+
+        # Group every image with the keys that point at it; unfetched keys stand alone
+        groups: Dict[str, List] = {
+            os.path.basename(path): [mtime, size, [path]] for mtime, size, path in blobs
+        }
+        for mtime, size, path in keys:
+            key = os.path.basename(path)[:-len(".json")]
+            digest = (self._read_entry(key) or {}).get("digest")
+            if digest is None:
+                groups[key] = [mtime, size, [path]]
+            elif digest in groups:
+                group = groups[digest]
+                group[0] = max(group[0], mtime)
+                group[1] += size
+                group[2].append(path)
+            else:
+                # Its image is already gone
+                self._drop_key(key)
+                total -= size
+
+        for _, size, paths in sorted(groups.values(), key=lambda group: group[0]):
+            if total <= self.max_bytes:
+                break
+            for path in paths:
+                if path.startswith(self._keys_dir):
+                    self._drop_key(os.path.basename(path)[:-len(".json")])
+                else:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            total -= size
+            with self._lock:
+                self._evictions += 1
+
+        with self._lock:
+            self._bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and bytes on disk as of the last scan"""
+        if self._bytes is None:
+            try:
+                total = sum(size for directory in (self._blobs_dir, self._keys_dir)
+                            for _, size, _ in self._scan(directory))
+            except OSError:
+                total = None
+            with self._lock:
+                self._bytes = total
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "not_modified": self._not_modified,
+                "evictions": self._evictions,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+thumbnail_cache = ThumbnailCache(
+    directory=settings.THUMBNAIL_CACHE_DIR,
+    max_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES,
+    fetch_timeout=settings.THUMBNAIL_FETCH_TIMEOUT_SECONDS
+)
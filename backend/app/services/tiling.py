@@ -0,0 +1,158 @@
+# app/services/tiling.py
+import ee
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from shapely.geometry import Polygon, box
+from app.core.config import settings
+from app.services.earth_engine import EarthEngineService
+from app.services.geometry import crosses_antimeridian
+from app.services.resolution import ReductionPlan
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Meters per degree of latitude
+METERS_PER_DEGREE = 111_320
+
+# Tiles are selected against the polygon grown by this many degrees, so the
+# poleward bulge of geodesic edges over their planar chords is never missed
+TILE_SELECTION_MARGIN_DEGREES = 0.01
+
+# (west, south, east, north) in degrees
+TileBounds = Tuple[float, float, float, float]
+
+
+def grid_tiles(coordinates: List[List[float]], tile_size_meters: float) -> List[TileBounds]:
+    """Bounds of the grid cells of about tile_size_meters that overlap a polygon ring"""
+    if crosses_antimeridian(coordinates):
+        raise ValueError("Tiled reduction does not support polygons crossing the antimeridian")
+    lons = [lon for lon, _ in coordinates]
+    lats = [lat for _, lat in coordinates]
+    west, east, south, north = min(lons), max(lons), min(lats), max(lats)
+
+    lat_step = tile_size_meters / METERS_PER_DEGREE
+    lon_step = lat_step / max(math.cos(math.radians((south + north) / 2)), 0.01)
+    columns = max(1, math.ceil((east - west) / lon_step))
+    rows = max(1, math.ceil((north - south) / lat_step))
+
+    outline = Polygon(coordinates).buffer(TILE_SELECTION_MARGIN_DEGREES)
+    tiles = []
+    for row in range(rows):
+        for column in range(columns):
+            bounds = (west + column * lon_step, south + row * lat_step,
+                      min(east, west + (column + 1) * lon_step), min(north, south + (row + 1) * lat_step))
+            if outline.intersects(box(*bounds)):
+                tiles.append(bounds)
+    return tiles
+
+
+class TiledReduction:
+    """Sum and mean reductions over a large polygon, run as a grid of tiles in parallel.
+
+    The polygon is cut into a grid of planar rectangles that are clipped to it
+    on the server, so the tiles partition it exactly. Every tile is reduced with
+    a pixel-weighted sum of each band plus the weight of each mean band, which
+    merge into the same sums and weighted means a single reduceRegion over the
+    whole polygon would give. Tiles run concurrently on a private thread pool
+    (the caller usually holds an Earth Engine executor worker) and a failed tile
+    is retried on its own. Results, and failures, are memoized per reduction
+    name so a fallback path does not reduce every tile again.
+    """
+
+    def __init__(self, coordinates: List[List[float]], tile_size_meters: Optional[float] = None,
+                 max_tiles: Optional[int] = None):
+        self.coordinates = coordinates
+        self.polygon = ee.Geometry.Polygon(coordinates)
+        self.tile_size_meters = tile_size_meters or settings.TILED_REDUCTION_TILE_SIZE_METERS
+        max_tiles = max_tiles or settings.TILED_REDUCTION_MAX_TILES
+
+        self.tiles = grid_tiles(coordinates, self.tile_size_meters)
+        while len(self.tiles) > max_tiles:
+            # Grow the tiles until the grid fits the limit
+            self.tile_size_meters *= max(1.1, math.sqrt(len(self.tiles) / max_tiles))
+            self.tiles = grid_tiles(coordinates, self.tile_size_meters)
+
+        # One plan for all tiles: they must share a pixel grid for the merge to be exact
+        self.reduction = ReductionPlan(self.tile_size_meters ** 2)
+        self.retried_tiles = 0
+        self._results: Dict[str, Dict[str, Optional[float]]] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._datasets: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _reduce_tile(self, image: ee.Image, bounds: TileBounds, dataset: str, retries: int) -> Dict[str, Any]:
+        geometry = self.polygon.intersection(ee.Geometry.Rectangle(list(bounds), None, False), ee.ErrorMargin(1))
+        request = image.reduceRegion(
+            reducer=ee.Reducer.sum(),
+            geometry=geometry,
+            **self.reduction.params(dataset)
+        )
+        for attempt in range(retries + 1):
+            try:
+                return EarthEngineService.get_info(request) or {}
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                with self._lock:
+                    self.retried_tiles += 1
+                logger.warning(f"Tile {bounds} failed (attempt {attempt + 1}), retrying: {e}")
+                time.sleep(settings.TILED_REDUCTION_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    def reduce(self, name: str, image: ee.Image, sum_bands: List[str], mean_bands: List[str],
+               dataset: str) -> Dict[str, Optional[float]]:
+        """Sums of sum_bands and pixel-weighted means of mean_bands over the polygon
+
+        Means are None where no tile has a valid pixel. Raises the last tile
+        error if a tile still fails after settings.TILED_REDUCTION_RETRIES retries.
+        """
+        with self._lock:
+            if name in self._results:
+                return self._results[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+        stacked = image.select(sum_bands + mean_bands)
+        for band in mean_bands:
+            # Constant 1 under the band's mask: its weighted sum is the band's total weight
+            stacked = stacked.addBands(image.select(band).multiply(0).add(1).rename(f'{band}_weight'))
+
+        started = time.perf_counter()
+        workers = min(settings.TILED_REDUCTION_WORKERS, len(self.tiles))
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ee-tile") as pool:
+                tile_sums = list(pool.map(
+                    lambda bounds: self._reduce_tile(stacked, bounds, dataset, settings.TILED_REDUCTION_RETRIES),
+                    self.tiles
+                ))
+        except Exception as e:
+            logger.error(f"Tiled reduction '{name}' failed: {e}")
+            with self._lock:
+                self._errors[name] = e
+            raise
+
+        totals = {band: sum(sums.get(band) or 0 for sums in tile_sums)
+                  for band in sum_bands + [f'{band}_weight' for band in mean_bands]}
+        for band in mean_bands:
+            weight = totals.pop(f'{band}_weight')
+            values = sum(sums.get(band) or 0 for sums in tile_sums)
+            totals[band] = values / weight if weight > 0 else None
+
+        logger.info(f"Tiled reduction '{name}': {len(self.tiles)} tiles of {self.tile_size_meters:.0f} m "
+                    f"in {time.perf_counter() - started:.2f} s")
+        with self._lock:
+            self._results[name] = totals
+            self._datasets[name] = dataset
+        return totals
+
+    def describe(self) -> Dict[str, Any]:
+        """Tile grid and per-dataset reduction parameters, as reported in responses"""
+        datasets = {dataset: self.reduction.describe_dataset(dataset) for dataset in set(self._datasets.values())}
+        return {
+            'tiles': len(self.tiles),
+            'tile_size_m': round(self.tile_size_meters),
+            'retried_tiles': self.retried_tiles,
+            'datasets': datasets
+        }
@@ -1,12 +1,22 @@
 # app/services/timeseries.py
 
 import ee
-from typing import Dict, List, Any
-from datetime import datetime
+import asyncio
+from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta
 from app.models.sustainability import TimeSeriesInput, TimeSeriesResult, YearlyEnvironmentalData, EnvironmentalIndicators
-from app.services.geographic import GeographicService
+from app.services.geographic import GeographicService, MULTI_INDEX_VISUALIZATION
+from app.services.earth_engine import EarthEngineService
+from app.services.sensors import (
+    BAND_ROLES, HARMONIZED_LANDSAT, LANDSAT_SENSORS, SensorSpec, landsat_sensor_choice, landsat_sensor_for_year
+)
 from app.services.calculator import SustainabilityCalculator
+from app.services.composites import AnnualCompositeBuilder
+from app.services.geometry import canonical_polygon_key
+from app.services.historical_store import historical_store
 from app.models.sustainability import SustainabilityInput, SocialIndicators, EconomicIndicators
+from app.core.config import settings
+from app.core.executor import ee_executor
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,67 +26,90 @@ class TimeSeriesService:
     
     @staticmethod
     async def analyze_time_series(data: TimeSeriesInput) -> TimeSeriesResult:
-        """Analyze environmental changes over multiple years"""
+        """Analyze environmental changes over multiple years
+        
+        All Earth Engine work runs on the bounded Earth Engine executor so the
+        event loop stays free, and years are processed concurrently.
+        """
         try:
-            GeographicService.initialize_earth_engine()
+            await ee_executor.run(GeographicService.initialize_earth_engine)
             
-            coordinates = data.polygon.coordinates
+            coordinates = GeographicService.prepare_polygon(data.polygon.coordinates)
             years = sorted(data.years)
             
-            # Calculate total area once
-            total_area = GeographicService.calculate_area_sqm(coordinates)
+            # Settled past years are served from the historical store
+            indicators_by_year = {}
+            if settings.HISTORICAL_STORE_ENABLED:
+                indicators_by_year = await ee_executor.run(
+                    TimeSeriesService._load_stored_indicators, coordinates, years
+                )
+            missing_years = [year for year in years if year not in indicators_by_year]
             
-            yearly_data = []
+            # Total area is computed locally; it needs no Earth Engine call
+            total_area = GeographicService.calculate_area_sqm(coordinates)
             
-            for year in years:
-                logger.info(f"Processing year {year}")
-                
-                # Extract environmental indicators for specific year
-                env_indicators = TimeSeriesService._extract_yearly_environmental_indicators(
-                    coordinates, year
-                )
-                
-                # Calculate environmental score
-                env_score = TimeSeriesService._calculate_yearly_environmental_score(env_indicators)
-                
-                # Generate satellite image for the year
-                image_url = TimeSeriesService._get_yearly_satellite_image(coordinates, year)
-
-                # Generate multi-index images for the year
-                multi_index_images = TimeSeriesService._get_yearly_multi_index_images(coordinates, year)
-
-                yearly_data.append(YearlyEnvironmentalData(
-                    year=year,
-                    green_area=env_indicators['green_area'],
-                    total_area=env_indicators['total_area'],
-                    water_area=env_indicators['water_area'],
-                    air_quality_aod=env_indicators['air_quality_aod'],
-                    land_surface_temperature=env_indicators['land_surface_temperature'],
-                    mean_ndvi=env_indicators['mean_ndvi'],
-                    tasseled_cap_wetness=env_indicators['tasseled_cap_wetness'],
-                    mean_lst_for_eqi=env_indicators['mean_lst_for_eqi'],
-                    ndbsi=env_indicators['ndbsi'],
-                    pm25=env_indicators['pm25'],
-                    environmental_score=env_score,
-                    satellite_image_url=image_url,
-                    ndvi_image_url=multi_index_images['ndvi_url'],
-                    wetness_image_url=multi_index_images['wetness_url'],
-                    dryness_image_url=multi_index_images['dryness_url'],
-                    heat_image_url=multi_index_images['heat_url']
+            # Fetch the remaining years' indicators in one server-side computation
+            if settings.TIMESERIES_SERVER_SIDE_INDICATORS and missing_years:
+                try:
+                    computed = await ee_executor.run(
+                        TimeSeriesService._extract_time_series_indicators_server_side, coordinates, missing_years
+                    )
+                    indicators_by_year.update(computed)
+                    
+                    if settings.HISTORICAL_STORE_ENABLED:
+                        await ee_executor.run(TimeSeriesService._store_indicators, coordinates, computed)
+                except Exception as e:
+                    logger.warning(f"Server-side time series extraction failed, extracting per year: {e}")
+            
+            # Process years concurrently, at most TIMESERIES_YEAR_PARALLELISM at a time;
+            # gather() keeps the results in year order
+            semaphore = asyncio.Semaphore(max(1, settings.TIMESERIES_YEAR_PARALLELISM))
+            
+            # Annual composites shared by every year's indicators and images and the animation
+            composites = AnnualCompositeBuilder(coordinates)
+            filmstrip_mode = data.image_mode == "filmstrip"
+            
+            async def process_year(year: int) -> YearlyEnvironmentalData:
+                async with semaphore:
+                    return await ee_executor.run(
+                        TimeSeriesService._process_year, coordinates, year,
+                        indicators_by_year.get(year), composites, not filmstrip_mode
+                    )
+            
+            # The animation and filmstrips render on the executor alongside the years;
+            # they share the yearly composites through the builder
+            animation_task = asyncio.ensure_future(ee_executor.run(
+                TimeSeriesService._create_time_series_animation, coordinates, years, composites
+            ))
+            
+            # One filmstrip per image type instead of per-year thumbnails
+            filmstrips_task = None
+            if filmstrip_mode:
+                filmstrips_task = asyncio.ensure_future(ee_executor.run(
+                    TimeSeriesService._create_yearly_filmstrips, coordinates, years, composites
                 ))
-                            
-            # Generate animation GIF
-            animation_url = TimeSeriesService._create_time_series_animation(coordinates, years)
+            
+            try:
+                yearly_data = list(await asyncio.gather(*(process_year(year) for year in years)))
+            except BaseException:
+                for task in (animation_task, filmstrips_task):
+                    if task is not None:
+                        task.cancel()
+                raise
             
             # Calculate trend analysis
             trend_analysis = TimeSeriesService._analyze_trends(yearly_data)
             
+            animation_url = await animation_task
+            filmstrips = await filmstrips_task if filmstrips_task is not None else None
+            
             return TimeSeriesResult(
-                polygon_coordinates=coordinates,
+                polygon_coordinates=data.polygon.coordinates,
                 total_area=total_area,
                 yearly_data=yearly_data,
                 animation_gif_url=animation_url,
-                trend_analysis=trend_analysis
+                trend_analysis=trend_analysis,
+                filmstrips=filmstrips
             )
             
         except Exception as e:
@@ -84,48 +117,243 @@ class TimeSeriesService:
             raise
     
     @staticmethod
-    def _extract_yearly_environmental_indicators(coordinates: List[List[float]], year: int) -> Dict[str, float]:
-        """Extract environmental indicators for a specific year"""
-        try:
-            polygon = ee.Geometry.Polygon(coordinates)
+    def _is_settled_year(year: int) -> bool:
+        """Whether a year ended long enough ago that its source data no longer changes"""
+        settled_after = datetime(year + 1, 1, 1) + timedelta(days=settings.HISTORICAL_STORE_SETTLE_DAYS)
+        return datetime.now() >= settled_after
+    
+    @staticmethod
+    def _load_stored_indicators(coordinates: List[List[float]], years: List[int]) -> Dict[int, Dict[str, float]]:
+        """Indicators of settled years already in the historical store"""
+        sensors_by_year = {
+            year: landsat_sensor_for_year(year).name
+            for year in years
+            if TimeSeriesService._is_settled_year(year)
+        }
+        stored = historical_store.get_many(canonical_polygon_key(coordinates), sensors_by_year)
+        if stored:
+            logger.info(f"Loaded stored indicators for years {sorted(stored)}")
+        return stored
+    
+    @staticmethod
+    def _store_indicators(coordinates: List[List[float]], indicators_by_year: Dict[int, Dict[str, float]]):
+        """Persist indicators of settled years to the historical store"""
+        settled = {
+            year: indicators
+            for year, indicators in indicators_by_year.items()
+            if TimeSeriesService._is_settled_year(year)
+        }
+        sensors_by_year = {year: landsat_sensor_for_year(year).name for year in settled}
+        historical_store.put_many(canonical_polygon_key(coordinates), settled, sensors_by_year)
+    
+    @staticmethod
+    def _process_year(coordinates: List[List[float]], year: int, 
+                      env_indicators: Optional[Dict[str, float]] = None,
+                      composites: Optional[AnnualCompositeBuilder] = None,
+                      include_images: bool = True) -> YearlyEnvironmentalData:
+        """Extract indicators, score and images for a single year
+        
+        env_indicators can be passed when they were already computed server-side;
+        composites shares the year's Landsat composites between all consumers.
+        Without include_images the image URLs are left empty (filmstrip mode).
+        """
+        logger.info(f"Processing year {year}")
+        
+        if composites is None:
+            composites = AnnualCompositeBuilder(coordinates)
+        
+        # Extract environmental indicators for specific year
+        if env_indicators is None:
+            env_indicators = TimeSeriesService._extract_yearly_environmental_indicators(
+                coordinates, year, composites
+            )
+        
+        # Calculate environmental score
+        env_score = TimeSeriesService._calculate_yearly_environmental_score(env_indicators)
+        
+        if include_images:
+            # Generate satellite image for the year
+            image_url = TimeSeriesService._get_yearly_satellite_image(coordinates, year, composites)
             
-            # Date range for the year
-            start_date = f'{year}-01-01'
-            end_date = f'{year}-12-31'
+            # Generate multi-index images for the year
+            multi_index_images = TimeSeriesService._get_yearly_multi_index_images(coordinates, year, composites)
+        else:
+            image_url = ""
+            multi_index_images = {"ndvi_url": "", "wetness_url": "", "dryness_url": "", "heat_url": ""}
+
+        return YearlyEnvironmentalData(
+            year=year,
+            green_area=env_indicators['green_area'],
+            total_area=env_indicators['total_area'],
+            water_area=env_indicators['water_area'],
+            air_quality_aod=env_indicators['air_quality_aod'],
+            land_surface_temperature=env_indicators['land_surface_temperature'],
+            mean_ndvi=env_indicators['mean_ndvi'],
+            tasseled_cap_wetness=env_indicators['tasseled_cap_wetness'],
+            mean_lst_for_eqi=env_indicators['mean_lst_for_eqi'],
+            ndbsi=env_indicators['ndbsi'],
+            pm25=env_indicators['pm25'],
+            environmental_score=env_score,
+            satellite_image_url=image_url,
+            ndvi_image_url=multi_index_images['ndvi_url'],
+            wetness_image_url=multi_index_images['wetness_url'],
+            dryness_image_url=multi_index_images['dryness_url'],
+            heat_image_url=multi_index_images['heat_url']
+        )
+    
+    @staticmethod
+    def _extract_time_series_indicators_server_side(coordinates: List[List[float]], 
+                                                    years: List[int]) -> Dict[int, Dict[str, float]]:
+        """Extract environmental indicators for all years with a single getInfo()
+        
+        Maps over ee.List(years) on the server, picking the Landsat collection
+        for each year there, instead of building one client-side graph per year.
+        """
+        polygon = ee.Geometry.Polygon(coordinates)
+        
+        # Landsat collections with their bands renamed to common roles
+        harmonized_collections = {
+            name: sensor.collection().select(sensor.band_names(), BAND_ROLES)
+            for name, sensor in LANDSAT_SENSORS.items()
+        }
+        wetness_coefficients = {
+            name: sensor.wetness_coefficients for name, sensor in LANDSAT_SENSORS.items()
+        }
+        
+        modis = ee.ImageCollection('MODIS/061/MOD11A1').filterBounds(polygon).select('LST_Day_1km')
+        aod = ee.ImageCollection('COPERNICUS/S5P/NRTI/L3_AER_AI').filterBounds(polygon).select('absorbing_aerosol_index')
+        pm25 = (ee.ImageCollection('ECMWF/CAMS/NRT').filterBounds(polygon)
+                .select('particulate_matter_d_less_than_25_um_surface'))
+        
+        def mean_for_period(collection, start, end, band, scale):
+            filtered = collection.filterDate(start, end)
+            return ee.Algorithms.If(
+                filtered.size().gt(0),
+                filtered.mean().reduceRegion(
+                    reducer=ee.Reducer.mean(),
+                    geometry=polygon,
+                    scale=scale,
+                    maxPixels=1e9
+                ).get(band),
+                None
+            )
+        
+        def indicators_for_year(year):
+            year = ee.Number(year)
+            start = ee.Date.fromYMD(year, 1, 1)
+            end = ee.Date.fromYMD(year, 12, 31)
+            
+            landsat = (ee.ImageCollection(landsat_sensor_choice(year, harmonized_collections))
+                      .filterBounds(polygon)
+                      .filterDate(start, end)
+                      .filter(ee.Filter.lt(HARMONIZED_LANDSAT.cloud_property, 20)))
+            image = landsat.median()
+            
+            ndvi = HARMONIZED_LANDSAT.ndvi(image)
+            mndwi = HARMONIZED_LANDSAT.mndwi(image)
+            ndbsi = HARMONIZED_LANDSAT.ndbsi(image)
+            wetness = HARMONIZED_LANDSAT.tasseled_cap(
+                image, ee.List(landsat_sensor_choice(year, wetness_coefficients))
+            ).rename('Wetness')
+            
+            sums = (ndvi.gt(0.2).multiply(ee.Image.pixelArea()).rename('green_area')
+                    .addBands(mndwi.gt(0).multiply(ee.Image.pixelArea()).rename('water_area'))
+                    .reduceRegion(reducer=ee.Reducer.sum(), geometry=polygon, scale=30, maxPixels=1e9))
+            means = (ndvi.addBands(wetness).addBands(ndbsi)
+                     .reduceRegion(reducer=ee.Reducer.mean(), geometry=polygon, scale=30, maxPixels=1e9))
+            
+            landsat_values = ee.Dictionary({
+                'green_area': sums.get('green_area'),
+                'water_area': sums.get('water_area'),
+                'mean_ndvi': means.get('NDVI'),
+                'wetness': means.get('Wetness'),
+                'ndbsi': means.get('NDBSI')
+            })
             
-            # Calculate total area
-            total_area = polygon.area().getInfo()
+            return ee.Dictionary({
+                'year': year,
+                'has_landsat': landsat.size().gt(0),
+                'landsat': ee.Algorithms.If(landsat.size().gt(0), landsat_values, None),
+                # MODIS starts in 2000, Sentinel-5P and CAMS coverage in 2018
+                'lst': ee.Algorithms.If(
+                    year.gte(2000),
+                    mean_for_period(modis, start, end, 'LST_Day_1km', 1000),
+                    None
+                ),
+                'aod': ee.Algorithms.If(
+                    year.gte(2018),
+                    mean_for_period(aod, start, end, 'absorbing_aerosol_index', 1000),
+                    None
+                ),
+                'pm25': ee.Algorithms.If(
+                    year.gte(2018),
+                    mean_for_period(pm25, start, end, 'particulate_matter_d_less_than_25_um_surface', 40000),
+                    None
+                )
+            })
+        
+        raw_years = EarthEngineService.get_info(ee.List(years).map(indicators_for_year))
+        
+        total_area = GeographicService.calculate_area_sqm(coordinates)
+        return {
+            int(raw['year']): TimeSeriesService._finalize_yearly_indicators(raw, total_area)
+            for raw in raw_years
+        }
+    
+    @staticmethod
+    def _finalize_yearly_indicators(raw: Dict[str, Any], total_area: float) -> Dict[str, float]:
+        """Apply defaults, unit conversions and clamping to one year of server-side values"""
+        if not raw.get('has_landsat'):
+            logger.warning(f"No Landsat data available for year {raw.get('year')}")
+            return TimeSeriesService._get_default_indicators(total_area)
+        
+        landsat = raw.get('landsat') or {}
+        mean_ndvi = landsat.get('mean_ndvi')
+        wetness = landsat.get('wetness')
+        ndbsi = landsat.get('ndbsi')
+        lst = raw.get('lst')
+        lst = lst if lst is not None else 25.0
+        aod = raw.get('aod')
+        pm25 = raw.get('pm25')
+        
+        return {
+            'green_area': landsat.get('green_area') or 0,
+            'total_area': total_area,
+            'water_area': landsat.get('water_area') or 0,
+            'mean_ndvi': max(0, min(1, mean_ndvi if mean_ndvi is not None else 0.3)),
+            'tasseled_cap_wetness': max(-1, min(1, wetness / 10000)) if wetness is not None else 0.0,
+            'ndbsi': max(0, min(1, abs(ndbsi) if ndbsi is not None else 0.3)),
+            'land_surface_temperature': lst,
+            'mean_lst_for_eqi': lst,
+            'air_quality_aod': max(0, min(1, abs(aod) / 10)) if aod is not None else 0.3,
+            'pm25': pm25 * 1e9 if pm25 else 20.0
+        }
+    
+    @staticmethod
+    def _extract_yearly_environmental_indicators(coordinates: List[List[float]], year: int,
+                                                 composites: Optional[AnnualCompositeBuilder] = None) -> Dict[str, float]:
+        """Extract environmental indicators for a specific year"""
+        if composites is None:
+            composites = AnnualCompositeBuilder(coordinates)
+        polygon = composites.polygon
+        total_area = GeographicService.calculate_area_sqm(coordinates)
+        
+        try:
             
             # Get Landsat collection based on year
-            if year >= 2013:
-                # Landsat 8
-                landsat = (ee.ImageCollection('LANDSAT/LC08/C02/T1_L2')
-                          .filterBounds(polygon)
-                          .filterDate(start_date, end_date)
-                          .filter(ee.Filter.lt('CLOUD_COVER', 20)))
-            elif year >= 1999:
-                # Landsat 7
-                landsat = (ee.ImageCollection('LANDSAT/LE07/C02/T1_L2')
-                          .filterBounds(polygon)
-                          .filterDate(start_date, end_date)
-                          .filter(ee.Filter.lt('CLOUD_COVER', 20)))
-            else:
-                # Landsat 5
-                landsat = (ee.ImageCollection('LANDSAT/LT05/C02/T1_L2')
-                          .filterBounds(polygon)
-                          .filterDate(start_date, end_date)
-                          .filter(ee.Filter.lt('CLOUD_COVER', 20)))
+            sensor = composites.sensor_for_year(year)
+            landsat = composites.indicator_collection(year, sensor)
             
             # Check if we have data for this year
-            if landsat.size().getInfo() == 0:
+            if EarthEngineService.get_info(landsat.size()) == 0:
                 logger.warning(f"No Landsat data available for year {year}")
                 return TimeSeriesService._get_default_indicators(total_area)
             
             # Get median composite for the year
-            image = landsat.median()
+            image = composites.indicator_composite(year, sensor)
             
             # Extract indicators using Landsat bands
-            indicators = TimeSeriesService._extract_indicators_from_landsat(image, polygon, total_area)
+            indicators = TimeSeriesService._extract_indicators_from_landsat(image, polygon, total_area, sensor)
             
             # Add MODIS LST if available (MODIS starts from 2000)
             if year >= 2000:
@@ -147,99 +375,63 @@ class TimeSeriesService:
             
         except Exception as e:
             logger.error(f"Error extracting indicators for year {year}: {e}")
-            return TimeSeriesService._get_default_indicators(polygon.area().getInfo())
+            return TimeSeriesService._get_default_indicators(total_area)
     
     @staticmethod
-    def _extract_indicators_from_landsat(image, polygon, total_area):
-        """Extract environmental indicators from Landsat image"""
+    def _extract_indicators_from_landsat(image, polygon, total_area, sensor: SensorSpec):
+        """Extract environmental indicators from a Landsat composite of the given sensor"""
         
         # NDVI calculation
-        if image.select('SR_B5').getInfo() and image.select('SR_B4').getInfo():
-            # Landsat 8 (NIR=B5, Red=B4)
-            ndvi = image.normalizedDifference(['SR_B5', 'SR_B4'])
-        else:
-            # Landsat 5/7 (NIR=B4, Red=B3)
-            ndvi = image.normalizedDifference(['SR_B4', 'SR_B3'])
+        ndvi = sensor.ndvi(image)
         
         # Green area (NDVI > 0.2)
         green_mask = ndvi.gt(0.2)
-        green_area = green_mask.multiply(ee.Image.pixelArea()).reduceRegion(
+        green_area = EarthEngineService.get_info(green_mask.multiply(ee.Image.pixelArea()).reduceRegion(
             reducer=ee.Reducer.sum(),
             geometry=polygon,
             scale=30,
             maxPixels=1e9
-        ).getInfo().get('nd', 0)
+        )).get('NDVI', 0)
         
         # Mean NDVI
-        mean_ndvi = ndvi.reduceRegion(
+        mean_ndvi = EarthEngineService.get_info(ndvi.reduceRegion(
             reducer=ee.Reducer.mean(),
             geometry=polygon,
             scale=30,
             maxPixels=1e9
-        ).getInfo().get('nd', 0.3)
+        )).get('NDVI', 0.3)
         
-        # Water area using MNDWI (Green=B3, SWIR=B6 or B11)
+        # Water area using MNDWI (green, SWIR1)
         try:
-            if image.select('SR_B6').getInfo():
-                # Landsat 8
-                mndwi = image.normalizedDifference(['SR_B3', 'SR_B6'])
-            else:
-                # Landsat 5/7
-                mndwi = image.normalizedDifference(['SR_B2', 'SR_B5'])
-            
-            water_mask = mndwi.gt(0)
-            water_area = water_mask.multiply(ee.Image.pixelArea()).reduceRegion(
+            water_mask = sensor.mndwi(image).gt(0)
+            water_area = EarthEngineService.get_info(water_mask.multiply(ee.Image.pixelArea()).reduceRegion(
                 reducer=ee.Reducer.sum(),
                 geometry=polygon,
                 scale=30,
                 maxPixels=1e9
-            ).getInfo().get('nd', 0)
+            )).get('MNDWI', 0)
         except:
             water_area = 0
         
         # Tasseled Cap Wetness
         try:
-            if image.select('SR_B7').getInfo():
-                # Landsat 8 coefficients
-                wetness = (image.select('SR_B2').multiply(0.1511)
-                          .add(image.select('SR_B3').multiply(0.1973))
-                          .add(image.select('SR_B4').multiply(0.3283))
-                          .add(image.select('SR_B5').multiply(0.3407))
-                          .add(image.select('SR_B6').multiply(-0.7117))
-                          .add(image.select('SR_B7').multiply(-0.4559)))
-            else:
-                # Landsat 5/7 coefficients (simplified)
-                wetness = (image.select('SR_B1').multiply(0.0315)
-                          .add(image.select('SR_B2').multiply(0.2021))
-                          .add(image.select('SR_B3').multiply(0.3102))
-                          .add(image.select('SR_B4').multiply(0.1594))
-                          .add(image.select('SR_B5').multiply(-0.6806))
-                          .add(image.select('SR_B7').multiply(-0.6109)))
-            
-            tasseled_cap_wetness = wetness.reduceRegion(
+            tasseled_cap_wetness = EarthEngineService.get_info(sensor.wetness(image).reduceRegion(
                 reducer=ee.Reducer.mean(),
                 geometry=polygon,
                 scale=30,
                 maxPixels=1e9
-            ).getInfo().get('SR_B2', 0) / 10000
+            )).get('Wetness', 0) / 10000
         except:
             tasseled_cap_wetness = 0.0
         
         # NDBSI using SWIR bands
         try:
-            if image.select('SR_B6').getInfo() and image.select('SR_B7').getInfo():
-                # Landsat 8
-                ndbsi = image.normalizedDifference(['SR_B6', 'SR_B7'])
-            else:
-                # Landsat 5/7
-                ndbsi = image.normalizedDifference(['SR_B5', 'SR_B7'])
-            
-            mean_ndbsi = abs(ndbsi.reduceRegion(
+            mean_ndbsi = abs(EarthEngineService.get_info(sensor.ndbsi(image).reduceRegion(
                 reducer=ee.Reducer.mean(),
                 geometry=polygon,
                 scale=30,
                 maxPixels=1e9
-            ).getInfo().get('SR_B6', 0.3))
+            )).get('NDBSI', 0.3))
         except:
             mean_ndbsi = 0.3
         
@@ -264,20 +456,15 @@ class TimeSeriesService:
                             .filterDate(start_date, end_date)
                             .select('LST_Day_1km'))
             
-            if lst_collection.size().getInfo() == 0:
-                return 25.0
-            
             lst_mean = lst_collection.mean()
             lst_celsius = lst_mean.multiply(0.02).subtract(273.15)
             
-            result = lst_celsius.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=polygon,
-                scale=1000,
-                maxPixels=1e9
-            ).getInfo()
+            # 25°C when the year has no MODIS data
+            lst = EarthEngineService.get_info(EarthEngineService.regional_mean_or_default(
+                lst_collection, lst_celsius, polygon, 'LST_Day_1km', 1000, 25.0
+            ))
             
-            return result.get('LST_Day_1km', 25.0)
+            return lst if lst is not None else 25.0
         except:
             return 25.0
     
@@ -293,18 +480,13 @@ class TimeSeriesService:
                             .filterDate(start_date, end_date)
                             .select('absorbing_aerosol_index'))
             
-            if aod_collection.size().getInfo() == 0:
-                return 0.3
-            
-            aod_mean = aod_collection.mean()
-            result = aod_mean.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=polygon,
-                scale=1000,
-                maxPixels=1e9
-            ).getInfo()
+            # An aerosol index of 3.0 (AOD 0.3 after normalization) when the year has no data
+            aod = EarthEngineService.get_info(EarthEngineService.regional_mean_or_default(
+                aod_collection, aod_collection.mean(), polygon, 'absorbing_aerosol_index', 1000, 3.0
+            ))
             
-            aod = result.get('absorbing_aerosol_index', 0.3)
+            if aod is None:
+                return 0.3
             return max(0, min(1, abs(aod) / 10))
         except:
             return 0.3
@@ -321,18 +503,12 @@ class TimeSeriesService:
                              .filterDate(start_date, end_date)
                              .select('particulate_matter_d_less_than_25_um_surface'))
             
-            if pm25_collection.size().getInfo() == 0:
-                return 20.0
-            
-            pm25_mean = pm25_collection.mean()
-            result = pm25_mean.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=polygon,
-                scale=40000,
-                maxPixels=1e9
-            ).getInfo()
+            # 20 µg/m³ (2e-8 kg/m³) when the year has no data
+            pm25_value = EarthEngineService.get_info(EarthEngineService.regional_mean_or_default(
+                pm25_collection, pm25_collection.mean(), polygon,
+                'particulate_matter_d_less_than_25_um_surface', 40000, 20.0e-9
+            ))
             
-            pm25_value = result.get('particulate_matter_d_less_than_25_um_surface')
             return pm25_value * 1e9 if pm25_value else 20.0
         except:
             return 20.0
@@ -372,42 +548,21 @@ class TimeSeriesService:
             return 50.0
     
     @staticmethod
-    def _get_yearly_satellite_image(coordinates: List[List[float]], year: int) -> str:
+    def _get_yearly_satellite_image(coordinates: List[List[float]], year: int,
+                                    composites: Optional[AnnualCompositeBuilder] = None) -> str:
         """Generate satellite image URL for specific year"""
         try:
-            polygon = ee.Geometry.Polygon(coordinates)
-            start_date = f'{year}-01-01'
-            end_date = f'{year}-12-31'
+            if composites is None:
+                composites = AnnualCompositeBuilder(coordinates)
+            polygon = composites.polygon
             
-            # Use Landsat for historical data with correct band names
-            if year >= 2013:
-                collection = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2')
-                bands = ['SR_B4', 'SR_B3', 'SR_B2']  # Red, Green, Blue for LC08
-            elif year >= 1999:
-                collection = ee.ImageCollection('LANDSAT/LE07/C02/T1_L2')
-                bands = ['SR_B3', 'SR_B2', 'SR_B1']  # Red, Green, Blue for LE07
-            else:
-                collection = ee.ImageCollection('LANDSAT/LT05/C02/T1_L2')
-                bands = ['SR_B3', 'SR_B2', 'SR_B1']  # Red, Green, Blue for LT05
-            
-            landsat = (collection
-                    .filterBounds(polygon)
-                    .filterDate(start_date, end_date)
-                    .filter(ee.Filter.lt('CLOUD_COVER', 50)))  # Increased cloud cover threshold
-            
-            if landsat.size().getInfo() == 0:
-                # Try with higher cloud cover if no images found
-                landsat = (collection
-                        .filterBounds(polygon)
-                        .filterDate(start_date, end_date)
-                        .filter(ee.Filter.lt('CLOUD_COVER', 80)))
-                
-                if landsat.size().getInfo() == 0:
-                    return ""
+            # Use the Landsat sensor for the year from the sensor registry
+            sensor = composites.sensor_for_year(year)
             
-            image = landsat.median()
+            # Years without any imagery fail to render and return an empty URL
+            image = composites.imagery_composite(year, sensor)
             # Scale surface reflectance properly (Collection 2 uses 0.0000275 scale + -0.2 offset)
-            rgb_image = image.select(bands).multiply(0.0000275).add(-0.2)
+            rgb_image = sensor.rgb(image)
             
             url = rgb_image.getThumbURL({
                 'region': polygon,
@@ -424,172 +579,131 @@ class TimeSeriesService:
             return ""
     
     @staticmethod
-    def _get_yearly_multi_index_images(coordinates: List[List[float]], year: int) -> Dict[str, str]:
+    def _yearly_index_images(composites: AnnualCompositeBuilder, year: int) -> Dict[str, ee.Image]:
+        """NDVI, wetness, dryness and heat images of a year's imagery composite"""
+        sensor = composites.sensor_for_year(year)
+        image = composites.imagery_composite(year, sensor)
+        
+        # Calculate indices for the sensor
+        ndvi = sensor.ndvi(image)
+        wetness = sensor.wetness(image)
+        brightness = sensor.brightness(image)
+        
+        dryness = brightness.subtract(wetness).rename('Dryness')
+        
+        # Get MODIS LST for heat (available from 2000)
+        if year >= 2000:
+            lst_collection = composites.lst_collection(year)
+            
+            heat = ee.Image(ee.Algorithms.If(
+                lst_collection.size().gt(0),
+                lst_collection.mean().multiply(0.02),
+                ee.Image.constant(298)
+            ))
+        else:
+            heat = ee.Image.constant(298)
+        
+        return {
+            'ndvi': ndvi,
+            'wetness': wetness,
+            'dryness': dryness,
+            'heat': heat.rename('Heat')
+        }
+    
+    @staticmethod
+    def _get_yearly_multi_index_images(coordinates: List[List[float]], year: int,
+                                       composites: Optional[AnnualCompositeBuilder] = None) -> Dict[str, str]:
         """Generate multi-index images for specific year"""
         try:
-            polygon = ee.Geometry.Polygon(coordinates)
-            start_date = f'{year}-01-01'
-            end_date = f'{year}-12-31'
+            if composites is None:
+                composites = AnnualCompositeBuilder(coordinates)
             
-            # Get Landsat collection based on year
-            if year >= 2013:
-                landsat = (ee.ImageCollection('LANDSAT/LC08/C02/T1_L2')
-                        .filterBounds(polygon)
-                        .filterDate(start_date, end_date)
-                        .filter(ee.Filter.lt('CLOUD_COVER', 50)))
-            elif year >= 1999:
-                landsat = (ee.ImageCollection('LANDSAT/LE07/C02/T1_L2')
-                        .filterBounds(polygon)
-                        .filterDate(start_date, end_date)
-                        .filter(ee.Filter.lt('CLOUD_COVER', 50)))
-            else:
-                landsat = (ee.ImageCollection('LANDSAT/LT05/C02/T1_L2')
-                        .filterBounds(polygon)
-                        .filterDate(start_date, end_date)
-                        .filter(ee.Filter.lt('CLOUD_COVER', 50)))
-            
-            if landsat.size().getInfo() == 0:
-                return {"ndvi_url": "", "wetness_url": "", "dryness_url": "", "heat_url": ""}
-            
-            image = landsat.median()
-            
-            # Calculate indices based on satellite
-            if year >= 2013:
-                # Landsat 8
-                ndvi = image.normalizedDifference(['SR_B5', 'SR_B4'])
-                wetness = (image.select('SR_B2').multiply(0.1511)
-                        .add(image.select('SR_B3').multiply(0.1973))
-                        .add(image.select('SR_B4').multiply(0.3283))
-                        .add(image.select('SR_B5').multiply(0.3407))
-                        .add(image.select('SR_B6').multiply(-0.7117))
-                        .add(image.select('SR_B7').multiply(-0.4559)))
-                brightness = (image.select('SR_B2').multiply(0.3029)
-                            .add(image.select('SR_B3').multiply(0.2786))
-                            .add(image.select('SR_B4').multiply(0.4733))
-                            .add(image.select('SR_B5').multiply(0.5599))
-                            .add(image.select('SR_B6').multiply(0.5080))
-                            .add(image.select('SR_B7').multiply(0.1872)))
-            else:
-                # Landsat 5/7
-                ndvi = image.normalizedDifference(['SR_B4', 'SR_B3'])
-                wetness = (image.select('SR_B1').multiply(0.0315)
-                        .add(image.select('SR_B2').multiply(0.2021))
-                        .add(image.select('SR_B3').multiply(0.3102))
-                        .add(image.select('SR_B4').multiply(0.1594))
-                        .add(image.select('SR_B5').multiply(-0.6806))
-                        .add(image.select('SR_B7').multiply(-0.6109)))
-                brightness = (image.select('SR_B1').multiply(0.2043)
-                            .add(image.select('SR_B2').multiply(0.4158))
-                            .add(image.select('SR_B3').multiply(0.5524))
-                            .add(image.select('SR_B4').multiply(0.5741))
-                            .add(image.select('SR_B5').multiply(0.3124))
-                            .add(image.select('SR_B7').multiply(0.2303)))
-            
-            dryness = brightness.subtract(wetness)
-            
-            # Get MODIS LST for heat (available from 2000)
-            if year >= 2000:
-                lst_collection = (ee.ImageCollection('MODIS/061/MOD11A1')
-                                .filterBounds(polygon)
-                                .filterDate(start_date, end_date)
-                                .select('LST_Day_1km'))
-                
-                if lst_collection.size().getInfo() > 0:
-                    heat = lst_collection.mean().multiply(0.02)
-                else:
-                    heat = ee.Image.constant(298)
-            else:
-                heat = ee.Image.constant(298)
+            # Years without imagery fail to render and return empty URLs
+            indices = TimeSeriesService._yearly_index_images(composites, year)
             
             return {
-                'ndvi_url': ndvi.getThumbURL({
-                    'region': polygon, 'dimensions': '800x600', 'format': 'png',
-                    'palette': ['red', 'yellow', 'green'], 'min': -1, 'max': 1
-                }),
-                'wetness_url': wetness.getThumbURL({
-                    'region': polygon, 'dimensions': '800x600', 'format': 'png',
-                    'palette': ['brown', 'yellow', 'blue'], 'min': -2000, 'max': 2000
-                }),
-                'dryness_url': dryness.getThumbURL({
-                    'region': polygon, 'dimensions': '800x600', 'format': 'png',
-                    'palette': ['blue', 'yellow', 'red'], 'min': -2000, 'max': 4000
-                }),
-                'heat_url': heat.getThumbURL({
-                    'region': polygon, 'dimensions': '800x600', 'format': 'png',
-                    'palette': ['blue', 'cyan', 'yellow', 'red'], 'min': 250, 'max': 350
+                f'{name}_url': indices[name].getThumbURL({
+                    'region': composites.polygon, 'dimensions': '800x600', 'format': 'png', **vis
                 })
+                for name, vis in MULTI_INDEX_VISUALIZATION.items()
             }
             
         except Exception as e:
             logger.error(f"Error generating multi-index images for year {year}: {e}")
             return {"ndvi_url": "", "wetness_url": "", "dryness_url": "", "heat_url": ""}
-
+    
     @staticmethod
-    def _create_time_series_animation(coordinates: List[List[float]], years: List[int]) -> str:
-        """Create animation GIF showing time series changes"""
+    def _create_yearly_filmstrips(coordinates: List[List[float]], years: List[int],
+                                  composites: Optional[AnnualCompositeBuilder] = None) -> Dict[str, Dict[str, Any]]:
+        """One filmstrip per image type (satellite, ndvi, wetness, dryness, heat) across all years
+        
+        Frames follow the order of `years`; years without imagery get a blank frame
+        so the frame offsets stay aligned with the years.
+        """
+        if composites is None:
+            composites = AnnualCompositeBuilder(coordinates)
+        polygon = composites.polygon
+        
+        frames: Dict[str, List[ee.Image]] = {'satellite': []}
+        frames.update({name: [] for name in MULTI_INDEX_VISUALIZATION})
+        
+        for year in years:
+            sensor = composites.sensor_for_year(year)
+            has_imagery = composites.imagery_collection(year, sensor).size().gt(0)
+            
+            def frame_or_blank(image: ee.Image, band_names: List[str]) -> ee.Image:
+                blank = ee.Image.constant([0] * len(band_names)).rename(band_names).updateMask(0)
+                return ee.Image(ee.Algorithms.If(has_imagery, image, blank))
+            
+            rgb = sensor.rgb(composites.imagery_composite(year, sensor)).rename(['red', 'green', 'blue'])
+            frames['satellite'].append(frame_or_blank(rgb, ['red', 'green', 'blue']))
+            
+            for name, image in TimeSeriesService._yearly_index_images(composites, year).items():
+                frames[name].append(frame_or_blank(image.rename(name), [name]))
+        
+        vis_params = {'satellite': {'min': 0, 'max': 0.25}}
+        vis_params.update(MULTI_INDEX_VISUALIZATION)
+        
+        filmstrips = {}
+        for name, images in frames.items():
+            try:
+                filmstrips[name] = EarthEngineService.filmstrip(
+                    images, years, polygon, 800, 600, vis_params[name]
+                )
+            except Exception as e:
+                logger.error(f"Error generating {name} filmstrip: {e}")
+        
+        return filmstrips
+    
+    @staticmethod
+    def _create_time_series_animation(coordinates: List[List[float]], years: List[int],
+                                      composites: Optional[AnnualCompositeBuilder] = None) -> str:
+        """Create animation GIF showing time series changes
+        
+        Frames are the yearly imagery composites from `composites`; empty years are
+        dropped server-side, so the GIF costs a single Earth Engine call.
+        """
         try:
-            polygon = ee.Geometry.Polygon(coordinates)
+            if composites is None:
+                composites = AnnualCompositeBuilder(coordinates)
+            polygon = composites.polygon
             
-            # Create image collection for animation
-            image_list = []
+            # One frame per year; years without imagery become null and are dropped server-side
+            frames = []
             
             for year in years:
-                start_date = f'{year}-01-01'
-                end_date = f'{year}-12-31'
-                
-                # Get best available image for the year
-                if year >= 2013:
-                    collection = (ee.ImageCollection('LANDSAT/LC08/C02/T1_L2')
-                                .filterBounds(polygon)
-                                .filterDate(start_date, end_date)
-                                .filter(ee.Filter.lt('CLOUD_COVER', 50)))
-                    bands = ['SR_B4', 'SR_B3', 'SR_B2']
-                elif year >= 1999:
-                    collection = (ee.ImageCollection('LANDSAT/LE07/C02/T1_L2')
-                                .filterBounds(polygon)
-                                .filterDate(start_date, end_date)
-                                .filter(ee.Filter.lt('CLOUD_COVER', 50)))
-                    bands = ['SR_B3', 'SR_B2', 'SR_B1']
-                else:
-                    collection = (ee.ImageCollection('LANDSAT/LT05/C02/T1_L2')
-                                .filterBounds(polygon)
-                                .filterDate(start_date, end_date)
-                                .filter(ee.Filter.lt('CLOUD_COVER', 50)))
-                    bands = ['SR_B3', 'SR_B2', 'SR_B1']
+                sensor = composites.sensor_for_year(year)
+                collection = composites.imagery_collection(year, sensor)
                 
-                if collection.size().getInfo() > 0:
-                    image = collection.median().select(bands).multiply(0.0000275).add(-0.2)
-                    # Add year as property for animation
-                    image = image.set('year', year)
-                    image_list.append(image)
-                else:
-                    # Try with higher cloud cover
-                    if year >= 2013:
-                        collection = (ee.ImageCollection('LANDSAT/LC08/C02/T1_L2')
-                                    .filterBounds(polygon)
-                                    .filterDate(start_date, end_date)
-                                    .filter(ee.Filter.lt('CLOUD_COVER', 80)))
-                    elif year >= 1999:
-                        collection = (ee.ImageCollection('LANDSAT/LE07/C02/T1_L2')
-                                    .filterBounds(polygon)
-                                    .filterDate(start_date, end_date)
-                                    .filter(ee.Filter.lt('CLOUD_COVER', 80)))
-                    else:
-                        collection = (ee.ImageCollection('LANDSAT/LT05/C02/T1_L2')
-                                    .filterBounds(polygon)
-                                    .filterDate(start_date, end_date)
-                                    .filter(ee.Filter.lt('CLOUD_COVER', 80)))
-                    
-                    if collection.size().getInfo() > 0:
-                        image = collection.median().select(bands).multiply(0.0000275).add(-0.2)
-                        image = image.set('year', year)
-                        image_list.append(image)
-            
-            if not image_list:
-                return ""
+                # Add year as property for animation
+                frames.append(ee.Algorithms.If(
+                    collection.size().gt(0),
+                    sensor.rgb(composites.imagery_composite(year, sensor)).set('year', year),
+                    None
+                ))
             
             # Create image collection from list
-            time_series_collection = ee.ImageCollection.fromImages(image_list)
+            time_series_collection = ee.ImageCollection.fromImages(ee.List(frames).removeAll([None]))
             
             # Generate animation URL
             animation_url = time_series_collection.getVideoThumbURL({
@@ -0,0 +1,56 @@
+# tests/conftest.py
+import sys
+from typing import Any
+import pytest
+from app.services.earth_engine import EarthEngineService
+
+
+class StubEarthEngine:
+    """Stand-in for the `ee` module: every call builds another stub and getInfo()
+    returns `result`, counting the calls. Functions passed to map() are called
+    once with a stub so the server-side graph is still built."""
+
+    def __init__(self):
+        self.result: Any = {}
+        self.get_info_calls = 0
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return StubObject(self)
+
+    def __call__(self, *args, **kwargs):
+        return StubObject(self)
+
+
+class StubObject:
+    def __init__(self, stub: StubEarthEngine):
+        self._stub = stub
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return StubObject(self._stub)
+
+    def __call__(self, *args, **kwargs):
+        return StubObject(self._stub)
+
+    def map(self, function):
+        function(StubObject(self._stub))
+        return self
+
+    def getInfo(self):
+        self._stub.get_info_calls += 1
+        return self._stub.result
+
+
+@pytest.fixture
+def stub_ee(monkeypatch):
+    """Replace `ee` in every app module with a StubEarthEngine and mark Earth Engine ready"""
+    stub = StubEarthEngine()
+    for name, module in list(sys.modules.items()):
+        if name.startswith('app.') and hasattr(module, 'ee'):
+            monkeypatch.setattr(module, 'ee', stub)
+    monkeypatch.setattr(EarthEngineService, '_ready', True)
+    EarthEngineService.reset_round_trip_count()
+    return stub
@@ -0,0 +1,127 @@
+# tests/test_columnar.py
+#
+# Property test: the NumPy column engine must score exactly like the scalar
+# SustainabilityCalculator (same rounded scores, same grades) on random inputs.
+import random
+import numpy as np
+import pytest
+from app.models.sustainability import SustainabilityInput
+from app.services.batch import BatchScorer
+from app.services.calculator import SustainabilityCalculator
+from app.services.columnar import ColumnarCalculator, round_like_python
+from app.services.profiles import compile_profile
+
+SEED = 20240516
+SAMPLES = 20_000
+SCORE_KEYS = ['environmental_score', 'social_score', 'economic_score', 'sustainability_index']
+
+
+def _value(rng: random.Random, low: float, high: float, integer: bool = False):
+    """Uniform value, with the bounds and round numbers drawn more often"""
+    roll = rng.random()
+    if roll < 0.05:
+        value = low
+    elif roll < 0.10:
+        value = high
+    elif roll < 0.20:
+        value = round(rng.uniform(low, high), 1)
+    else:
+        value = rng.uniform(low, high)
+    return int(round(value)) if integer else value
+
+
+def random_input(rng: random.Random) -> dict:
+    total_area = _value(rng, 1, 5e7)
+    total_adults = _value(rng, 1, 50_000, integer=True)
+    labor_force = _value(rng, 1, 50_000, integer=True)
+    housing = _value(rng, 1, 30_000, integer=True)
+    return {
+        'environmental': {
+            'green_area': _value(rng, 0, total_area),
+            'total_area': total_area,
+            'water_area': _value(rng, 0, total_area),
+            'air_quality_aod': _value(rng, 0, 1),
+            'land_surface_temperature': _value(rng, 0, 50),
+            'mean_ndvi': _value(rng, 0, 1),
+            'tasseled_cap_wetness': _value(rng, -1, 1),
+            'mean_lst_for_eqi': _value(rng, 0, 50),
+            'ndbsi': _value(rng, 0, 1),
+            'pm25': _value(rng, 0, 150),
+        },
+        'social': {
+            'total_population': _value(rng, 1, 100_000, integer=True),
+            'total_crimes': _value(rng, 0, 20_000, integer=True),
+            'adults_with_degree': _value(rng, 0, total_adults, integer=True),
+            'total_adult_population': total_adults,
+            'avg_time_to_transit': _value(rng, 0, 60),
+            'avg_time_to_schools': _value(rng, 0, 60),
+            'avg_time_to_hospitals': _value(rng, 0, 60),
+            'avg_time_to_fire_stations': _value(rng, 0, 60),
+            'avg_time_to_police': _value(rng, 0, 60),
+            'street_intersections': _value(rng, 0, 400, integer=True),
+        },
+        'economic': {
+            'median_household_income': _value(rng, 0, 250_000),
+            'unemployed_count': _value(rng, 0, labor_force, integer=True),
+            'labor_force': labor_force,
+            'affordable_housing_units': _value(rng, 0, housing, integer=True),
+            'total_housing_units': housing,
+        },
+    }
+
+
+@pytest.fixture(scope='module')
+def inputs():
+    rng = random.Random(SEED)
+    return [random_input(rng) for _ in range(SAMPLES)]
+
+
+def _columns(inputs, category):
+    return {name: np.array([item[category][name] for item in inputs], dtype=np.float64)
+            for name in inputs[0][category]}
+
+
+@pytest.mark.parametrize('profile', [None, compile_profile('test', {
+    'thresholds': {'gpa_max': 55, 'lst_min': 10, 'lst_max': 40, 'ur_max': 20},
+    'weights': {'environmental': {'ecological_quality_index': 2}, 'economic': {'median_household_income': 20}}
+})], ids=['default', 'custom'])
+def test_columnar_matches_scalar(inputs, profile):
+    columnar = ColumnarCalculator.score_arrays(
+        _columns(inputs, 'environmental'), _columns(inputs, 'social'), _columns(inputs, 'economic'),
+        include_details=True, profile=profile
+    )
+
+    for i, item in enumerate(inputs):
+        scalar = SustainabilityCalculator.score_values(
+            item['environmental'], item['social'], item['economic'], include_details=True, profile=profile
+        )
+        for key in SCORE_KEYS:
+            assert float(columnar[key][i]) == scalar[key], (i, key)
+        assert columnar['grade'][i] == scalar['grade'], i
+        for key, value in {**scalar['indicators'], **scalar['normalized']}.items():
+            assert float(columnar[key][i]) == pytest.approx(value, rel=1e-12, abs=1e-12), (i, key)
+
+
+def test_batch_records_match_model_path(inputs):
+    items = inputs[:2_000]
+    results = BatchScorer.score_records(items)
+
+    for item, result in zip(items, results):
+        expected = SustainabilityCalculator.calculate_sustainability_index(SustainabilityInput(**item))
+        for key in SCORE_KEYS:
+            assert result[key] == getattr(expected, key)
+        assert result['grade'] == expected.grade
+
+
+@pytest.mark.parametrize('value', [10.345, 16.755, 46.574999999999996, 0.125, 2.675, 99.995, 79.995])
+def test_round_like_python_ties(value):
+    assert float(round_like_python(np.array([value]), 2)[0]) == round(value, 2)
+    assert float(round_like_python(np.array(value), 2)) == round(value, 2)
+
+
+def test_round_like_python_sweep():
+    rng = np.random.default_rng(SEED)
+    # Values with three decimals, a third of them exactly on a rounding tie
+    values = rng.integers(0, 10_000_000, 100_000) / 1000 + rng.choice([0, 0.0005, 0.00049], 100_000)
+    rounded = round_like_python(values, 2)
+    assert rounded.tolist() == [round(value, 2) for value in values.tolist()]
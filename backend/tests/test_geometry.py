@@ -0,0 +1,80 @@
+# tests/test_geometry.py
+#
+# Local polygon geometry: geodesic areas against GeographicLib's exact
+# ellipsoidal values, canonical keys that ignore where a ring starts and which
+# way it winds, and validation that rejects bad rings without touching the input.
+import copy
+import pytest
+from app.core.config import settings
+from app.services.geographic import GeographicService
+from app.services.geometry import canonical_polygon_key, geodesic_area, prepare_polygon
+
+SQUARE = [[-73.99, 40.75], [-73.98, 40.75], [-73.98, 40.76], [-73.99, 40.76], [-73.99, 40.75]]
+
+# (ring, area in m²) from GeographicLib's Geodesic.WGS84.Polygon, geodesic edges
+REFERENCE_AREAS = [
+    ([[0, 0], [1, 0], [1, 1], [0, 1]], 12308778361.469452),
+    (SQUARE, 937765.3734703064),
+    ([[-74.0, 40.7], [-73.9, 40.7], [-73.9, 40.8], [-74.0, 40.8]], 93783462.43547821),
+]
+
+INVALID_RINGS = {
+    'bow-tie': [[0, 0], [1, 1], [1, 0], [0, 1], [0, 0]],
+    'latitude 95': [[0, 90], [1, 95], [1, 89], [0, 90]],
+    'longitude 500': [[0, 0], [500, 0], [1, 1], [0, 0]],
+    'two vertices': [[0, 0], [1, 1], [0, 0]],
+    'revisited vertex': [[0, 0], [2, 0], [1, 1], [2, 2], [0, 2], [1, 1], [0, 0]],
+}
+
+
+@pytest.mark.parametrize('ring, expected', REFERENCE_AREAS)
+def test_geodesic_area_matches_reference(ring, expected):
+    assert abs(geodesic_area(ring) - expected) / expected <= settings.POLYGON_MAX_AREA_ERROR
+    # Closing vertex and orientation do not matter
+    assert geodesic_area(ring + [ring[0]]) == pytest.approx(geodesic_area(ring), rel=1e-12)
+    assert geodesic_area(ring[::-1]) == pytest.approx(geodesic_area(ring), rel=1e-12)
+
+
+def test_canonical_key_ignores_start_and_winding():
+    ring = SQUARE[:-1]
+    key = canonical_polygon_key(SQUARE)
+    for start in range(len(ring)):
+        rotated = ring[start:] + ring[:start]
+        assert canonical_polygon_key(rotated) == key
+        assert canonical_polygon_key(rotated + [rotated[0]]) == key
+        assert canonical_polygon_key(rotated[::-1]) == key
+    # Differences below COORDINATE_PRECISION round away; larger ones do not
+    assert canonical_polygon_key([[lon + 1e-8, lat] for lon, lat in SQUARE]) == key
+    assert canonical_polygon_key([[lon + 1e-4, lat] for lon, lat in SQUARE]) != key
+    assert canonical_polygon_key(SQUARE, '2020-01-01') != key
+
+
+@pytest.mark.parametrize('name', INVALID_RINGS)
+def test_invalid_rings_are_rejected(name):
+    ring = INVALID_RINGS[name]
+    with pytest.raises(ValueError):
+        prepare_polygon(ring)
+    with pytest.raises(ValueError):
+        GeographicService.prepare_polygon(ring)
+    assert GeographicService.validate_polygon(ring) is False
+
+
+def test_prepare_polygon_does_not_modify_its_input():
+    # A clockwise, unclosed square with extra vertices along its edges, so it
+    # is reversed, closed and simplified
+    corners = SQUARE[:-1][::-1]
+    ring = [[lon1 + (lon2 - lon1) * step / 10, lat1 + (lat2 - lat1) * step / 10]
+            for (lon1, lat1), (lon2, lat2) in zip(corners, corners[1:] + corners[:1])
+            for step in range(10)]
+    original = copy.deepcopy(ring)
+
+    prepared = prepare_polygon(ring, 20.0, settings.POLYGON_MAX_AREA_ERROR)
+
+    assert ring == original
+    assert prepared.coordinates is not ring
+    assert prepared.coordinates[0] == prepared.coordinates[-1]
+    assert 3 <= prepared.vertices < len(ring)
+    assert prepared.area_error <= settings.POLYGON_MAX_AREA_ERROR
+    # Simplification keeps a subset of the (rounded) input vertices
+    rounded = {(round(lon, 6), round(lat, 6)) for lon, lat in ring}
+    assert all((lon, lat) in rounded for lon, lat in prepared.coordinates)
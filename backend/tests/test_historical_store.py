@@ -0,0 +1,93 @@
+# tests/test_historical_store.py
+#
+# Settled years round-trip through the SQLite historical store, and a time
+# series whose years are all stored makes no Earth Engine extraction.
+import asyncio
+from datetime import datetime
+import pytest
+from app.core.config import settings
+from app.models.sustainability import PolygonInput, TimeSeriesInput
+from app.services import timeseries
+from app.services.geographic import GeographicService
+from app.services.geometry import canonical_polygon_key
+from app.services.historical_store import HistoricalIndicatorStore
+from app.services.timeseries import TimeSeriesService
+
+SQUARE = [[-73.99, 40.75], [-73.98, 40.75], [-73.98, 40.76], [-73.99, 40.76], [-73.99, 40.75]]
+SETTLED_YEARS = [2015, 2016, 2017, 2018]
+
+INDICATORS = {
+    'green_area': 4e5,
+    'total_area': 1e6,
+    'water_area': 1e4,
+    'air_quality_aod': 0.2,
+    'land_surface_temperature': 28.0,
+    'mean_ndvi': 0.4,
+    'tasseled_cap_wetness': -0.05,
+    'mean_lst_for_eqi': 28.0,
+    'ndbsi': 0.1,
+    'pm25': 12.0,
+}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = HistoricalIndicatorStore(str(tmp_path / "historical.sqlite3"))
+    monkeypatch.setattr(timeseries, 'historical_store', store)
+    return store
+
+
+def test_round_trip(store):
+    polygon_hash = canonical_polygon_key(SQUARE)
+    indicators = {2015: dict(INDICATORS), 2016: {**INDICATORS, 'mean_ndvi': 0.5}}
+    store.put_many(polygon_hash, indicators, {2015: 'LC08', 2016: 'LC08'})
+
+    assert store.get_many(polygon_hash, {2015: 'LC08', 2016: 'LC08', 2017: 'LC08'}) == indicators
+    # Rows are keyed by sensor and polygon too
+    assert store.get_many(polygon_hash, {2015: 'LE07'}) == {}
+    assert store.get_many('other polygon', {2015: 'LC08'}) == {}
+    assert store.stats()['rows'] == 2
+
+
+def test_algorithm_version_change_misses(store):
+    polygon_hash = canonical_polygon_key(SQUARE)
+    store.put_many(polygon_hash, {2015: INDICATORS}, {2015: 'LC08'}, algorithm_version='1')
+
+    assert store.get_many(polygon_hash, {2015: 'LC08'}, algorithm_version='1') == {2015: INDICATORS}
+    assert store.get_many(polygon_hash, {2015: 'LC08'}, algorithm_version='2') == {}
+
+
+def test_unsettled_years_are_not_stored(store):
+    current_year = datetime.now().year
+    TimeSeriesService._store_indicators(SQUARE, {2015: INDICATORS, current_year: INDICATORS})
+
+    assert TimeSeriesService._load_stored_indicators(SQUARE, [2015, current_year]) == {2015: INDICATORS}
+    assert store.stats()['rows'] == 1
+
+
+def test_stored_years_skip_earth_engine(store, monkeypatch):
+    def no_extraction(*args, **kwargs):
+        pytest.fail("indicators extracted for a stored year")
+
+    monkeypatch.setattr(settings, 'HISTORICAL_STORE_ENABLED', True)
+    monkeypatch.setattr(settings, 'TIMESERIES_SERVER_SIDE_INDICATORS', True)
+    monkeypatch.setattr(GeographicService, 'initialize_earth_engine', staticmethod(lambda: None))
+    monkeypatch.setattr(timeseries, 'AnnualCompositeBuilder', lambda coordinates: None)
+    monkeypatch.setattr(TimeSeriesService, '_extract_time_series_indicators_server_side', staticmethod(no_extraction))
+    monkeypatch.setattr(TimeSeriesService, '_extract_yearly_environmental_indicators', staticmethod(no_extraction))
+    monkeypatch.setattr(TimeSeriesService, '_get_yearly_satellite_image',
+                        staticmethod(lambda coordinates, year, composites: ''))
+    monkeypatch.setattr(TimeSeriesService, '_get_yearly_multi_index_images', staticmethod(
+        lambda coordinates, year, composites: {'ndvi_url': '', 'wetness_url': '', 'dryness_url': '', 'heat_url': ''}
+    ))
+    monkeypatch.setattr(TimeSeriesService, '_create_time_series_animation',
+                        staticmethod(lambda coordinates, years, composites: ''))
+
+    coordinates = GeographicService.prepare_polygon(SQUARE)
+    TimeSeriesService._store_indicators(coordinates, {year: INDICATORS for year in SETTLED_YEARS})
+
+    data = TimeSeriesInput(polygon=PolygonInput(coordinates=SQUARE), years=SETTLED_YEARS)
+    result = asyncio.run(TimeSeriesService.analyze_time_series(data))
+
+    assert [item.year for item in result.yearly_data] == SETTLED_YEARS
+    assert all(item.mean_ndvi == INDICATORS['mean_ndvi'] for item in result.yearly_data)
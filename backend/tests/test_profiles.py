@@ -0,0 +1,83 @@
+# tests/test_profiles.py
+#
+# The default scoring profile must reproduce the calculator as it was before
+# scoring profiles existed, bit for bit. baseline_score is that calculator's
+# arithmetic, frozen.
+import random
+import pytest
+from app.services.calculator import SustainabilityCalculator
+from app.services.profiles import DEFAULT_THRESHOLDS as T, profile_registry
+from test_columnar import SEED, random_input
+
+SAMPLES = 50_000
+SCORE_KEYS = ['environmental_score', 'social_score', 'economic_score', 'sustainability_index']
+
+
+def baseline_score(env, soc, eco):
+    ndvi_norm = (env['mean_ndvi'] - T['ndvi_min']) / (T['ndvi_max'] - T['ndvi_min'])
+    wet_norm = (env['tasseled_cap_wetness'] - T['wet_min']) / (T['wet_max'] - T['wet_min'])
+    heat_norm = 1 - (env['mean_lst_for_eqi'] - T['lst_min']) / (T['lst_max'] - T['lst_min'])
+    ndbsi_norm = 1 - (env['ndbsi'] - T['ndbsi_min']) / (T['ndbsi_max'] - T['ndbsi_min'])
+    pm25_norm = 1 - (env['pm25'] / T['pm25_max'])
+    pc1 = 0.4 * ndvi_norm + 0.3 * wet_norm + 0.2 * heat_norm + 0.1 * ndbsi_norm + 0.1 * pm25_norm
+    eqi = max(0, min(1, (pc1 - T['pc1_min']) / (T['pc1_max'] - T['pc1_min'])))
+
+    total_sq_miles = env['total_area'] * 3.861e-7
+    travel = [soc['avg_time_to_transit'], soc['avg_time_to_schools'], soc['avg_time_to_hospitals'],
+              soc['avg_time_to_fire_stations'], soc['avg_time_to_police']]
+
+    gpa_norm = min(1.0, (env['green_area'] / env['total_area']) * 100 / T['gpa_max'])
+    wpa_norm = min(1.0, (env['water_area'] / env['total_area']) * 100 / T['wpa_max'])
+    aq_norm = max(0.0, 1.0 - env['air_quality_aod'] / T['aq_max'])
+    lst_norm = max(0.0, 1.0 - (env['land_surface_temperature'] - T['lst_min']) / (T['lst_max'] - T['lst_min']))
+    cr_norm = max(0.0, 1.0 - (soc['total_crimes'] / soc['total_population']) * 1000 / T['cr_max'])
+    el_norm = (soc['adults_with_degree'] / soc['total_adult_population']) * 100 / 100
+    access_norms = [max(0.0, 1.0 - time / T['travel_time_max']) for time in travel]
+    w = soc['street_intersections'] / total_sq_miles if total_sq_miles > 0 else 0
+    w_norm = min(1.0, w / T['w_max'])
+    mhi_norm = min(1.0, eco['median_household_income'] / T['mhi_max'])
+    ur_norm = max(0.0, 1.0 - (eco['unemployed_count'] / eco['labor_force']) * 100 / T['ur_max'])
+    ha_norm = (eco['affordable_housing_units'] / eco['total_housing_units']) * 100 / 100
+
+    env_score = (
+        (0.08/0.40) * gpa_norm +
+        (0.06/0.40) * wpa_norm +
+        (0.08/0.40) * aq_norm +
+        (0.06/0.40) * lst_norm +
+        (0.12/0.40) * eqi
+    ) * 100
+    soc_score = (cr_norm + el_norm + access_norms[0] + access_norms[1] + access_norms[2] +
+                 access_norms[3] + access_norms[4] + w_norm) / 8 * 100
+    eco_score = (mhi_norm + ur_norm + ha_norm) / 3 * 100
+    final_index = 0.40 * env_score + 0.30 * soc_score + 0.30 * eco_score
+
+    return {
+        'environmental_score': round(env_score, 2),
+        'social_score': round(soc_score, 2),
+        'economic_score': round(eco_score, 2),
+        'sustainability_index': round(final_index, 2),
+    }
+
+
+@pytest.fixture(scope='module')
+def inputs():
+    rng = random.Random(SEED + 1)
+    return [random_input(rng) for _ in range(SAMPLES)]
+
+
+def test_default_profile_matches_baseline(inputs):
+    profile = profile_registry.get('default')
+    for i, item in enumerate(inputs):
+        expected = baseline_score(item['environmental'], item['social'], item['economic'])
+        result = SustainabilityCalculator.score_values(
+            item['environmental'], item['social'], item['economic'], profile=profile
+        )
+        for key in SCORE_KEYS:
+            assert result[key] == expected[key], (i, key)
+
+
+def test_default_profile_weights_are_whole_numbers():
+    described = profile_registry.get('default').describe()
+    assert described['category_weights'] == {'environmental': 40, 'social': 30, 'economic': 30}
+    assert all(type(weight) is int for weight in described['category_weights'].values())
+    assert described['indicator_weights']['social']['crime_rate'] == 3.75
@@ -0,0 +1,39 @@
+# tests/test_round_trips.py
+#
+# The single-request indicator extraction and the server-side time series each
+# cost exactly one getInfo() round trip, however many indicators or years.
+from app.core.config import settings
+from app.services.earth_engine import EarthEngineService
+from app.services.geographic import GeographicService
+from app.services.timeseries import TimeSeriesService
+
+SQUARE = [[-73.99, 40.75], [-73.98, 40.75], [-73.98, 40.76], [-73.99, 40.76], [-73.99, 40.75]]
+
+
+def test_environmental_indicators_cost_one_round_trip(stub_ee, monkeypatch):
+    monkeypatch.setattr(settings, 'TILED_REDUCTION_ENABLED', False)
+    stub_ee.result = {'green_area': 4e5, 'water_area': 1e4, 'mean_ndvi': 0.4, 'ndbsi': 0.1,
+                      'aod': 1.5, 'lst': 28.0, 'wetness': -500, 'pm25': 1.2e-8}
+
+    result = GeographicService.extract_all_environmental_indicators(SQUARE, single_request=True, use_cache=False)
+
+    assert EarthEngineService.get_round_trip_count() == 1
+    assert stub_ee.get_info_calls == 1
+    assert result['mean_ndvi'] == 0.4
+    assert result['tasseled_cap_wetness'] == -0.05
+
+
+def test_server_side_time_series_costs_one_round_trip(stub_ee):
+    years = list(range(2014, 2024))
+    stub_ee.result = [
+        {'year': year, 'has_landsat': True, 'lst': 27.0, 'aod': None, 'pm25': None,
+         'landsat': {'green_area': 3e5, 'water_area': 0, 'mean_ndvi': 0.35, 'wetness': 0, 'ndbsi': 0.2}}
+        for year in years
+    ]
+
+    indicators = TimeSeriesService._extract_time_series_indicators_server_side(SQUARE, years)
+
+    assert EarthEngineService.get_round_trip_count() == 1
+    assert stub_ee.get_info_calls == 1
+    assert sorted(indicators) == years
+    assert all(values['mean_ndvi'] == 0.35 for values in indicators.values())
@@ -0,0 +1,50 @@
+# tests/test_score_file.py
+#
+# The file scoring CLI scores a CSV across worker processes exactly like the
+# scalar calculator, reporting invalid rows inline.
+import csv
+import json
+import random
+from app.services.calculator import SustainabilityCalculator
+from app.services.score_file import INPUT_COLUMNS, main
+from test_columnar import SEED, random_input
+
+ROWS = 400
+SCORE_KEYS = ['environmental_score', 'social_score', 'economic_score', 'sustainability_index']
+# Row -> (column, invalid value)
+INVALID = {3: ('total_area', 0), 57: ('green_area', -5), 250: ('total_crimes', 'many')}
+
+
+def test_cli_scores_csv_like_score_values(tmp_path):
+    rng = random.Random(SEED + 2)
+    items = [random_input(rng) for _ in range(ROWS)]
+    rows = [{name: item[category][name] for name, category in INPUT_COLUMNS.items()} for item in items]
+    for row, (column, value) in INVALID.items():
+        rows[row][column] = value
+
+    input_path = tmp_path / "neighborhoods.csv"
+    with open(input_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(INPUT_COLUMNS))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    # Small row groups so both workers get several
+    output_path = tmp_path / "scores.csv"
+    main([str(input_path), "-o", str(output_path), "-w", "2", "--row-group-mb", "0.005"])
+
+    with open(output_path, newline="") as f:
+        results = list(csv.DictReader(f))
+    assert [int(result['row']) for result in results] == list(range(ROWS))
+
+    for i, (item, result) in enumerate(zip(items, results)):
+        if i in INVALID:
+            errors = json.loads(result['errors'])
+            assert [error['loc'] for error in errors] == [[INPUT_COLUMNS[INVALID[i][0]], INVALID[i][0]]]
+            assert all(result[key] == "" for key in SCORE_KEYS + ['grade'])
+            continue
+
+        expected = SustainabilityCalculator.score_values(item['environmental'], item['social'], item['economic'])
+        assert result['errors'] == ""
+        for key in SCORE_KEYS:
+            assert float(result[key]) == expected[key], (i, key)
+        assert result['grade'] == expected['grade']
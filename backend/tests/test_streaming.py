@@ -0,0 +1,60 @@
+# tests/test_streaming.py
+#
+# NDJSON line splitting across arbitrary chunk boundaries, and oversized lines.
+import asyncio
+import json
+import random
+from app.core.config import settings
+from app.services.calculator import SustainabilityCalculator
+from app.services.streaming import iter_lines, score_byte_stream
+from test_columnar import SEED, random_input
+
+
+async def _chunks(data: bytes, sizes):
+    position = 0
+    for size in sizes:
+        yield data[position:position + size]
+        position += size
+    if position < len(data):
+        yield data[position:]
+
+
+def split(data: bytes, sizes, max_line_bytes=None):
+    async def collect():
+        return [line async for line in iter_lines(_chunks(data, sizes), max_line_bytes)]
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunk_boundaries():
+    rng = random.Random(SEED)
+    for _ in range(500):
+        data = bytes(rng.choice(b"ab\n") for _ in range(rng.randint(0, 300)))
+        sizes = [rng.randint(1, 40) for _ in range(len(data))]
+        expected = data.split(b"\n")
+        if expected[-1] == b"":
+            expected.pop()
+        assert split(data, sizes, max_line_bytes=1000) == expected
+
+
+def test_oversized_lines_are_dropped_as_they_arrive():
+    data = b"short\n" + b"x" * 100 + b"\n" + b"y" * 10 + b"\n" + b"z" * 50
+    for size in (1, 7, 16, 64, len(data)):
+        assert split(data, [size] * len(data), max_line_bytes=20) == [b"short", None, b"y" * 10, None]
+
+
+def test_stream_reports_oversized_lines_inline(monkeypatch):
+    monkeypatch.setattr(settings, 'STREAM_MAX_LINE_BYTES', 4096)
+    rng = random.Random(SEED)
+    items = [random_input(rng) for _ in range(3)]
+    lines = [json.dumps(items[0]), json.dumps({'padding': 'p' * 5000, **items[1]}), json.dumps(items[2])]
+    data = ("\n".join(lines) + "\n").encode()
+
+    async def collect():
+        return "".join([text async for text in score_byte_stream(_chunks(data, [1000] * len(data)))])
+
+    outputs = [json.loads(line) for line in asyncio.run(collect()).splitlines()]
+    assert [output['line'] for output in outputs] == [1, 2, 3]
+    assert outputs[1]['errors'] == [{'loc': [], 'msg': 'Line exceeds the limit of 4096 bytes'}]
+    for output, item in ((outputs[0], items[0]), (outputs[2], items[2])):
+        expected = SustainabilityCalculator.score_values(item['environmental'], item['social'], item['economic'])
+        assert output['sustainability_index'] == expected['sustainability_index']
@@ -0,0 +1,124 @@
+# tests/test_thumbnails.py
+#
+# ThumbnailCache against a local HTTP server standing in for Earth Engine.
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.services.thumbnails import ThumbnailCache, ThumbnailNotFoundError
+
+IMAGE_BYTES = 1000
+
+
+class ThumbnailServer(BaseHTTPRequestHandler):
+    """Serves IMAGE_BYTES of PNG-typed bytes derived from the path, counting requests"""
+    requests = []
+
+    def do_GET(self):
+        ThumbnailServer.requests.append(self.path)
+        body = (self.path.encode() * IMAGE_BYTES)[:IMAGE_BYTES]
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def source():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThumbnailServer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def reset_requests():
+    ThumbnailServer.requests.clear()
+
+
+def key(name: str) -> str:
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+def register(cache: ThumbnailCache, source: str, name: str) -> str:
+    cache.url_for(key(name), lambda: f"{source}/{name}")
+    return key(name)
+
+
+def disk_bytes(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(directory) for name in names)
+
+
+def test_first_fetch_downloads_and_second_is_a_hit(tmp_path, source):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=10**6, fetch_timeout=5)
+    thumbnail = register(cache, source, "ndvi")
+
+    content, content_type, digest = cache.get(thumbnail)
+    assert ThumbnailServer.requests == ["/ndvi"]
+    assert content_type == "image/png"
+    assert digest == hashlib.sha256(content).hexdigest()
+
+    assert cache.get(thumbnail) == (content, content_type, digest)
+    assert ThumbnailServer.requests == ["/ndvi"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    # Registering a stored image again does not ask for a new source URL
+    cache.url_for(thumbnail, lambda: pytest.fail("source URL rebuilt for a stored image"))
+
+
+def test_if_none_match_skips_the_image(tmp_path, source):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=10**6, fetch_timeout=5)
+    thumbnail = register(cache, source, "heat")
+    _, _, digest = cache.get(thumbnail)
+    assert cache.cached_digest(thumbnail) == digest
+
+    # A fresh process knows no digests and answers from the key record
+    cache = ThumbnailCache(str(tmp_path), max_bytes=10**6, fetch_timeout=5)
+    os.remove(os.path.join(str(tmp_path), "blobs", digest))
+    content, _, etag_digest = cache.get(thumbnail, f'"{digest}"')
+    assert content is None
+    assert etag_digest == digest
+    assert cache.stats()["not_modified"] == 1
+    assert ThumbnailServer.requests == ["/heat"]
+
+
+def test_least_recently_used_images_are_evicted_with_their_keys(tmp_path, source):
+    # Room for two images and their key records, not three
+    cache = ThumbnailCache(str(tmp_path), max_bytes=2 * IMAGE_BYTES + 800, fetch_timeout=5)
+    first = register(cache, source, "first")
+    cache.get(first)
+    time.sleep(0.02)
+    second = register(cache, source, "second")
+    cache.get(second)
+    time.sleep(0.02)
+    cache.get(first)
+    time.sleep(0.02)
+    third = register(cache, source, "third")
+    cache.get(third)
+
+    with pytest.raises(ThumbnailNotFoundError):
+        cache.get(second)
+    assert not os.path.exists(os.path.join(str(tmp_path), "keys", f"{second}.json"))
+    cache.get(first)
+    cache.get(third)
+    assert ThumbnailServer.requests == ["/first", "/second", "/third"]
+    assert cache.stats()["evictions"] == 1
+    assert disk_bytes(str(tmp_path)) <= cache.max_bytes
+
+
+def test_unfetched_keys_stay_within_max_bytes(tmp_path, source):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=5000, fetch_timeout=5)
+    for i in range(500):
+        register(cache, source, f"never-fetched-{i}")
+
+    assert disk_bytes(str(tmp_path)) <= cache.max_bytes
+    assert ThumbnailServer.requests == []
@@ -0,0 +1,85 @@
+# tests/test_timeseries_parallelism.py
+#
+# analyze_time_series runs at most TIMESERIES_YEAR_PARALLELISM years at once:
+# with every year taking a fixed delay, the wall time is ceil(years / parallelism)
+# delays.
+import asyncio
+import math
+import time
+import pytest
+from app.core.config import settings
+from app.models.sustainability import PolygonInput, TimeSeriesInput
+from app.services import timeseries
+from app.services.geographic import GeographicService
+from app.services.timeseries import TimeSeriesService
+
+YEAR_DELAY = 0.2
+YEARS = list(range(2013, 2023))
+SQUARE = [[-73.99, 40.75], [-73.98, 40.75], [-73.98, 40.76], [-73.99, 40.76], [-73.99, 40.75]]
+
+INDICATORS = {
+    'green_area': 4e5,
+    'total_area': 1e6,
+    'water_area': 1e4,
+    'air_quality_aod': 0.2,
+    'land_surface_temperature': 28.0,
+    'mean_ndvi': 0.4,
+    'tasseled_cap_wetness': -0.05,
+    'mean_lst_for_eqi': 28.0,
+    'ndbsi': 0.1,
+    'pm25': 12.0,
+}
+
+
+def _slow_indicators(coordinates, year, composites):
+    time.sleep(YEAR_DELAY)
+    return dict(INDICATORS)
+
+
+@pytest.fixture
+def stubbed_earth_engine(monkeypatch):
+    """Per-year extraction sleeps YEAR_DELAY; every other Earth Engine call is a no-op"""
+    monkeypatch.setattr(settings, 'HISTORICAL_STORE_ENABLED', False)
+    monkeypatch.setattr(settings, 'TIMESERIES_SERVER_SIDE_INDICATORS', False)
+    monkeypatch.setattr(GeographicService, 'initialize_earth_engine', staticmethod(lambda: None))
+    monkeypatch.setattr(timeseries, 'AnnualCompositeBuilder', lambda coordinates: None)
+    monkeypatch.setattr(TimeSeriesService, '_extract_yearly_environmental_indicators', staticmethod(_slow_indicators))
+    monkeypatch.setattr(TimeSeriesService, '_get_yearly_satellite_image',
+                        staticmethod(lambda coordinates, year, composites: ''))
+    monkeypatch.setattr(TimeSeriesService, '_get_yearly_multi_index_images', staticmethod(
+        lambda coordinates, year, composites: {'ndvi_url': '', 'wetness_url': '', 'dryness_url': '', 'heat_url': ''}
+    ))
+    monkeypatch.setattr(TimeSeriesService, '_create_time_series_animation',
+                        staticmethod(lambda coordinates, years, composites: ''))
+
+
+@pytest.mark.parametrize('parallelism', [1, 3, 5, len(YEARS)])
+def test_wall_time_scales_with_parallelism(stubbed_earth_engine, monkeypatch, parallelism):
+    monkeypatch.setattr(settings, 'TIMESERIES_YEAR_PARALLELISM', parallelism)
+    data = TimeSeriesInput(polygon=PolygonInput(coordinates=SQUARE), years=YEARS)
+
+    started = time.perf_counter()
+    result = asyncio.run(TimeSeriesService.analyze_time_series(data))
+    elapsed = time.perf_counter() - started
+
+    assert [item.year for item in result.yearly_data] == YEARS
+    expected = math.ceil(len(YEARS) / parallelism) * YEAR_DELAY
+    assert expected <= elapsed < expected + 0.75 * YEAR_DELAY
+
+
+def test_animation_renders_alongside_years(stubbed_earth_engine, monkeypatch):
+    def slow_animation(coordinates, years, composites):
+        time.sleep(2 * YEAR_DELAY)
+        return 'animation'
+
+    monkeypatch.setattr(settings, 'TIMESERIES_YEAR_PARALLELISM', len(YEARS))
+    monkeypatch.setattr(TimeSeriesService, '_create_time_series_animation', staticmethod(slow_animation))
+    data = TimeSeriesInput(polygon=PolygonInput(coordinates=SQUARE), years=YEARS)
+
+    started = time.perf_counter()
+    result = asyncio.run(TimeSeriesService.analyze_time_series(data))
+    elapsed = time.perf_counter() - started
+
+    assert result.animation_gif_url == 'animation'
+    # Overlapped: max(years, animation) rather than their sum
+    assert elapsed < 2.75 * YEAR_DELAY